@@ -3,9 +3,10 @@
 import logging
 import os
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Generator, List, Tuple
+from typing import Any, Deque, Dict, Generator, List, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
@@ -15,7 +16,7 @@ from selenium.webdriver import firefox
 import myaku
 from myaku import utils
 from myaku.crawlers.crawl_track import CrawlTracker
-from myaku.datatypes import Crawlable_co, JpnArticle, JpnArticleBlog
+from myaku.datatypes import Crawlable, Crawlable_co, JpnArticle, JpnArticleBlog
 
 _log = logging.getLogger(__name__)
 
@@ -121,6 +122,14 @@ class CrawlerABC(ABC):
         self._session = requests.Session()
         self._web_driver = self._init_web_driver()
 
+        # When crawl tracking is deferred, holds the crawled items whose
+        # tracking has not been updated yet in crawl order. Each item is
+        # paired with the number of articles the crawls of this crawler had
+        # given when the item finished being crawled.
+        self._defer_crawl_tracking = False
+        self._crawled_article_count = 0
+        self._deferred_tracking_items: Deque[Tuple[int, Crawlable]] = deque()
+
     @utils.add_debug_logging
     def _init_web_driver(self) -> webdriver.Firefox:
         """Init the web driver for the crawler."""
@@ -152,6 +161,63 @@ class CrawlerABC(ABC):
         """Close the resources used by the crawler."""
         self.close()
 
+    @property
+    def crawled_article_count(self) -> int:
+        """Number of articles given so far by the crawls of this crawler."""
+        return self._crawled_article_count
+
+    def defer_crawl_tracking(self) -> None:
+        """Defer the crawl tracking updates for items crawled by this crawler.
+
+        The crawl tracking for a crawled article or blog can only be updated
+        once its articles are stored in the db. Otherwise, it will be marked as
+        crawl skipped instead. Crawl tracking should be deferred if the
+        articles given by the crawls of this crawler are not stored before the
+        next article is requested from the crawls.
+
+        Once deferred, the crawl tracking updates are only done when
+        update_deferred_crawl_tracking is called.
+        """
+        self._defer_crawl_tracking = True
+
+    def update_deferred_crawl_tracking(
+        self, handled_article_count: Optional[int] = None
+    ) -> None:
+        """Update the deferred crawl tracking for the handled articles.
+
+        Args:
+            handled_article_count: Number of the articles given by the crawls
+                of this crawler that have either been stored in the db or will
+                never be stored. Only the crawl tracking for the items crawled
+                before the next article after these articles was given is
+                updated. If None, all deferred crawl tracking is updated.
+        """
+        if handled_article_count is None:
+            handled_article_count = self._crawled_article_count
+
+        tracking_items = []
+        while (len(self._deferred_tracking_items) > 0
+               and self._deferred_tracking_items[0][0]
+               <= handled_article_count):
+            tracking_items.append(self._deferred_tracking_items.popleft()[1])
+        if len(tracking_items) == 0:
+            return
+
+        with CrawlTracker() as tracker:
+            for item in tracking_items:
+                tracker.update_last_crawled_datetime(item)
+
+    def _update_crawl_tracking(
+        self, tracker: CrawlTracker, item: Crawlable
+    ) -> None:
+        """Update the crawl tracking for an item or defer it if deferring."""
+        if self._defer_crawl_tracking:
+            self._deferred_tracking_items.append(
+                (self._crawled_article_count, item)
+            )
+        else:
+            tracker.update_last_crawled_datetime(item)
+
     @utils.add_debug_logging
     def _get_url_json(self, url: str) -> Dict[str, Any]:
         """Make a GET request to get JSON from a url.
@@ -295,10 +361,11 @@ class CrawlerABC(ABC):
                 last_crawled_datetime = datetime.utcnow()
                 article = self.crawl_article(meta.source_url, meta)
                 if article is not None:
+                    self._crawled_article_count += 1
                     yield article
 
                 meta.last_crawled_datetime = last_crawled_datetime
-                tracker.update_last_crawled_datetime(meta)
+                self._update_crawl_tracking(tracker, meta)
 
     @utils.add_debug_logging
     def _crawl_updated_blogs(
@@ -325,4 +392,4 @@ class CrawlerABC(ABC):
                 )
                 blog.last_crawled_datetime = datetime.utcnow()
                 yield from self.crawl_blog(blog.source_url)
-                tracker.update_last_crawled_datetime(blog)
+                self._update_crawl_tracking(tracker, blog)
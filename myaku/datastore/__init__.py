@@ -6,8 +6,8 @@ Types used across all data storage-related modules are defined in file.
 import enum
 import functools
 import logging
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
 
 from myaku import utils
 from myaku.datatypes import ArticleRankKey, ArticleTextPosition, JpnArticle
@@ -79,11 +79,19 @@ class Query(object):
             that match the lexical item being queried.
         user_id: ID of the user making the query. Can be used to get search
             result pages that were pre-fetched into a cache for the user.
+        after_rank_key: Rank key of the last search result on the previous
+            page of the query. If set, the page is read from the database by
+            seeking past this rank key instead of reading past all of the
+            search results on the previous pages. Not considered when
+            comparing queries.
     """
     query_str: str = None
     page_num: int = None
     query_type: QueryType = QueryType.EXACT
     user_id: str = None
+    after_rank_key: Optional[ArticleRankKey] = field(
+        default=None, compare=False
+    )
 
     def __str__(self) -> str:
         """Get a string representation of the query."""
@@ -132,10 +140,15 @@ class SearchResultPage(object):
             database for the query. Note that this is NOT the number of results
             on just this page, but the total overall number of results.
         search_results: Article search results for the page in ranked order.
+        last_rank_key: Full precision rank key of the last search result on
+            the page. Can be used as the after_rank_key of the query for the
+            next page. None if the page has no search results or the rank key
+            was not kept when the page was cached.
     """
     query: Query = None
     total_results: int = None
     search_results: List[SearchResult] = None
+    last_rank_key: Optional[ArticleRankKey] = None
 
 
 @enum.unique
@@ -3,7 +3,7 @@
 import enum
 import functools
 import logging
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, cast
 
 import redis
 from bson.objectid import ObjectId
@@ -373,6 +373,10 @@ class NextPageCache(object):
         }
         for article_id, article_bytes in serialized_page.article_map.items():
             next_page_hash[article_id] = article_bytes
+        if page.last_rank_key is not None:
+            next_page_hash['last_rank_key'] = serialize.serialize_rank_key(
+                page.last_rank_key
+            )
 
         redis_key = f'user:{user_id}:{direction.value}'
         self._redis_client.delete(redis_key)
@@ -434,6 +438,9 @@ class NextPageCache(object):
         The cached next page will only be returned if it matches the query_str,
         page_num, and user_id of the query.
 
+        The last rank key of the returned page is kept at full precision, so
+        it can be used as the after_rank_key of the query for the page after.
+
         Args:
             query: Query to get the cached next page of search results for.
 
@@ -456,4 +463,15 @@ class NextPageCache(object):
             )
             serialize.deserialize_article(cached_article, result.article)
 
+        # The client doesn't decode responses, so the rank key is read as
+        # bytes.
+        cached_rank_key = cast(
+            Optional[bytes],
+            self._redis_client.hget(cache_key, 'last_rank_key')
+        )
+        if cached_rank_key is not None:
+            page.last_rank_key = serialize.deserialize_rank_key(
+                cached_rank_key
+            )
+
         return page
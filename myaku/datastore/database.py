@@ -1,13 +1,29 @@
 """Driver for accessing the Myaku search index database."""
 
 import functools
+import json
 import logging
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
-from typing import Any, Callable, Dict, List, Type, Union
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import pymongo
 from bson.objectid import ObjectId
-from pymongo import MongoClient
+from pymongo import MongoClient, ReplaceOne, UpdateOne, monitoring
 from pymongo.collection import Collection, ReturnDocument
 from pymongo.database import Database
 from pymongo.errors import DuplicateKeyError
@@ -18,9 +34,11 @@ from myaku.datastore import (
     DataAccessMode,
     Document,
     QueryType,
+    require_update_permission,
     require_write_permission,
 )
 from myaku.datatypes import Crawlable, JpnArticle, JpnArticleBlog
+from myaku.errors import EnvironmentNotSetError
 
 _log = logging.getLogger(__name__)
 
@@ -30,6 +48,28 @@ _DB_PORT = 27017
 _DB_USERNAME_FILE_ENV_VAR = 'MYAKU_CRAWLDB_USERNAME_FILE'
 _DB_PASSWORD_FILE_ENV_VAR = 'MYAKU_CRAWLDB_PASSWORD_FILE'
 
+# Maps the MongoClient pool and timeout options that can be configured from
+# the environment to the environment variable for each. The options must be
+# integers.
+_DB_CLIENT_OPTION_ENV_VARS = {
+    'maxPoolSize': 'MYAKU_CRAWLDB_MAX_POOL_SIZE',
+    'minPoolSize': 'MYAKU_CRAWLDB_MIN_POOL_SIZE',
+    'maxIdleTimeMS': 'MYAKU_CRAWLDB_MAX_IDLE_TIME_MS',
+    'waitQueueTimeoutMS': 'MYAKU_CRAWLDB_WAIT_QUEUE_TIMEOUT_MS',
+    'connectTimeoutMS': 'MYAKU_CRAWLDB_CONNECT_TIMEOUT_MS',
+    'serverSelectionTimeoutMS': 'MYAKU_CRAWLDB_SERVER_SELECTION_TIMEOUT_MS',
+}
+
+# Number of docs copied with each bulk insert during a bulk db copy.
+_BULK_COPY_BATCH_SIZE = 1000
+
+# Number of article counts written per bulk write when reconciling counts.
+_RECONCILE_BATCH_SIZE = 1000
+
+# The start (inclusive) and end (exclusive) _id of a range of docs in a
+# collection. A None start or end means the range is unbounded on that side.
+_IdRange = Tuple[Optional[ObjectId], Optional[ObjectId]]
+
 
 def copy_db_data(
     src_host: str, src_username: str, src_password: str,
@@ -39,14 +79,19 @@ def copy_db_data(
 
     The source database data must not change during the duration of the copy.
 
+    The lexical item posting lists are not copied because the copied articles
+    can be given new ObjectIds, so the posting lists of the destination
+    database should be rebuilt with the build_posting_lists runner after the
+    copy.
+
     The given username and password should be for the root user for each
     database.
     """
-    src_client = MongoClient(
+    src_client: MongoClient = MongoClient(
         host=src_host, port=_DB_PORT, username=src_username,
         password=src_password
     )
-    dest_client = MongoClient(
+    dest_client: MongoClient = MongoClient(
         host=dest_host, port=_DB_PORT, username=dest_username,
         password=dest_password
     )
@@ -128,6 +173,618 @@ def _copy_db_collection_data(
     return new_id_map
 
 
+class _BulkCopyCheckpoint(object):
+    """Progress of a bulk db copy that can be saved to resume the copy.
+
+    For each collection being copied, tracks the _id ranges the collection
+    was split into, the last _id copied in each range, the _id changes made
+    to avoid collisions, and whether the copy of the collection is done.
+
+    Safe to update from multiple threads.
+    """
+
+    def __init__(self, filepath: Optional[str]) -> None:
+        """Load the checkpoint from the file if it exists.
+
+        Args:
+            filepath: Path of the file to save the checkpoint to. If None,
+                the checkpoint is not saved.
+        """
+        self._filepath = filepath
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}
+        if filepath is not None and os.path.exists(filepath):
+            with open(filepath, 'r') as checkpoint_file:
+                self._state = json.load(checkpoint_file)
+            _log.info('Resuming bulk copy from checkpoint "%s"', filepath)
+
+    def has_collection(self, collection_name: str) -> bool:
+        """Return True if the copy of the collection has been started."""
+        return collection_name in self._state
+
+    def is_collection_done(self, collection_name: str) -> bool:
+        """Return True if the copy of the collection is done."""
+        return self._state[collection_name]['done']
+
+    def start_collection(
+        self, collection_name: str, id_ranges: List[_IdRange]
+    ) -> None:
+        """Start tracking the copy of a collection split into the ranges."""
+        with self._lock:
+            self._state[collection_name] = {
+                'done': False,
+                'ranges': [
+                    [_oid_to_str(start), _oid_to_str(end), None]
+                    for start, end in id_ranges
+                ],
+                'new_id_map': {},
+            }
+            self._save()
+
+    def finish_collection(self, collection_name: str) -> None:
+        """Mark the copy of a collection as done."""
+        with self._lock:
+            self._state[collection_name]['done'] = True
+            self._save()
+
+    def get_range_count(self, collection_name: str) -> int:
+        """Get the number of ranges the collection was split into."""
+        return len(self._state[collection_name]['ranges'])
+
+    def get_range(
+        self, collection_name: str, range_index: int
+    ) -> Tuple[Optional[ObjectId], Optional[ObjectId], Optional[ObjectId]]:
+        """Get the start, end, and last copied _id of a range."""
+        with self._lock:
+            start_id, end_id, last_id = (
+                self._state[collection_name]['ranges'][range_index]
+            )
+        return (
+            _str_to_oid(start_id), _str_to_oid(end_id), _str_to_oid(last_id)
+        )
+
+    def get_new_id_map(self, collection_name: str) -> Dict[ObjectId, ObjectId]:
+        """Get the _id changes made to avoid collisions in the collection."""
+        with self._lock:
+            return {
+                ObjectId(old_id): ObjectId(new_id) for old_id, new_id in
+                self._state[collection_name]['new_id_map'].items()
+            }
+
+    def get_new_ids(
+        self, collection_name: str, old_ids: List[ObjectId]
+    ) -> Dict[ObjectId, ObjectId]:
+        """Get the _id changes already recorded for the given old _ids."""
+        with self._lock:
+            new_id_map = self._state[collection_name]['new_id_map']
+            return {
+                old_id: ObjectId(new_id_map[str(old_id)])
+                for old_id in old_ids if str(old_id) in new_id_map
+            }
+
+    def add_new_ids(
+        self, collection_name: str, new_id_map: Dict[ObjectId, ObjectId]
+    ) -> None:
+        """Record _id changes made to avoid collisions in the collection.
+
+        Should be called before the docs are inserted with their new _ids, so
+        that a resumed copy reuses the same new _ids for the docs.
+        """
+        with self._lock:
+            self._state[collection_name]['new_id_map'].update(
+                (str(old_id), str(new_id))
+                for old_id, new_id in new_id_map.items()
+            )
+            self._save()
+
+    def update_range(
+        self, collection_name: str, range_index: int, last_id: ObjectId
+    ) -> None:
+        """Record that the docs in a range up to last_id have been copied.
+
+        Args:
+            collection_name: Name of the collection being copied.
+            range_index: Index of the range the docs were copied from.
+            last_id: The last _id in the range that has been copied.
+        """
+        with self._lock:
+            self._state[collection_name]['ranges'][range_index][2] = str(
+                last_id
+            )
+            self._save()
+
+    def _save(self) -> None:
+        """Save the checkpoint to its file if it has one.
+
+        Must be called while holding the lock.
+        """
+        if self._filepath is None:
+            return
+
+        temp_filepath = self._filepath + '.tmp'
+        with open(temp_filepath, 'w') as checkpoint_file:
+            json.dump(self._state, checkpoint_file)
+        os.replace(temp_filepath, self._filepath)
+
+
+def _oid_to_str(oid: Optional[ObjectId]) -> Optional[str]:
+    """Convert an ObjectId that may be None to a str."""
+    return None if oid is None else str(oid)
+
+
+def _str_to_oid(oid_str: Optional[str]) -> Optional[ObjectId]:
+    """Convert a str that may be None to an ObjectId."""
+    return None if oid_str is None else ObjectId(oid_str)
+
+
+def bulk_copy_db_data(
+    src_host: str, src_username: str, src_password: str,
+    dest_host: str, dest_username: str, dest_password: str,
+    worker_count: int = 4, checkpoint_filepath: str = None
+) -> None:
+    """Copy all Myaku data from one ArticleIndexDb to another in bulk.
+
+    Gives the same result as copy_db_data, but copies the docs of each
+    collection in batches with bulk inserts using multiple worker threads
+    that each copy a separate _id range of the collection.
+
+    Unlike copy_db_data, a doc is only compared with the doc with the same _id
+    in the destination to decide whether it is already in the destination, so
+    docs with equal content but a different _id are copied again.
+
+    Like copy_db_data, the lexical item posting lists are not copied and
+    should be rebuilt in the destination after the copy.
+
+    The source database data must not change during the duration of the copy.
+
+    The given username and password should be for the root user for each
+    database.
+
+    Args:
+        src_host: Host of the source db.
+        src_username: Root username for the source db.
+        src_password: Root password for the source db.
+        dest_host: Host of the destination db.
+        dest_username: Root username for the destination db.
+        dest_password: Root password for the destination db.
+        worker_count: Number of worker threads to copy with.
+        checkpoint_filepath: If not None, the progress of the copy is saved
+            to this file after every batch, and if the file already exists,
+            the copy resumes from the progress saved in it. The file should
+            be deleted once the copy completes.
+    """
+    src_client: MongoClient = MongoClient(
+        host=src_host, port=_DB_PORT, username=src_username,
+        password=src_password
+    )
+    dest_client: MongoClient = MongoClient(
+        host=dest_host, port=_DB_PORT, username=dest_username,
+        password=dest_password
+    )
+    checkpoint = _BulkCopyCheckpoint(checkpoint_filepath)
+
+    with closing(src_client) as src, closing(dest_client) as dest:
+        blog_new_id_map = _bulk_copy_db_collection_data(
+            src, dest, ArticleIndexDb._BLOG_COLL_NAME, worker_count,
+            checkpoint
+        )
+        article_new_id_map = _bulk_copy_db_collection_data(
+            src, dest, ArticleIndexDb._ARTICLE_COLL_NAME, worker_count,
+            checkpoint, {'blog_oid': blog_new_id_map}
+        )
+        _bulk_copy_db_collection_data(
+            src, dest, ArticleIndexDb._FOUND_LEXICAL_ITEM_COLL_NAME,
+            worker_count, checkpoint, {'article_oid': article_new_id_map}
+        )
+
+
+def _bulk_copy_db_collection_data(
+    src_client: MongoClient, dest_client: MongoClient, collection_name: str,
+    worker_count: int, checkpoint: _BulkCopyCheckpoint,
+    new_foreign_key_maps: Dict[str, Dict[ObjectId, ObjectId]] = None
+) -> Dict[ObjectId, ObjectId]:
+    """Copy all docs in a collection in bulk from one db to another.
+
+    See _copy_db_collection_data for the args and return value. The copy
+    progress is tracked in the checkpoint.
+    """
+    _log.info(
+        'Bulk copying "%s" collection documents from "%s" to "%s"',
+        collection_name, src_client.address[0], dest_client.address[0]
+    )
+    if new_foreign_key_maps is None:
+        new_foreign_key_maps = {}
+
+    src_coll = src_client[ArticleIndexDb._DB_NAME][collection_name]
+    dest_coll = dest_client[ArticleIndexDb._DB_NAME][collection_name]
+    if not checkpoint.has_collection(collection_name):
+        checkpoint.start_collection(
+            collection_name, _get_bulk_copy_id_ranges(src_coll, worker_count)
+        )
+    if checkpoint.is_collection_done(collection_name):
+        _log.info(
+            'Copy of "%s" collection already done in checkpoint',
+            collection_name
+        )
+        return checkpoint.get_new_id_map(collection_name)
+
+    with ThreadPoolExecutor(worker_count) as executor:
+        futures = [
+            executor.submit(
+                _bulk_copy_id_range, src_coll, dest_coll, range_index,
+                checkpoint, new_foreign_key_maps
+            )
+            for range_index in range(
+                checkpoint.get_range_count(collection_name)
+            )
+        ]
+        for future in futures:
+            future.result()
+
+    checkpoint.finish_collection(collection_name)
+    return checkpoint.get_new_id_map(collection_name)
+
+
+def _get_bulk_copy_id_ranges(
+    collection: Collection, range_count: int
+) -> List[_IdRange]:
+    """Split the docs in a collection into _id ranges of about equal size."""
+    total_docs = collection.estimated_document_count()
+    boundaries: List[ObjectId] = []
+    for i in range(1, range_count):
+        docs = list(
+            collection.find({}, {'_id': 1}).sort('_id', pymongo.ASCENDING)
+            .skip(i * total_docs // range_count).limit(1)
+        )
+        if len(docs) > 0 and (
+            len(boundaries) == 0 or docs[0]['_id'] > boundaries[-1]
+        ):
+            boundaries.append(docs[0]['_id'])
+
+    return list(zip([None] + boundaries, boundaries + [None]))
+
+
+def _bulk_copy_id_range(
+    src_coll: Collection, dest_coll: Collection, range_index: int,
+    checkpoint: _BulkCopyCheckpoint,
+    new_foreign_key_maps: Dict[str, Dict[ObjectId, ObjectId]]
+) -> None:
+    """Copy the docs in a tracked _id range of a collection in batches.
+
+    Resumes from the last _id copied in the range in the checkpoint.
+    """
+    start_id, end_id, last_id = checkpoint.get_range(
+        src_coll.name, range_index
+    )
+    id_query = {}
+    if last_id is not None:
+        id_query['$gt'] = last_id
+    elif start_id is not None:
+        id_query['$gte'] = start_id
+    if end_id is not None:
+        id_query['$lt'] = end_id
+
+    cursor = src_coll.find(
+        {'_id': id_query} if id_query else {},
+        sort=[('_id', pymongo.ASCENDING)], batch_size=_BULK_COPY_BATCH_SIZE
+    )
+    copied = 0
+    skipped = 0
+    batch: List[Document] = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) < _BULK_COPY_BATCH_SIZE:
+            continue
+
+        batch_skipped = _bulk_copy_docs(
+            dest_coll, batch, range_index, checkpoint, new_foreign_key_maps
+        )
+        copied += len(batch) - batch_skipped
+        skipped += batch_skipped
+        batch = []
+        _log.info(
+            'Range %s of "%s": %s documents copied, %s skipped', range_index,
+            src_coll.name, copied, skipped
+        )
+
+    if len(batch) > 0:
+        batch_skipped = _bulk_copy_docs(
+            dest_coll, batch, range_index, checkpoint, new_foreign_key_maps
+        )
+        copied += len(batch) - batch_skipped
+        skipped += batch_skipped
+
+    _log.info(
+        'Completed range %s of "%s": %s documents copied, %s skipped',
+        range_index, src_coll.name, copied, skipped
+    )
+
+
+def _bulk_copy_docs(
+    dest_coll: Collection, docs: List[Document], range_index: int,
+    checkpoint: _BulkCopyCheckpoint,
+    new_foreign_key_maps: Dict[str, Dict[ObjectId, ObjectId]]
+) -> int:
+    """Copy a batch of docs sorted by _id to the destination collection.
+
+    Docs whose _id is already used by an equal doc in the destination are
+    skipped. Docs whose _id is used by a different doc in the destination are
+    copied with a new _id. The new _id is recorded in the checkpoint before
+    the doc is inserted, so if the copy is resumed after the doc is inserted
+    but before the range is updated, the doc is skipped instead of being
+    copied again with another new _id.
+
+    Returns:
+        The number of docs skipped.
+    """
+    # The _id of collided docs is replaced during the copy, so get the last
+    # _id copied now.
+    last_id = docs[-1]['_id']
+    for doc in docs:
+        for (field, new_foreign_key_map) in new_foreign_key_maps.items():
+            if doc[field] in new_foreign_key_map:
+                doc[field] = new_foreign_key_map[doc[field]]
+
+    dest_id_doc_map = {
+        dest_doc['_id']: dest_doc for dest_doc in dest_coll.find(
+            {'_id': {'$in': [doc['_id'] for doc in docs]}}
+        )
+    }
+    new_docs = []
+    collided_docs = []
+    for doc in docs:
+        dest_doc = dest_id_doc_map.get(doc['_id'])
+        if dest_doc is None:
+            new_docs.append(doc)
+        elif dest_doc != doc:
+            collided_docs.append(doc)
+
+    if len(new_docs) > 0:
+        dest_coll.insert_many(new_docs, ordered=False)
+
+    collided_inserted_count = 0
+    if len(collided_docs) > 0:
+        collided_inserted_count = _copy_collided_docs(
+            dest_coll, collided_docs, checkpoint
+        )
+
+    checkpoint.update_range(dest_coll.name, range_index, last_id)
+    return len(docs) - len(new_docs) - collided_inserted_count
+
+
+def _copy_collided_docs(
+    dest_coll: Collection, collided_docs: List[Document],
+    checkpoint: _BulkCopyCheckpoint
+) -> int:
+    """Copy docs whose _id collides in the destination with new _ids.
+
+    Reuses the new _id recorded in the checkpoint for a doc if there is one,
+    and skips the doc if it is already in the destination with that new _id.
+
+    Returns:
+        The number of docs inserted.
+    """
+    old_ids = [doc['_id'] for doc in collided_docs]
+    new_id_map = checkpoint.get_new_ids(dest_coll.name, old_ids)
+    unrecorded_new_id_map = {
+        old_id: ObjectId() for old_id in old_ids if old_id not in new_id_map
+    }
+    if len(unrecorded_new_id_map) > 0:
+        checkpoint.add_new_ids(dest_coll.name, unrecorded_new_id_map)
+        new_id_map.update(unrecorded_new_id_map)
+
+    for doc in collided_docs:
+        doc['_id'] = new_id_map[doc['_id']]
+    copied_new_ids = {
+        dest_doc['_id'] for dest_doc in dest_coll.find(
+            {'_id': {'$in': list(new_id_map.values())}}, {'_id': 1}
+        )
+    }
+    insert_docs = [
+        doc for doc in collided_docs if doc['_id'] not in copied_new_ids
+    ]
+    if len(insert_docs) > 0:
+        dest_coll.insert_many(insert_docs, ordered=False)
+
+    for old_id in old_ids:
+        _log.info('_id collision: %s -> %s', old_id, new_id_map[old_id])
+    return len(insert_docs)
+
+
+class _PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Listener that counts the connection pool events for a MongoClient."""
+
+    def __init__(self) -> None:
+        """Init all counts to zero."""
+        self._lock = threading.Lock()
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+
+    def _increment(self, attr: str) -> None:
+        """Increment the count for attr."""
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def connection_created(self, event) -> None:
+        """Count a created connection."""
+        self._increment('connections_created')
+
+    def connection_closed(self, event) -> None:
+        """Count a closed connection."""
+        self._increment('connections_closed')
+
+    def connection_checked_out(self, event) -> None:
+        """Count a connection checkout."""
+        self._increment('checkouts')
+
+    def connection_check_out_failed(self, event) -> None:
+        """Count a failed connection checkout."""
+        self._increment('checkout_failures')
+
+    def pool_created(self, event) -> None:
+        """Ignore pool creation."""
+        pass
+
+    def pool_cleared(self, event) -> None:
+        """Ignore pool clearing."""
+        pass
+
+    def pool_closed(self, event) -> None:
+        """Ignore pool closing."""
+        pass
+
+    def connection_ready(self, event) -> None:
+        """Ignore connection readiness."""
+        pass
+
+    def connection_check_out_started(self, event) -> None:
+        """Ignore connection checkout starts."""
+        pass
+
+    def connection_checked_in(self, event) -> None:
+        """Ignore connection check ins."""
+        pass
+
+
+# Key for a pooled client made of the host, username, and access mode.
+_PooledClientKey = Tuple[str, str, DataAccessMode]
+
+
+class _PooledClientRegistry(object):
+    """Process-wide registry of pooled MongoClients.
+
+    MongoClient objects must not be used across a fork, so if the registry is
+    used in a different process than the one its clients were created in, the
+    clients are discarded and new clients are created for the new process.
+    """
+
+    def __init__(self) -> None:
+        """Init an empty registry for the current process."""
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        """Discard all clients in the registry without closing them."""
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._clients: Dict[_PooledClientKey, MongoClient] = {}
+        self._listeners: Dict[_PooledClientKey, _PoolStatsListener] = {}
+        self._lease_counts: Dict[_PooledClientKey, int] = {}
+        self._indexed_keys: Set[_PooledClientKey] = set()
+
+    def get_client(
+        self, hostname: str, username: str, password: str,
+        access_mode: DataAccessMode, auth_source: str
+    ) -> MongoClient:
+        """Get the pooled client for the host, user, and access mode.
+
+        Creates the client if there is not one in the registry yet.
+        """
+        if os.getpid() != self._pid:
+            # Forks done outside of Python (such as by uWSGI) don't run the
+            # register_at_fork hooks, so also check the pid.
+            self._reset()
+
+        key = (hostname, username, access_mode)
+        with self._lock:
+            self._lease_counts[key] = self._lease_counts.get(key, 0) + 1
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+
+            listener = _PoolStatsListener()
+            client = MongoClient(
+                host=hostname, port=_DB_PORT, username=username,
+                password=password, authSource=auth_source,
+                event_listeners=[listener], **_get_db_client_options()
+            )
+            self._clients[key] = client
+            self._listeners[key] = listener
+
+        _log.debug(
+            'Created pooled MongoDB client for %s:%s as user %s with %s '
+            'access', hostname, _DB_PORT, username, access_mode.name
+        )
+        return client
+
+    def should_create_indexes(
+        self, hostname: str, username: str, access_mode: DataAccessMode
+    ) -> bool:
+        """Return True the first time called for a pooled client key.
+
+        Used so that the db indexes are only ensured once per process.
+        """
+        key = (hostname, username, access_mode)
+        with self._lock:
+            if key in self._indexed_keys:
+                return False
+            self._indexed_keys.add(key)
+            return True
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the pool stats for each client in the registry.
+
+        Returns:
+            A mapping from a "host/username/access mode" str for each client
+            to the stats for the client.
+        """
+        stats = {}
+        with self._lock:
+            for key, listener in self._listeners.items():
+                stats['{}/{}/{}'.format(key[0], key[1], key[2].name)] = {
+                    'leases': self._lease_counts[key],
+                    'connections_created': listener.connections_created,
+                    'connections_closed': listener.connections_closed,
+                    'checkouts': listener.checkouts,
+                    'checkout_failures': listener.checkout_failures,
+                }
+        return stats
+
+
+def _get_db_client_options() -> Dict[str, Any]:
+    """Get the MongoClient pool and timeout options set in the environment.
+
+    Options whose environment variable is not set are left out so that the
+    MongoClient defaults are used for them.
+
+    Raises:
+        EnvironmentNotSetError: The environment variable for an option is set
+            to a value that is not a non-negative integer.
+    """
+    options: Dict[str, Any] = {}
+    for option, env_var in _DB_CLIENT_OPTION_ENV_VARS.items():
+        value_str = os.environ.get(env_var)
+        if value_str is None or len(value_str) == 0:
+            continue
+
+        if not value_str.isdigit():
+            utils.log_and_raise(
+                _log, EnvironmentNotSetError,
+                'Environment variable "{}" is set to "{}" instead of a '
+                'non-negative integer'.format(env_var, value_str)
+            )
+        options[option] = int(value_str)
+    return options
+
+
+_pooled_client_registry = _PooledClientRegistry()
+
+
+def get_db_client_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Get the stats for the pooled db clients of this process.
+
+    Returns:
+        A mapping from a "host/username/access mode" str for each pooled
+        client to a dict with the number of times the client was leased to an
+        ArticleIndexDb, and the number of connections created and closed,
+        connection checkouts, and failed connection checkouts by its pool.
+    """
+    return _pooled_client_registry.get_stats()
+
+
 def _require_db_connection(func: Callable) -> Callable:
     """Enforce that the database connection is initialized before running func.
 
@@ -159,6 +816,8 @@ class ArticleIndexDb(object):
     _BLOG_COLL_NAME = 'blogs'
     _CRAWL_SKIP_COLL_NAME = 'crawl_skip'
     _FOUND_LEXICAL_ITEM_COLL_NAME = 'found_lexical_items'
+    _POSTING_LIST_COLL_NAME = 'lexical_item_postings'
+    _ARTICLE_COUNT_COLL_NAME = 'lexical_item_article_counts'
     _RESCORE_TRACKING_COLL_NAME = 'rescore_tracking'
 
     QUERY_TYPE_QUERY_FIELD_MAP = {
@@ -173,6 +832,18 @@ class ArticleIndexDb(object):
         QueryType.POSSIBLE_ALT_FORMS: 'quality_score_possible',
     }
 
+    # Max number of postings stored in a lexical item posting list. A posting
+    # is about 100 bytes with one base form plus about 20 bytes for each
+    # other base form, so this keeps the posting list docs under the MongoDB
+    # 16MB doc size limit unless the postings average around 20 base forms
+    # each. Posting lists for queries whose posting count goes over this are
+    # no longer maintained and have their postings dropped.
+    MAX_POSTING_LIST_LEN = 2**15  # 32,768
+
+    # Sort order of the postings in a lexical item posting list. Matches the
+    # ranked order of the search results for the query of the posting list.
+    _POSTING_SORT = {'score': -1, 'last_updated': -1, 'article_oid': -1}
+
     @property
     def article_collection(self) -> Collection:
         """Article collection from the aritcle index database."""
@@ -197,6 +868,18 @@ class ArticleIndexDb(object):
         self._connect_to_db()
         return self._found_lexical_item_collection
 
+    @property
+    def posting_list_collection(self) -> Collection:
+        """Lexical item posting list collection from the index database."""
+        self._connect_to_db()
+        return self._posting_list_collection
+
+    @property
+    def article_count_collection(self) -> Collection:
+        """Lexical item article count collection from the index database."""
+        self._connect_to_db()
+        return self._article_count_collection
+
     @property
     def rescore_tracking_collection(self) -> Collection:
         """Rescore tracking collection from the aritcle index database."""
@@ -227,11 +910,14 @@ class ArticleIndexDb(object):
         self.access_mode = access_mode
 
         self._mongo_client: MongoClient = None
+        self._client_key: _PooledClientKey = None
         self._db: Database = None
         self._article_collection: Collection = None
         self._blog_collectio: Collection = None
         self._crawl_skip_collectio: Collection = None
         self._found_lexical_item_collectio: Collection = None
+        self._posting_list_collection: Collection = None
+        self._article_count_collection: Collection = None
         self._rescore_tracking_collectio: Collection = None
         self._crawlable_coll_map: Dict[Type[Crawlable], Collection] = None
 
@@ -256,6 +942,12 @@ class ArticleIndexDb(object):
         self._found_lexical_item_collection = (
             self._db[self._FOUND_LEXICAL_ITEM_COLL_NAME]
         )
+        self._posting_list_collection = (
+            self._db[self._POSTING_LIST_COLL_NAME]
+        )
+        self._article_count_collection = (
+            self._db[self._ARTICLE_COUNT_COLL_NAME]
+        )
         self._rescore_tracking_collection = (
             self._db[self._RESCORE_TRACKING_COLL_NAME]
         )
@@ -265,14 +957,26 @@ class ArticleIndexDb(object):
             JpnArticleBlog: self.blog_collection,
         }
 
-        if self.access_mode.has_write_permission():
+        if (
+            self.access_mode.has_write_permission()
+            and _pooled_client_registry.should_create_indexes(
+                *self._client_key
+            )
+        ):
             self._create_indexes()
 
     def _init_mongo_client(self) -> MongoClient:
-        """Initialize and return the mongo client for connecting to database.
+        """Get the pooled mongo client for connecting to database.
+
+        All ArticleIndexDb objects in a process with the same access mode
+        share a pooled client, so connections to the database are reused
+        instead of being set up again for each object.
+
+        The pool and timeout options of the client can be set with the
+        environment variables in _DB_CLIENT_OPTION_ENV_VARS.
 
         Returns:
-            A client object connected and authenticated with the database.
+            A client object for the database.
 
         Raises:
             EnvironmentNotSetError: if a needed value from the environment to
@@ -281,18 +985,12 @@ class ArticleIndexDb(object):
         username = utils.get_value_from_env_file(_DB_USERNAME_FILE_ENV_VAR)
         password = utils.get_value_from_env_file(_DB_PASSWORD_FILE_ENV_VAR)
         hostname = utils.get_value_from_env_variable(_DB_HOST_ENV_VAR)
+        self._client_key = (hostname, username, self.access_mode)
 
-        mongo_client = MongoClient(
-            host=hostname, port=_DB_PORT,
-            username=username, password=password, authSource=self._DB_NAME
-        )
-        _log.debug(
-            'Connected to MongoDB at %s:%s as user %s',
-            mongo_client.address[0], mongo_client.address[1], username
+        return _pooled_client_registry.get_client(
+            hostname, username, password, self.access_mode, self._DB_NAME
         )
 
-        return mongo_client
-
     @require_write_permission
     @_require_db_connection
     def _create_indexes(self) -> None:
@@ -301,7 +999,10 @@ class ArticleIndexDb(object):
         self.article_collection.create_index('last_updated_datetime')
         self.article_collection.create_index('blog_oid')
         self.crawl_skip_collection.create_index('source_url')
-        self.found_lexical_item_collection.create_index('article_oid')
+        self.found_lexical_item_collection.create_index([
+            ('article_oid', pymongo.ASCENDING),
+            ('base_form', pymongo.ASCENDING),
+        ])
 
         for crawlable_collection in self.crawlable_coll_map.values():
             crawlable_collection.create_index([
@@ -322,10 +1023,24 @@ class ArticleIndexDb(object):
                 name=query_field + '_search'
             )
 
+        for query_key_collection in [
+            self.posting_list_collection, self.article_count_collection
+        ]:
+            query_key_collection.create_index(
+                [
+                    ('query_type', pymongo.ASCENDING),
+                    ('query_str', pymongo.ASCENDING),
+                ],
+                unique=True
+            )
+
     def close(self) -> None:
-        """Close the connection to the database."""
-        if self._mongo_client is not None:
-            self._mongo_client.close()
+        """Release the connection to the database.
+
+        The pooled client is kept open for use by other ArticleIndexDb
+        objects, so this only drops the reference to it.
+        """
+        self._mongo_client = None
 
     def __enter__(self) -> 'ArticleIndexDb':
         """Initialize the connection to the database."""
@@ -432,3 +1147,544 @@ class ArticleIndexDb(object):
             len(object_ids), collection.full_name
         )
         return object_ids
+
+    @require_write_permission
+    @_require_db_connection
+    def bulk_replace_write_with_log(
+        self, docs: List[Document], collection: Collection, id_field: str
+    ) -> List[ObjectId]:
+        """Write or replace with docs in bulk with logging.
+
+        Does the same as replace_write_with_log, but sends all of the writes
+        and replaces in a single bulk write and then reads the ObjectIds for
+        all of the docs in a single query, so only two round trips to the
+        database are made regardless of the number of docs.
+
+        If multiple docs have the same id_field value, the last of those docs
+        is the one written.
+
+        Args:
+            docs: Documents to write or replace with.
+            collection: Collection to perform writes and replaces on.
+            id_field: Field from the doc that can be used to uniquely id a doc
+                in the collection. Should be an indexed field to ensure high
+                performance.
+
+        Returns:
+            The list of the ObjectIds stored for the given docs. The ObjectId
+            list is in the order of the given docs list.
+        """
+        if len(docs) == 0:
+            return []
+
+        id_doc_map = {doc[id_field]: doc for doc in docs}
+        _log.debug(
+            'Will bulk write replace %s documents to "%s" collection',
+            len(id_doc_map), collection.full_name
+        )
+        collection.bulk_write(
+            [
+                ReplaceOne({id_field: id_value}, doc, upsert=True)
+                for id_value, doc in id_doc_map.items()
+            ],
+            ordered=False
+        )
+
+        written_docs = self.read_with_log(
+            id_field, list(id_doc_map), collection, {id_field: 1}
+        )
+        id_oid_map = {doc[id_field]: doc['_id'] for doc in written_docs}
+        _log.debug(
+            'Bulk wrote replaced %s documents to "%s" collection',
+            len(id_oid_map), collection.full_name
+        )
+        return [id_oid_map[doc[id_field]] for doc in docs]
+
+    def _get_query_key_filter(
+        self, query_type: QueryType, query_str: str
+    ) -> Document:
+        """Get the filter for the posting list or article count for a query."""
+        return {'query_type': query_type.value, 'query_str': query_str}
+
+    def _get_postings_push(self, postings: List[Document]) -> Document:
+        """Get the $push modifiers to add postings to a posting list."""
+        return {
+            '$each': postings,
+            '$sort': self._POSTING_SORT,
+            '$slice': self.MAX_POSTING_LIST_LEN,
+        }
+
+    def _get_capped_push_requests(
+        self, query_key: Tuple[QueryType, str], postings: List[Document]
+    ) -> List[UpdateOne]:
+        """Get the requests to add postings to a posting list up to the cap.
+
+        Must be done after the posting count of the posting list has been
+        incremented for the postings. If the count is now over
+        MAX_POSTING_LIST_LEN, the postings are not added and the existing
+        postings of the posting list are dropped instead, so the posting list
+        can't be used even if the article count for its query is lowered later.
+        """
+        posting_list_filter = self._get_query_key_filter(*query_key)
+        return [
+            UpdateOne(
+                {
+                    **posting_list_filter,
+                    'posting_count': {'$lte': self.MAX_POSTING_LIST_LEN},
+                },
+                {'$push': {'postings': self._get_postings_push(postings)}}
+            ),
+            UpdateOne(
+                {
+                    **posting_list_filter,
+                    'posting_count': {'$gt': self.MAX_POSTING_LIST_LEN},
+                    'postings': {'$exists': True},
+                },
+                {'$unset': {'postings': ''}}
+            ),
+        ]
+
+    def _add_to_article_posting(
+        self, article_posting_map: Dict[ObjectId, Document],
+        found_lexical_item_doc: Document, score_field: str
+    ) -> None:
+        """Add a found lexical item doc to the posting for its article.
+
+        Args:
+            article_posting_map: Map from article ObjectIds to the posting for
+                that article in a posting list.
+            found_lexical_item_doc: Found lexical item doc matching the query
+                of the posting list.
+            score_field: Name of the field in the found lexical item doc with
+                the quality score for the query type of the posting list.
+        """
+        doc = found_lexical_item_doc
+        posting = article_posting_map.get(doc['article_oid'])
+        if posting is None:
+            article_posting_map[doc['article_oid']] = {
+                'score': doc[score_field],
+                'last_updated': doc['article_last_updated_datetime'],
+                'article_oid': doc['article_oid'],
+                'base_forms': [doc['base_form']],
+            }
+            return
+
+        posting['score'] = max(posting['score'], doc[score_field])
+        posting['base_forms'].append(doc['base_form'])
+
+    def _get_postings(
+        self, found_lexical_item_docs: List[Document]
+    ) -> Dict[Tuple[QueryType, str], List[Document]]:
+        """Get the postings for the articles of found lexical item docs.
+
+        Each article gets only one posting in a posting list even if multiple
+        of its found lexical items match the query of the posting list. The
+        score of that posting is the highest score of those found lexical
+        items like for the merged search results of the article, and the
+        posting has the base forms of all of those found lexical items.
+
+        Returns:
+            A mapping from the (query type, query str) key of each posting
+            list the found lexical items belong in to the postings to add to
+            that posting list.
+        """
+        key_article_posting_map: DefaultDict[
+            Tuple[QueryType, str], Dict[ObjectId, Document]
+        ] = defaultdict(dict)
+        for doc in found_lexical_item_docs:
+            for query_type in QueryType:
+                query_field = self.QUERY_TYPE_QUERY_FIELD_MAP[query_type]
+                score_field = self.QUERY_TYPE_SCORE_FIELD_MAP[query_type]
+                article_posting_map = key_article_posting_map[
+                    (query_type, doc[query_field])
+                ]
+
+                self._add_to_article_posting(
+                    article_posting_map, doc, score_field
+                )
+
+        return {
+            key: list(article_posting_map.values())
+            for key, article_posting_map in key_article_posting_map.items()
+        }
+
+    @require_write_permission
+    @_require_db_connection
+    def add_to_posting_lists_and_counts(
+        self, found_lexical_item_docs: List[Document]
+    ) -> None:
+        """Add the articles of found lexical item docs to the query indexes.
+
+        The posting lists store the articles matching each query in ranked
+        order with only one posting per article, so any page of search results
+        for a query can be read with a single range read of its posting list.
+
+        The article counts store the number of articles matching each query,
+        so the total result count for a query can be read with a single point
+        lookup.
+
+        The posting counts of the posting lists are incremented with a bulk
+        write before the postings are added with another bulk write so that a
+        posting list is no longer maintained once its count is over
+        MAX_POSTING_LIST_LEN. The article counts are updated with a single
+        bulk write. The articles of the docs must not already be in the
+        posting lists or counts.
+
+        Args:
+            found_lexical_item_docs: Docs for all of the found lexical items
+                written to the database for the articles.
+        """
+        key_postings_map = self._get_postings(found_lexical_item_docs)
+        if len(key_postings_map) == 0:
+            return
+
+        _log.debug(
+            'Will add postings to %s posting lists in "%s" collection',
+            len(key_postings_map), self.posting_list_collection.full_name
+        )
+        self.posting_list_collection.bulk_write(
+            [
+                UpdateOne(
+                    self._get_query_key_filter(*key),
+                    {'$inc': {'posting_count': len(postings)}},
+                    upsert=True
+                )
+                for key, postings in key_postings_map.items()
+            ],
+            ordered=False
+        )
+        self.posting_list_collection.bulk_write(
+            [
+                request
+                for key, postings in key_postings_map.items()
+                for request in self._get_capped_push_requests(key, postings)
+            ],
+            ordered=False
+        )
+        self.article_count_collection.bulk_write(
+            [
+                UpdateOne(
+                    self._get_query_key_filter(*key),
+                    {'$inc': {'article_count': len(postings)}},
+                    upsert=True
+                )
+                for key, postings in key_postings_map.items()
+            ],
+            ordered=False
+        )
+        _log.debug(
+            'Added postings to %s posting lists in "%s" collection',
+            len(key_postings_map), self.posting_list_collection.full_name
+        )
+
+    @require_update_permission
+    @_require_db_connection
+    def update_article_postings(self, article_oid: ObjectId) -> None:
+        """Update the postings for an article to match its stored scores.
+
+        Should be called after the quality scores of the found lexical items
+        for the article are changed so that the article is moved to its new
+        rank in each of the posting lists it is in.
+        """
+        projection = {
+            'article_oid': 1, 'article_last_updated_datetime': 1,
+            'base_form': 1, '_id': 0,
+        }
+        for query_type in QueryType:
+            projection[self.QUERY_TYPE_QUERY_FIELD_MAP[query_type]] = 1
+            projection[self.QUERY_TYPE_SCORE_FIELD_MAP[query_type]] = 1
+
+        fli_docs = self.found_lexical_item_collection.find(
+            {'article_oid': article_oid}, projection
+        )
+        key_postings_map = self._get_postings(list(fli_docs))
+        if len(key_postings_map) == 0:
+            return
+
+        # The postings of an array can't be pulled and pushed in the same
+        # update, so the old posting is pulled first in an ordered bulk write.
+        requests = []
+        for key, postings in key_postings_map.items():
+            posting_list_filter = self._get_query_key_filter(*key)
+            requests.append(UpdateOne(
+                posting_list_filter,
+                {'$pull': {'postings': {'article_oid': article_oid}}}
+            ))
+            requests.append(UpdateOne(
+                {
+                    **posting_list_filter,
+                    'posting_count': {'$lte': self.MAX_POSTING_LIST_LEN},
+                },
+                {'$push': {'postings': self._get_postings_push(postings)}}
+            ))
+        self.posting_list_collection.bulk_write(requests, ordered=True)
+
+    @require_write_permission
+    @_require_db_connection
+    def rebuild_posting_list(
+        self, query_type: QueryType, query_str: str
+    ) -> None:
+        """Rebuild the posting list for a query from the found lexical items.
+
+        Also sets the posting count and article count for the query. The
+        postings are left out of the rebuilt posting list if the posting count
+        is over MAX_POSTING_LIST_LEN.
+
+        Args:
+            query_type: Query type of the posting list to rebuild.
+            query_str: Query str of the posting list to rebuild.
+        """
+        query_field = self.QUERY_TYPE_QUERY_FIELD_MAP[query_type]
+        score_field = self.QUERY_TYPE_SCORE_FIELD_MAP[query_type]
+        cursor = self.found_lexical_item_collection.find(
+            {query_field: query_str},
+            {
+                'article_oid': 1, 'article_last_updated_datetime': 1,
+                'base_form': 1, score_field: 1, '_id': 0,
+            }
+        )
+        cursor.sort([
+            (score_field, pymongo.DESCENDING),
+            ('article_last_updated_datetime', pymongo.DESCENDING),
+            ('article_oid', pymongo.DESCENDING),
+        ])
+
+        # The docs are in ranked order, so the postings are added to the map
+        # in ranked order as well.
+        article_posting_map: Dict[ObjectId, Document] = {}
+        for doc in cursor:
+            self._add_to_article_posting(article_posting_map, doc, score_field)
+        postings = list(article_posting_map.values())
+
+        posting_list_filter = self._get_query_key_filter(
+            query_type, query_str
+        )
+        posting_list_doc = {
+            **posting_list_filter, 'posting_count': len(postings),
+        }
+        if len(postings) <= self.MAX_POSTING_LIST_LEN:
+            posting_list_doc['postings'] = postings
+        self.posting_list_collection.replace_one(
+            posting_list_filter, posting_list_doc, upsert=True
+        )
+        self.article_count_collection.replace_one(
+            posting_list_filter,
+            {**posting_list_filter, 'article_count': len(postings)},
+            upsert=True
+        )
+
+    @require_write_permission
+    @_require_db_connection
+    def rebuild_posting_lists(self) -> None:
+        """Rebuild all of the posting lists and article counts."""
+        for query_type in QueryType:
+            query_field = self.QUERY_TYPE_QUERY_FIELD_MAP[query_type]
+            _log.info('Rebuilding %s posting lists...', query_type)
+            cursor = self.found_lexical_item_collection.aggregate([
+                {'$match': {query_field: {'$gt': ''}}},
+                {'$group': {'_id': '$' + query_field}},
+            ])
+            rebuild_count = 0
+            for doc in cursor:
+                self.rebuild_posting_list(query_type, doc['_id'])
+                rebuild_count += 1
+                if rebuild_count % 1000 == 0:
+                    _log.info(
+                        f'Rebuilt {rebuild_count:,} {query_type} posting '
+                        f'lists'
+                    )
+
+            _log.info(
+                f'Rebuilt all {rebuild_count:,} {query_type} posting lists'
+            )
+
+    @_require_db_connection
+    def read_posting_list_page(
+        self, query_type: QueryType, query_str: str, start_index: int,
+        max_postings: int, article_count: int
+    ) -> Optional[Document]:
+        """Read a range of the posting list for a query.
+
+        The posting list is only read if its posting count matches the stored
+        article count for the query. The counts only differ if a write to the
+        posting list was interrupted or repeated, in which case the posting
+        list may be missing postings or have extra postings and can't be used
+        until it is rebuilt.
+
+        Args:
+            query_type: Query type of the posting list to read.
+            query_str: Query str of the posting list to read.
+            start_index: Index of the first posting to read from the posting
+                list. Indexing starts at 0.
+            max_postings: Max number of postings to read from the posting
+                list.
+            article_count: Stored article count for the query.
+
+        Returns:
+            The read range of postings, or None if there is no complete
+            posting list for the query or the posting list is no longer
+            maintained because its posting count is over MAX_POSTING_LIST_LEN.
+
+            The caller should still check that the article count for the
+            query is not more than MAX_POSTING_LIST_LEN before reading the
+            postings to avoid the read for queries with too many articles.
+        """
+        posting_list_doc = self.posting_list_collection.find_one(
+            {
+                **self._get_query_key_filter(query_type, query_str),
+                'posting_count': article_count,
+            },
+            {'postings': {'$slice': [start_index, max_postings]}}
+        )
+        if posting_list_doc is None:
+            return None
+        return posting_list_doc.get('postings')
+
+    @_require_db_connection
+    def read_article_count(
+        self, query_type: QueryType, query_str: str
+    ) -> Optional[int]:
+        """Read the number of articles matching a query.
+
+        Returns:
+            The stored article count for the query, or None if there is no
+            article count stored for the query.
+        """
+        article_count_doc = self.article_count_collection.find_one(
+            self._get_query_key_filter(query_type, query_str),
+            {'article_count': 1, '_id': 0}
+        )
+        if article_count_doc is None:
+            return None
+        return article_count_doc['article_count']
+
+    @require_update_permission
+    @_require_db_connection
+    def reconcile_article_counts(self) -> int:
+        """Correct any stored article counts that have drifted.
+
+        Recounts the articles matching every query from the found lexical
+        items with one aggregation per query type and writes the counts in
+        bulk. Stored counts can drift from the found lexical items if a crawl
+        is interrupted between its writes or the found lexical items are
+        changed outside of ArticleIndexBuilder.
+
+        Any posting list whose posting count doesn't match the recounted
+        article count for its query is missing postings or has extra postings,
+        so it is marked as no longer maintained the same as a posting list
+        over MAX_POSTING_LIST_LEN. Those posting lists can only be used again
+        after they are rebuilt with rebuild_posting_lists.
+
+        Returns:
+            The number of article counts that had to be corrected or added.
+        """
+        corrected_count = 0
+        invalidated_count = 0
+        for query_type in QueryType:
+            query_field = self.QUERY_TYPE_QUERY_FIELD_MAP[query_type]
+            _log.info('Reconciling %s article counts...', query_type)
+            cursor = self.found_lexical_item_collection.aggregate(
+                [
+                    {'$match': {query_field: {'$gt': ''}}},
+                    {'$group': {
+                        '_id': {
+                            'query_str': '$' + query_field,
+                            'article_oid': '$article_oid',
+                        },
+                    }},
+                    {'$group': {
+                        '_id': '$_id.query_str',
+                        'article_count': {'$sum': 1},
+                    }},
+                ],
+                allowDiskUse=True
+            )
+
+            query_article_counts: Dict[str, int] = {}
+            for doc in cursor:
+                query_article_counts[doc['_id']] = doc['article_count']
+                if len(query_article_counts) == _RECONCILE_BATCH_SIZE:
+                    corrected_count += self._write_article_counts(
+                        query_type, query_article_counts
+                    )
+                    invalidated_count += self._invalidate_posting_lists(
+                        query_type, query_article_counts
+                    )
+                    query_article_counts = {}
+            if len(query_article_counts) > 0:
+                corrected_count += self._write_article_counts(
+                    query_type, query_article_counts
+                )
+                invalidated_count += self._invalidate_posting_lists(
+                    query_type, query_article_counts
+                )
+
+        _log.info('Corrected %s article counts', corrected_count)
+        if invalidated_count > 0:
+            _log.warning(
+                'Invalidated %s posting lists with posting counts not '
+                'matching their article counts. Rebuild the posting lists to '
+                'use them again.', invalidated_count
+            )
+        return corrected_count
+
+    def _write_article_counts(
+        self, query_type: QueryType, query_article_counts: Dict[str, int]
+    ) -> int:
+        """Write article counts and return how many changed counts.
+
+        Args:
+            query_type: Query type of the article counts.
+            query_article_counts: Map from query strs to the article count
+                for each query.
+        """
+        requests = [
+            UpdateOne(
+                self._get_query_key_filter(query_type, query_str),
+                {'$set': {'article_count': article_count}},
+                upsert=True
+            )
+            for query_str, article_count in query_article_counts.items()
+        ]
+        result = self.article_count_collection.bulk_write(
+            requests, ordered=False
+        )
+        return result.modified_count + result.upserted_count
+
+    def _invalidate_posting_lists(
+        self, query_type: QueryType, query_article_counts: Dict[str, int]
+    ) -> int:
+        """Stop maintaining posting lists that don't match their counts.
+
+        Args:
+            query_type: Query type of the posting lists to check.
+            query_article_counts: Map from query strs to the article count
+                for each query.
+
+        Returns:
+            The number of posting lists that were invalidated.
+        """
+        cursor = self.posting_list_collection.find(
+            {
+                'query_type': query_type.value,
+                'query_str': {'$in': list(query_article_counts)},
+                'posting_count': {'$lte': self.MAX_POSTING_LIST_LEN},
+            },
+            {'query_str': 1, 'posting_count': 1, '_id': 0}
+        )
+        requests = [
+            UpdateOne(
+                self._get_query_key_filter(query_type, doc['query_str']),
+                {
+                    '$set': {'posting_count': self.MAX_POSTING_LIST_LEN + 1},
+                    '$unset': {'postings': ''},
+                }
+            )
+            for doc in cursor
+            if doc['posting_count'] != query_article_counts[doc['query_str']]
+        ]
+        if len(requests) == 0:
+            return 0
+
+        self.posting_list_collection.bulk_write(requests, ordered=False)
+        return len(requests)
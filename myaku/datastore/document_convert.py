@@ -12,6 +12,7 @@ from myaku.datastore import Document, SearchResult
 from myaku.datatypes import (
     ArticleTextPosition,
     FoundJpnLexicalItem,
+    FoundLexicalItemBatch,
     InterpSource,
     JpnArticle,
     JpnArticleBlog,
@@ -21,6 +22,22 @@ from myaku.datatypes import (
 
 _log = logging.getLogger(__name__)
 
+# Projection for the fields of article documents used in displaying search
+# results. Documents read with this projection should be converted using
+# convert_docs_to_search_result_articles.
+SEARCH_RESULT_ARTICLE_PROJECTION = {
+    'title': 1,
+    'source_url': 1,
+    'source_name': 1,
+    'full_text': 1,
+    'sentence_ends': 1,
+    'alnum_count': 1,
+    'has_video': 1,
+    'publication_datetime': 1,
+    'last_updated_datetime': 1,
+    'quality_score': 1,
+}
+
 
 @functools.lru_cache(maxsize=1)
 def _get_myaku_version_doc() -> Document:
@@ -95,6 +112,7 @@ def convert_articles_to_docs(
             'last_updated_datetime': article.last_updated_datetime,
             'last_crawled_datetime': article.last_crawled_datetime,
             'text_hash': article.text_hash,
+            'sentence_ends': article.sentence_ends,
             'alnum_count': article.alnum_count,
             'has_video': article.has_video,
             'tags': article.tags,
@@ -225,6 +243,80 @@ def convert_found_lexical_items_to_docs(
     return docs
 
 
+def convert_found_lexical_item_batch_to_docs(
+    batch: FoundLexicalItemBatch, article_oid: ObjectId
+) -> List[Document]:
+    """Convert a batch of found lexical items to MongoDB BSON documents.
+
+    Gives the same documents as convert_found_lexical_items_to_docs would for
+    the found lexical items in the batch, but converts each distinct interp in
+    the batch only once and reads the found positions straight from the batch
+    arrays.
+
+    Args:
+        batch: Batch of found lexical items to convert to documents.
+        article_oid: The MongoDB ObjectId being used for the article of the
+            batch in the Myaku database.
+
+    Returns:
+        List of MongoDB BSON documents for the found lexical items in the
+        batch.
+    """
+    article = batch.article
+    version_doc = _get_myaku_version_doc()
+    interp_docs = convert_lexical_item_interps_to_docs(batch.interps)
+    position_docs = [
+        {'index': start, 'len': length}
+        for start, length in zip(batch.position_starts, batch.position_lens)
+    ]
+
+    docs = []
+    for i, base_form in enumerate(batch.base_forms):
+        position_start = batch.position_offsets[i]
+        found_positions_docs = position_docs[
+            position_start:batch.position_offsets[i + 1]
+        ]
+
+        item_interp_docs = []
+        interp_pos_map_doc = {}
+        for j in range(batch.interp_offsets[i], batch.interp_offsets[i + 1]):
+            item_interp_docs.append(interp_docs[batch.interp_ids[j]])
+
+            start = batch.interp_position_offsets[j]
+            end = batch.interp_position_offsets[j + 1]
+            if start != end:
+                interp_pos_map_doc[str(len(item_interp_docs) - 1)] = [
+                    position_docs[position_start + k]
+                    for k in batch.interp_position_indexes[start:end]
+                ]
+
+        quality_score_mod = batch.quality_score_mods[i]
+        quality_score = article.quality_score + quality_score_mod
+        docs.append({
+            'base_form': base_form,
+            'base_form_definite_group': base_form,
+            'base_form_possible_group': base_form,
+            'article_oid': article_oid,
+            'found_positions': found_positions_docs,
+            'found_positions_exact_count': len(found_positions_docs),
+            'found_positions_definite_count': len(found_positions_docs),
+            'found_positions_possible_count': len(found_positions_docs),
+            'possible_interps': item_interp_docs,
+            'interp_position_map': interp_pos_map_doc or None,
+            'quality_score_exact_mod': quality_score_mod,
+            'quality_score_definite_mod': quality_score_mod,
+            'quality_score_possible_mod': quality_score_mod,
+            'article_quality_score': article.quality_score,
+            'article_last_updated_datetime': article.last_updated_datetime,
+            'quality_score_exact': quality_score,
+            'quality_score_definite': quality_score,
+            'quality_score_possible': quality_score,
+            'myaku_version_info': version_doc,
+        })
+
+    return docs
+
+
 def convert_docs_to_blogs(
     docs: List[Document]
 ) -> Dict[ObjectId, JpnArticleBlog]:
@@ -283,6 +375,7 @@ def convert_docs_to_articles(
             source_url=doc['source_url'],
             source_name=doc['source_name'],
             full_text=doc['full_text'],
+            sentence_ends=doc.get('sentence_ends'),
             alnum_count=utils.int_or_none(doc['alnum_count']),
             has_video=doc['has_video'],
             tags=doc['tags'],
@@ -307,6 +400,38 @@ def convert_docs_to_articles(
     return oid_article_map
 
 
+def convert_docs_to_search_result_articles(
+    docs: List[Document]
+) -> Dict[ObjectId, JpnArticle]:
+    """Convert MongoDB BSON documents to articles for search results.
+
+    The documents only need the fields in SEARCH_RESULT_ARTICLE_PROJECTION,
+    so only the article attributes used in displaying search results are set
+    on the created articles, and their blogs are not set.
+
+    Returns:
+        A mapping from each article document's MongoDB ObjectId to the created
+        article object for that article document.
+    """
+    oid_article_map = {}
+    for doc in docs:
+        oid_article_map[doc['_id']] = JpnArticle(
+            title=doc['title'],
+            source_url=doc['source_url'],
+            source_name=doc['source_name'],
+            full_text=doc['full_text'],
+            sentence_ends=doc.get('sentence_ends'),
+            alnum_count=utils.int_or_none(doc['alnum_count']),
+            has_video=doc['has_video'],
+            publication_datetime=doc['publication_datetime'],
+            last_updated_datetime=doc['last_updated_datetime'],
+            database_id=str(doc['_id']),
+            quality_score=utils.int_or_none(doc['quality_score']),
+        )
+
+    return oid_article_map
+
+
 def convert_doc_to_mecab_interp(doc: Document) -> MecabLexicalItemInterp:
     """Convert a MongoDB BSON document to a MeCab interp."""
     mecab_interp = MecabLexicalItemInterp(
@@ -1,24 +1,28 @@
 """Objects for building the Myaku article index."""
 
 import logging
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Set
 
 from bson.objectid import ObjectId
 
 from myaku import utils
-from myaku.datastore import DataAccessMode, Query
+from myaku.datastore import DataAccessMode, Document, Query
 from myaku.datastore.cache import FirstPageCache
 from myaku.datastore.database import ArticleIndexDb
 from myaku.datastore.document_convert import (
     convert_articles_to_docs,
     convert_blogs_to_docs,
+    convert_found_lexical_item_batch_to_docs,
     convert_found_lexical_items_to_docs,
 )
 from myaku.datastore.index_search import ArticleIndexSearcher
 from myaku.datatypes import (
     ArticleRankKey,
     FoundJpnLexicalItem,
+    FoundLexicalItemBatch,
     JpnArticle,
     JpnArticleBlog,
 )
@@ -42,13 +46,68 @@ class _IndexedLexicalItemInfo(object):
     best_article_rank_key: ArticleRankKey
 
 
+@dataclass
+class _WriteBufferFlush(object):
+    """Progress of a write buffer flush done by the ArticleIndexBuilder.
+
+    Kept until all of the writes of the flush succeed so that a failed flush
+    can be resumed from the write that failed.
+
+    Attributes:
+        buffer_len: Number of batches at the start of the write buffer that
+            are handled by the flush.
+        batches: The batches from those buffered batches that are written by
+            the flush.
+        article_oid_map: A mapping from the id() for the article of each of
+            the batches to the ObjectId the article was written with. None
+            until the articles are written.
+        found_lexical_item_docs: The found lexical item docs for the batches.
+            None until they are written.
+    """
+    buffer_len: int
+    batches: List[FoundLexicalItemBatch]
+    article_oid_map: Dict[int, ObjectId] = None
+    found_lexical_item_docs: List[Document] = None
+
+
+class WriteBufferFlushStats(NamedTuple):
+    """Stats for the write buffer flushes done by an ArticleIndexBuilder.
+
+    Attributes:
+        flush_count: Number of flushes that wrote to the database.
+        article_count: Number of articles written by the flushes.
+        row_count: Number of documents (blogs, articles, and found lexical
+            items) written by the flushes.
+        secs: Total seconds spent in the flushes.
+    """
+    flush_count: int = 0
+    article_count: int = 0
+    row_count: int = 0
+    secs: float = 0
+
+
 @utils.add_method_debug_logging
 class ArticleIndexBuilder(object):
     """Builder for the Myaku article index."""
     MAX_ALLOWED_ARTICLE_LEN = 2**16  # 65,536
 
-    def __init__(self):
-        """Initialize the index database connection."""
+    # Max number of article text hashes to remember whether they are stored
+    # in the db for.
+    MAX_TEXT_HASH_CACHE_SIZE = 2**17  # 131,072
+
+    def __init__(
+        self, write_buffer_size: int = 1, write_buffer_secs: float = None
+    ) -> None:
+        """Initialize the index database connection.
+
+        Args:
+            write_buffer_size: Max number of found lexical item batches
+                buffered with buffer_found_lexical_item_batch before the
+                buffered batches are flushed to the database.
+            write_buffer_secs: If not None, the buffered batches are also
+                flushed when a batch is buffered this many seconds or more
+                after the oldest buffered batch was buffered.
+        """
         self._db = ArticleIndexDb(DataAccessMode.READ_WRITE)
 
         # Track various info for each found lexical item written to the index
@@ -58,9 +117,35 @@ class ArticleIndexBuilder(object):
         # lexical item.
         self._indexed_fli_info_map: Dict[str, _IndexedLexicalItemInfo] = {}
 
+        # Maps the text hashes of articles checked against the db or written
+        # to the db by this builder to whether an article with that text hash
+        # is stored in the db in least recently used order.
+        self._text_hash_stored_cache: 'OrderedDict[str, bool]' = (
+            OrderedDict()
+        )
+
+        self._write_buffer_size = write_buffer_size
+        self._write_buffer_secs = write_buffer_secs
+        self._write_buffer: List[FoundLexicalItemBatch] = []
+        self._write_buffer_start_time: float = None
+        self._pending_flush: _WriteBufferFlush = None
+        self._flush_stats = WriteBufferFlushStats()
+
+    @property
+    def flush_stats(self) -> WriteBufferFlushStats:
+        """Stats for all of the write buffer flushes done so far."""
+        return self._flush_stats
+
+    @property
+    def buffered_batch_count(self) -> int:
+        """Number of batches in the write buffer waiting to be written."""
+        return len(self._write_buffer)
+
     def close(self) -> None:
-        """Close the index database connection."""
+        """Flush the write buffer and close the index database connection."""
         try:
+            self.flush_write_buffer()
+            self._log_flush_stats()
             self._update_first_page_cache()
         finally:
             self._db.close()
@@ -113,13 +198,56 @@ class ArticleIndexBuilder(object):
             f'keys updated in place'
         )
 
-    def _is_article_text_stored(self, article: JpnArticle) -> bool:
-        """Return True if an article with the same text is already stored."""
+    def _read_stored_text_hashes(self, text_hashes: List[str]) -> Set[str]:
+        """Return the text hashes that articles are stored with in the db.
+
+        Only the text hashes that have not been checked against the db before
+        during the lifetime of this builder are read from the db, and they are
+        all read with a single query.
+        """
+        stored_text_hashes = set()
+        unchecked_text_hashes = []
+        for text_hash in set(text_hashes):
+            is_stored = self._text_hash_stored_cache.get(text_hash)
+            if is_stored is None:
+                unchecked_text_hashes.append(text_hash)
+                continue
+
+            self._text_hash_stored_cache.move_to_end(text_hash)
+            if is_stored:
+                stored_text_hashes.add(text_hash)
+
+        if len(unchecked_text_hashes) == 0:
+            return stored_text_hashes
+
         docs = self._db.read_with_log(
-            'text_hash', article.text_hash, self._db.article_collection,
+            'text_hash', unchecked_text_hashes, self._db.article_collection,
             {'text_hash': 1, '_id': 0}
         )
-        return len(docs) > 0
+        db_stored_text_hashes = {doc['text_hash'] for doc in docs}
+        for text_hash in unchecked_text_hashes:
+            is_stored = text_hash in db_stored_text_hashes
+            self._cache_text_hash_stored(text_hash, is_stored)
+            if is_stored:
+                stored_text_hashes.add(text_hash)
+        return stored_text_hashes
+
+    def _cache_text_hash_stored(self, text_hash: str, is_stored: bool) -> None:
+        """Cache whether an article with the text hash is stored in the db."""
+        self._text_hash_stored_cache[text_hash] = is_stored
+        self._text_hash_stored_cache.move_to_end(text_hash)
+        if len(self._text_hash_stored_cache) > self.MAX_TEXT_HASH_CACHE_SIZE:
+            self._text_hash_stored_cache.popitem(last=False)
+
+    def _is_article_too_long(self, article: JpnArticle) -> bool:
+        """Return True if the article is too long to store in the db."""
+        if len(article.full_text) > self.MAX_ALLOWED_ARTICLE_LEN:
+            _log.info(
+                'Article %s is too long to store (%s chars)',
+                article, len(article.full_text)
+            )
+            return True
+        return False
 
     def can_store_article(self, article: JpnArticle) -> bool:
         """Return True if the article is safe to store in the db.
@@ -129,18 +257,57 @@ class ArticleIndexBuilder(object):
             2. There is not an article with the exact same text already stored
                 in the db.
         """
-        if self._is_article_text_stored(article):
-            _log.info('Article %s already stored!', article)
-            return False
+        return len(self.filter_storable_articles([article])) == 1
 
-        if len(article.full_text) > self.MAX_ALLOWED_ARTICLE_LEN:
-            _log.info(
-                'Article %s is too long to store (%s chars)',
-                article, len(article.full_text)
-            )
-            return False
+    def filter_storable_articles(
+        self, articles: List[JpnArticle]
+    ) -> List[JpnArticle]:
+        """Get the articles that are safe to store in the db.
 
-        return True
+        Does the same checks as can_store_article for each article, but
+        checks the text of all of the articles against the db with a single
+        query. The text of each article is only checked against the db once
+        during the lifetime of this builder, so articles checked before
+        analysis can be checked again for free when they are written.
+
+        If multiple of the articles have the same text, only the first is
+        considered safe to store.
+
+        Returns:
+            The storable articles in the same order as the given articles.
+        """
+        stored_text_hashes = self._read_stored_text_hashes(
+            [article.text_hash for article in articles]
+        )
+
+        storable_articles = []
+        for article in articles:
+            if article.text_hash in stored_text_hashes:
+                _log.info('Article %s already stored!', article)
+                continue
+            if self._is_article_too_long(article):
+                continue
+
+            stored_text_hashes.add(article.text_hash)
+            storable_articles.append(article)
+        return storable_articles
+
+    def _get_storable_batches(
+        self, batches: List[FoundLexicalItemBatch]
+    ) -> List[FoundLexicalItemBatch]:
+        """Get the batches whose articles are safe to store in the db.
+
+        See filter_storable_articles for the checks done.
+        """
+        storable_article_ids = {
+            id(article) for article in self.filter_storable_articles(
+                [batch.article for batch in batches]
+            )
+        }
+        return [
+            batch for batch in batches
+            if id(batch.article) in storable_article_ids
+        ]
 
     def _get_fli_safe_articles(
             self, flis: List[FoundJpnLexicalItem]
@@ -157,7 +324,7 @@ class ArticleIndexBuilder(object):
         }
 
         articles = list(article_id_map.values())
-        return [a for a in articles if self.can_store_article(a)]
+        return self.filter_storable_articles(articles)
 
     def _get_article_blogs(
             self, articles: List[JpnArticle]
@@ -183,7 +350,7 @@ class ArticleIndexBuilder(object):
             blog was written with.
         """
         blog_docs = convert_blogs_to_docs(blogs)
-        object_ids = self._db.replace_write_with_log(
+        object_ids = self._db.bulk_replace_write_with_log(
             blog_docs, self._db.blog_collection, 'source_url'
         )
         blog_oid_map = {
@@ -235,6 +402,8 @@ class ArticleIndexBuilder(object):
         result = self._db.write_with_log(
             article_docs, self._db.article_collection
         )
+        for article in articles:
+            self._cache_text_hash_stored(article.text_hash, True)
         article_oid_map = {
             id(a): oid for a, oid in zip(articles, result.inserted_ids)
         }
@@ -251,19 +420,39 @@ class ArticleIndexBuilder(object):
         closed.
         """
         for fli in found_lexical_items:
-            rank_key = ArticleRankKey(
-                fli.article.quality_score + fli.quality_score_mod,
-                fli.article.last_updated_datetime,
-                fli.article.database_id,
+            self._update_tracked_base_form_info(
+                fli.base_form, fli.article, fli.quality_score_mod
             )
-            info = self._indexed_fli_info_map.get(fli.base_form)
-            if info is None:
-                info = _IndexedLexicalItemInfo(fli.base_form, 0, rank_key)
 
-            info.new_article_count += 1
-            if rank_key > info.best_article_rank_key:
-                info.best_article_rank_key = rank_key
-            self._indexed_fli_info_map[fli.base_form] = info
+    def _update_tracked_batch_info(self, batch: FoundLexicalItemBatch) -> None:
+        """Update the tracked info for the found lexical items in the batch.
+
+        See _update_tracked_fli_info for more info.
+        """
+        for base_form, quality_score_mod in zip(
+            batch.base_forms, batch.quality_score_mods
+        ):
+            self._update_tracked_base_form_info(
+                base_form, batch.article, quality_score_mod
+            )
+
+    def _update_tracked_base_form_info(
+        self, base_form: str, article: JpnArticle, quality_score_mod: int
+    ) -> None:
+        """Update the tracked info for a base form found in an article."""
+        rank_key = ArticleRankKey(
+            article.quality_score + quality_score_mod,
+            article.last_updated_datetime,
+            article.database_id,
+        )
+        info = self._indexed_fli_info_map.get(base_form)
+        if info is None:
+            info = _IndexedLexicalItemInfo(base_form, 0, rank_key)
+
+        info.new_article_count += 1
+        if rank_key > info.best_article_rank_key:
+            info.best_article_rank_key = rank_key
+        self._indexed_fli_info_map[base_form] = info
 
     def write_found_lexical_items(
             self, found_lexical_items: List[FoundJpnLexicalItem],
@@ -306,6 +495,175 @@ class ArticleIndexBuilder(object):
         self._db.write_with_log(
             found_lexical_item_docs, self._db.found_lexical_item_collection
         )
+        self._db.add_to_posting_lists_and_counts(found_lexical_item_docs)
         self._update_tracked_fli_info(safe_article_flis)
 
         return len(safe_article_flis) == len(found_lexical_items)
+
+    def write_found_lexical_item_batch(
+            self, batch: FoundLexicalItemBatch, write_article: bool = True
+    ) -> bool:
+        """Write a found lexical item batch and its article to the index db.
+
+        Args:
+            batch: Batch of found lexical items to write to the database.
+            write_article: If True, will write the article of the batch to the
+                database as well. If False, will assume the article of the
+                batch is already in the database.
+
+        Returns:
+            True if the found lexical items in the batch were written to the
+            db, or False if they were not written to the db because their
+            article was not safe to store.
+            See the can_store_article method docstring for the reasons why an
+            article could be considered unsafe.
+        """
+        if not self.can_store_article(batch.article):
+            return False
+        if len(batch) == 0:
+            return True
+
+        if write_article:
+            article_oid_map = self._write_articles([batch.article])
+        else:
+            article_oid_map = self._read_article_oids([batch.article])
+
+        found_lexical_item_docs = convert_found_lexical_item_batch_to_docs(
+            batch, article_oid_map[id(batch.article)]
+        )
+        self._db.write_with_log(
+            found_lexical_item_docs, self._db.found_lexical_item_collection
+        )
+        self._db.add_to_posting_lists_and_counts(found_lexical_item_docs)
+        self._update_tracked_batch_info(batch)
+
+        return True
+
+    def buffer_found_lexical_item_batch(
+        self, batch: FoundLexicalItemBatch
+    ) -> None:
+        """Buffer a found lexical item batch to write to the index db.
+
+        The buffered batches and their articles are written to the db in bulk
+        once the write buffer is full or the write buffer time limit has
+        passed. Any batches still buffered are written on close.
+
+        Like write_found_lexical_item_batch, the batch and its article are
+        only written if the article is safe to store. See the
+        can_store_article method docstring for the reasons why an article
+        could be considered unsafe.
+
+        Args:
+            batch: Batch of found lexical items to write to the database.
+        """
+        if len(self._write_buffer) == 0:
+            self._write_buffer_start_time = time.perf_counter()
+        self._write_buffer.append(batch)
+
+        buffer_secs = time.perf_counter() - self._write_buffer_start_time
+        if (
+            len(self._write_buffer) >= self._write_buffer_size
+            or (
+                self._write_buffer_secs is not None
+                and buffer_secs >= self._write_buffer_secs
+            )
+        ):
+            self.flush_write_buffer()
+
+    def flush_write_buffer(self) -> None:
+        """Write all buffered batches and their articles to the index db.
+
+        Writes all of the articles, their blogs, and their found lexical items
+        using a few bulk operations regardless of the number of buffered
+        batches.
+
+        The batches are only removed from the write buffer once all of the
+        writes succeed. If a write fails, the next flush resumes from the
+        failed write, so the articles already written by the failed flush are
+        neither written again nor skipped as already stored.
+        """
+        while len(self._write_buffer) > 0:
+            if self._pending_flush is None:
+                batches = self._get_storable_batches(self._write_buffer)
+
+                # Articles without any found lexical items are not written
+                # like in write_found_lexical_item_batch.
+                self._pending_flush = _WriteBufferFlush(
+                    len(self._write_buffer),
+                    [batch for batch in batches if len(batch) > 0]
+                )
+            self._resume_flush(self._pending_flush)
+
+    def _resume_flush(self, flush: _WriteBufferFlush) -> None:
+        """Do the writes of the flush that have not succeeded yet.
+
+        Once all of the writes succeed, the batches of the flush are removed
+        from the write buffer.
+        """
+        if len(flush.batches) > 0:
+            self._write_flush_batches(flush)
+        self._write_buffer = self._write_buffer[flush.buffer_len:]
+        self._pending_flush = None
+        if len(self._write_buffer) == 0:
+            self._write_buffer_start_time = None
+
+    def _write_flush_batches(self, flush: _WriteBufferFlush) -> None:
+        """Write the batches of the flush and their articles to the index db.
+
+        The articles and found lexical items already written by a previous
+        attempt of the flush are not written again.
+        """
+        start_time = time.perf_counter()
+        articles = [batch.article for batch in flush.batches]
+        if flush.article_oid_map is None:
+            flush.article_oid_map = self._write_articles(articles)
+
+        if flush.found_lexical_item_docs is None:
+            found_lexical_item_docs = []
+            for batch in flush.batches:
+                found_lexical_item_docs.extend(
+                    convert_found_lexical_item_batch_to_docs(
+                        batch, flush.article_oid_map[id(batch.article)]
+                    )
+                )
+            self._db.write_with_log(
+                found_lexical_item_docs,
+                self._db.found_lexical_item_collection
+            )
+            flush.found_lexical_item_docs = found_lexical_item_docs
+
+        self._db.add_to_posting_lists_and_counts(
+            flush.found_lexical_item_docs
+        )
+        for batch in flush.batches:
+            self._update_tracked_batch_info(batch)
+
+        row_count = (
+            len(self._get_article_blogs(articles)) + len(articles)
+            + len(flush.found_lexical_item_docs)
+        )
+        flush_secs = time.perf_counter() - start_time
+        self._flush_stats = WriteBufferFlushStats(
+            self._flush_stats.flush_count + 1,
+            self._flush_stats.article_count + len(articles),
+            self._flush_stats.row_count + row_count,
+            self._flush_stats.secs + flush_secs
+        )
+        _log.info(
+            'Flushed write buffer with %s articles (%s rows) in %.2f seconds',
+            len(articles), row_count, flush_secs
+        )
+
+    def _log_flush_stats(self) -> None:
+        """Log the stats for all write buffer flushes done so far."""
+        stats = self._flush_stats
+        if stats.flush_count == 0:
+            return
+
+        _log.info(
+            'Did %s write buffer flushes with %.1f articles and %.1f rows '
+            'written per flush on average (%.2f seconds per flush)',
+            stats.flush_count, stats.article_count / stats.flush_count,
+            stats.row_count / stats.flush_count,
+            stats.secs / stats.flush_count
+        )
@@ -45,10 +45,14 @@ def rescore_article_index() -> None:
 
     Updates the article index database and its first page cache to reflect the
     new quality scores of the rescored articles.
+
+    Also periodically reconciles the stored query article counts with the
+    found lexical items in the index since rescoring is run periodically.
     """
     current_rescore_datetime = datetime.utcnow()
     with ArticleIndexDb(DataAccessMode.READ_UPDATE) as db:
         base_form_article_key_map = _rescore_article_index_database(db)
+        db.reconcile_article_counts()
         _update_first_page_cache(base_form_article_key_map)
         _update_last_rescore_datetime(db, current_rescore_datetime)
 
@@ -243,7 +247,8 @@ def _update_article_score_in_database(
 
     Updates the quality score for the article and found lexical items for
     the article in the index db to match the data stored in quality_score field
-    of the given article object.
+    of the given article object, and moves the article to its new rank in the
+    posting lists it is in.
 
     The given article must have its database_id field set.
 
@@ -279,6 +284,8 @@ def _update_article_score_in_database(
     )
     _log.debug('Update result: %s', result.raw_result)
 
+    db.update_article_postings(ObjectId(article.database_id))
+
     return True
 
 
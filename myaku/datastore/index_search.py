@@ -1,7 +1,9 @@
 """Objects for searching the Myaku article index."""
 
+import itertools
 import logging
-from typing import Dict, List, Optional
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterable, List, Optional, Tuple
 
 import pymongo
 from bson.objectid import ObjectId
@@ -18,11 +20,11 @@ from myaku.datastore import (
 from myaku.datastore.cache import FirstPageCache, NextPageCache
 from myaku.datastore.database import ArticleIndexDb
 from myaku.datastore.document_convert import (
-    convert_docs_to_articles,
-    convert_docs_to_blogs,
+    SEARCH_RESULT_ARTICLE_PROJECTION,
+    convert_docs_to_search_result_articles,
     convert_docs_to_search_results,
 )
-from myaku.datatypes import JpnArticle
+from myaku.datatypes import ArticleRankKey, JpnArticle
 
 _log = logging.getLogger(__name__)
 
@@ -54,6 +56,9 @@ class ArticleIndexSearcher(object):
 
         Does not consider the page number of the query when counting the number
         of matching articles in the database.
+
+        Counts from all of the found lexical items matching the query, so is
+        only used if there is no stored article count for the query.
         """
         query_field = self._db.QUERY_TYPE_QUERY_FIELD_MAP[query.query_type]
 
@@ -70,6 +75,9 @@ class ArticleIndexSearcher(object):
     ) -> Dict[ObjectId, JpnArticle]:
         """Read the articles for the given ObjectIds from the database.
 
+        Only reads the article data used in displaying search results, so the
+        blogs of the articles are not read.
+
         Args:
             object_ids: ObjectIds for articles to read from the database.
 
@@ -78,33 +86,20 @@ class ArticleIndexSearcher(object):
             database for that ObjectId.
         """
         article_docs = self._db.read_with_log(
-            '_id', object_ids, self._db.article_collection
-        )
-
-        blog_oids = list(
-            set(doc['blog_oid'] for doc in article_docs if doc['blog_oid'])
-        )
-        if len(blog_oids) > 0:
-            blog_docs = self._db.read_with_log(
-                '_id', blog_oids, self._db.blog_collection
-            )
-            oid_blog_map = convert_docs_to_blogs(blog_docs)
-        else:
-            oid_blog_map = {}
-
-        oid_article_map = convert_docs_to_articles(
-            article_docs, oid_blog_map
+            '_id', object_ids, self._db.article_collection,
+            SEARCH_RESULT_ARTICLE_PROJECTION
         )
-        return oid_article_map
+        return convert_docs_to_search_result_articles(article_docs)
 
     def _get_article_docs_from_search_results(
-        self, search_results_cursor: Cursor, quality_score_field: str,
-        results_start_index: int, max_results_to_return: int
+        self, search_results_cursor: Iterable[Document],
+        quality_score_field: str, results_start_index: int,
+        max_results_to_return: int
     ) -> List[Document]:
         """Merge the top search result docs together to get one per article.
 
         Args:
-            search_results_cursor: Cursor that will yield search result
+            search_results_cursor: Iterable that will yield search result
                 docs in ranked order.
             quality_score_field: Name of field in the docs yielded from the
                 search_results_cursor that has the quality score for the search
@@ -148,6 +143,321 @@ class ArticleIndexSearcher(object):
 
         return article_search_result_docs
 
+    def _get_posting_fli_cursor(
+        self, postings: List[Document], score_field: str
+    ) -> Cursor:
+        """Get a cursor for the found lexical items of posting list postings.
+
+        Args:
+            postings: Postings to get the found lexical items for.
+            score_field: Name of the found lexical item field with the quality
+                score for the query type of the posting list.
+
+        Returns:
+            A cursor for the found lexical items of the postings projected to
+            the fields needed to create search results from them.
+        """
+        base_forms = list(set(
+            base_form for posting in postings
+            for base_form in posting['base_forms']
+        ))
+        return self._db.found_lexical_item_collection.find(
+            {
+                'article_oid': {
+                    '$in': [posting['article_oid'] for posting in postings]
+                },
+                'base_form': {'$in': base_forms},
+            },
+            {
+                'article_oid': 1, 'base_form': 1, 'found_positions': 1,
+                score_field: 1, '_id': 0,
+            }
+        )
+
+    def _get_posting_fli_docs(
+        self, posting: Document,
+        article_base_form_doc_map: Dict[Tuple[ObjectId, str], Document]
+    ) -> List[Document]:
+        """Get the found lexical item docs for the base forms of a posting.
+
+        The found lexical items of a posting can be missing if they were
+        changed after the posting was written, so any missing ones are logged
+        and skipped.
+
+        Args:
+            posting: Posting to get the found lexical item docs for.
+            article_base_form_doc_map: Map from (article ObjectId, base form)
+                keys to the read found lexical item docs for the postings.
+
+        Returns:
+            The found lexical item docs of the posting that were read.
+        """
+        docs = []
+        for base_form in posting['base_forms']:
+            doc = article_base_form_doc_map.get(
+                (posting['article_oid'], base_form)
+            )
+            if doc is None:
+                _log.warning(
+                    'No found lexical item for base form "%s" of posting for '
+                    'article %s', base_form, posting['article_oid']
+                )
+                continue
+            docs.append(doc)
+        return docs
+
+    def _get_article_docs_from_postings(
+        self, query: Query, postings: List[Document]
+    ) -> List[Document]:
+        """Get the search result docs for the articles of a page of postings.
+
+        Reads the found lexical items of the postings with a single query and
+        merges them to get one search result doc per article the same way as
+        _get_article_docs_from_search_results.
+
+        Args:
+            query: Query the postings are from the posting list of.
+            postings: Postings to get the search result docs for.
+
+        Returns:
+            A list of search result docs in the order of the given postings.
+            Postings with no found lexical items in the db are skipped.
+        """
+        if len(postings) == 0:
+            return []
+
+        score_field = self._db.QUERY_TYPE_SCORE_FIELD_MAP[query.query_type]
+        fli_docs = self._get_posting_fli_cursor(postings, score_field)
+        article_base_form_doc_map = {
+            (doc['article_oid'], doc['base_form']): doc for doc in fli_docs
+        }
+
+        article_search_result_docs: List[Document] = []
+        for posting in postings:
+            docs = self._get_posting_fli_docs(
+                posting, article_base_form_doc_map
+            )
+            if len(docs) == 0:
+                continue
+
+            docs.sort(key=lambda doc: doc[score_field], reverse=True)
+            article_search_result_docs.append({
+                'article_oid': posting['article_oid'],
+                'matched_base_forms': [doc['base_form'] for doc in docs],
+                'found_positions': [
+                    position for doc in docs
+                    for position in doc['found_positions']
+                ],
+                'quality_score': posting['score'],
+            })
+
+        return article_search_result_docs
+
+    def _get_seek_filter(
+        self, score_field: str, after_rank_key: ArticleRankKey
+    ) -> Document:
+        """Get a filter for the found lexical items ranked after a rank key.
+
+        Args:
+            score_field: Name of the found lexical item field with the quality
+                score for the query type being searched.
+            after_rank_key: Rank key to get the filter for found lexical items
+                ranked after.
+
+        Returns:
+            A filter that only matches found lexical items whose score, article
+            last updated datetime, and article ObjectId rank them after the
+            given rank key in search results.
+        """
+        score, last_updated_datetime, article_id = after_rank_key
+        article_oid = ObjectId(article_id)
+
+        # The score bound outside of the $or lets the seek be done with a
+        # single range scan of the search index for the query type.
+        return {score_field: {'$lte': score}, '$or': [
+            {score_field: {'$lt': score}},
+            {
+                score_field: score,
+                'article_last_updated_datetime': {
+                    '$lt': last_updated_datetime
+                },
+            },
+            {
+                score_field: score,
+                'article_last_updated_datetime': last_updated_datetime,
+                'article_oid': {'$lt': article_oid},
+            },
+        ]}
+
+    def _get_ranking_cursor(self, query: Query) -> Cursor:
+        """Get a cursor for the rank keys of the query's found lexical items.
+
+        The cursor yields the rank key fields of the found lexical items
+        matching the query in ranked order. It is only projected to fields in
+        the search index for the query type, so the scan is covered by the
+        index and no found lexical item docs are read.
+
+        If the query has an after_rank_key, the cursor seeks past it.
+        """
+        query_field = self._db.QUERY_TYPE_QUERY_FIELD_MAP[query.query_type]
+        score_field = self._db.QUERY_TYPE_SCORE_FIELD_MAP[query.query_type]
+
+        mongo_query = {query_field: query.query_str}
+        if query.after_rank_key is not None:
+            mongo_query.update(
+                self._get_seek_filter(score_field, query.after_rank_key)
+            )
+
+        cursor = self._db.found_lexical_item_collection.find(
+            mongo_query,
+            {
+                'article_oid': 1, 'article_last_updated_datetime': 1,
+                score_field: 1, '_id': 0,
+            }
+        )
+        cursor.sort([
+            (score_field, pymongo.DESCENDING),
+            ('article_last_updated_datetime', pymongo.DESCENDING),
+            ('article_oid', pymongo.DESCENDING),
+        ])
+        return cursor
+
+    def _get_page_rank_key_docs(
+        self, rank_key_docs: Iterable[Document], results_start_index: int
+    ) -> List[Document]:
+        """Get the rank key docs for the search results on a page.
+
+        Like for _get_article_docs_from_search_results, consecutive docs for
+        the same article are part of the same search result.
+
+        Args:
+            rank_key_docs: Iterable that will yield rank key docs in ranked
+                order.
+            results_start_index: Index of the first search result on the page.
+                Indexing starts at 0.
+
+        Returns:
+            The rank key docs for all of the search results on the page in
+            ranked order.
+        """
+        results_end_index = results_start_index + SEARCH_RESULTS_PAGE_SIZE
+        page_rank_key_docs = []
+        last_article_oid = None
+        result_count = 0
+        for doc in rank_key_docs:
+            if doc['article_oid'] != last_article_oid:
+                last_article_oid = doc['article_oid']
+                result_count += 1
+                if result_count > results_end_index:
+                    break
+
+            if result_count > results_start_index:
+                page_rank_key_docs.append(doc)
+
+        return page_rank_key_docs
+
+    def _get_fli_rank_key(self, doc: Document, score_field: str) -> Tuple:
+        """Get the tuple of the search index rank key fields of a fli doc."""
+        return (
+            doc[score_field], doc['article_last_updated_datetime'],
+            doc['article_oid']
+        )
+
+    def _get_ranked_fli_cursor(
+        self, query: Query, rank_key_docs: List[Document]
+    ) -> Cursor:
+        """Get a cursor for the query's found lexical items with the rank keys.
+
+        Each rank key is looked up with a separate range of the search index
+        for the query type, so only the found lexical item docs with the rank
+        keys are read.
+
+        Args:
+            query: Query the rank key docs are for.
+            rank_key_docs: Rank key docs from the ranking cursor for the
+                query.
+
+        Returns:
+            A cursor for the found lexical items projected to the fields needed
+            to create search results from them. The cursor does NOT yield them
+            in ranked order.
+        """
+        query_field = self._db.QUERY_TYPE_QUERY_FIELD_MAP[query.query_type]
+        score_field = self._db.QUERY_TYPE_SCORE_FIELD_MAP[query.query_type]
+        rank_keys = set(
+            self._get_fli_rank_key(doc, score_field) for doc in rank_key_docs
+        )
+        return self._db.found_lexical_item_collection.find(
+            {'$or': [
+                {
+                    query_field: query.query_str,
+                    score_field: score,
+                    'article_last_updated_datetime': last_updated_datetime,
+                    'article_oid': article_oid,
+                }
+                for score, last_updated_datetime, article_oid in rank_keys
+            ]},
+            {
+                'article_oid': 1, 'article_last_updated_datetime': 1,
+                'base_form': 1, 'found_positions': 1, score_field: 1,
+                '_id': 0,
+            }
+        )
+
+    def _get_article_docs_from_found_lexical_items(
+        self, query: Query, results_start_index: int
+    ) -> List[Document]:
+        """Get a page of search result docs directly from found lexical items.
+
+        Used for queries whose posting list is not available.
+
+        First finds the rank keys of the found lexical items on the page with
+        a scan covered by the search index for the query type, and then reads
+        only the found lexical item docs with those rank keys.
+
+        If the query has an after_rank_key, the scan seeks past it, so only the
+        index keys for the queried page are read. Otherwise, the scan has to
+        read the index keys for all previous pages as well.
+        """
+        score_field = self._db.QUERY_TYPE_SCORE_FIELD_MAP[query.query_type]
+        rank_key_docs: Iterable[Document] = self._get_ranking_cursor(query)
+        if query.after_rank_key is not None:
+            # Any found lexical items for the article of the rank key right
+            # after it were merged into the last search result of the previous
+            # page.
+            after_article_oid = ObjectId(query.after_rank_key.database_id)
+            rank_key_docs = itertools.dropwhile(
+                lambda doc: doc['article_oid'] == after_article_oid,
+                rank_key_docs
+            )
+            results_start_index = 0
+
+        page_rank_key_docs = self._get_page_rank_key_docs(
+            rank_key_docs, results_start_index
+        )
+        if len(page_rank_key_docs) == 0:
+            return []
+
+        rank_key_fli_docs_map: DefaultDict[Tuple, List[Document]] = (
+            defaultdict(list)
+        )
+        for doc in self._get_ranked_fli_cursor(query, page_rank_key_docs):
+            rank_key_fli_docs_map[
+                self._get_fli_rank_key(doc, score_field)
+            ].append(doc)
+
+        # Docs with the same rank key are all read for the first of them, so
+        # the later ones get an empty list after the pop.
+        ranked_fli_docs = []
+        for doc in page_rank_key_docs:
+            ranked_fli_docs.extend(rank_key_fli_docs_map.pop(
+                self._get_fli_rank_key(doc, score_field), []
+            ))
+
+        return self._get_article_docs_from_search_results(
+            ranked_fli_docs, score_field, 0, SEARCH_RESULTS_PAGE_SIZE
+        )
+
     @utils.skip_method_debug_logging
     def _get_from_first_page_cache(
         self, query: Query
@@ -209,6 +519,17 @@ class ArticleIndexSearcher(object):
 
         Does not use the search result caches in any case.
 
+        The page of search results is read from a single range of the posting
+        list for the query if possible. If the query has no posting list, its
+        posting list is over the max length, or the posting count of its
+        posting list doesn't match its article count, the page is read from
+        the found lexical items matching the query instead, seeking past the
+        after_rank_key of the query if it has one.
+
+        The total result count is read from the stored article count for the
+        query, and is only counted from the found lexical items if no article
+        count is stored for the query.
+
         The search results are in ranked order by quality score. See the scorer
         module for more info on how quality scores are determined.
 
@@ -218,23 +539,35 @@ class ArticleIndexSearcher(object):
         Returns:
             The queried page of search results.
         """
-        query_field = self._db.QUERY_TYPE_QUERY_FIELD_MAP[query.query_type]
-        score_field = self._db.QUERY_TYPE_SCORE_FIELD_MAP[query.query_type]
-
-        cursor = self._db.found_lexical_item_collection.find(
-            {query_field: query.query_str}
-        )
-        cursor.sort([
-            (score_field, pymongo.DESCENDING),
-            ('article_last_updated_datetime', pymongo.DESCENDING),
-            ('article_oid', pymongo.DESCENDING),
-        ])
-        search_result_docs = self._get_article_docs_from_search_results(
-            cursor, score_field,
-            (query.page_num - 1) * SEARCH_RESULTS_PAGE_SIZE,
-            SEARCH_RESULTS_PAGE_SIZE
+        results_start_index = (query.page_num - 1) * SEARCH_RESULTS_PAGE_SIZE
+        total_results = self._db.read_article_count(
+            query.query_type, query.query_str
         )
 
+        postings = None
+        if (
+            total_results is not None
+            and total_results <= self._db.MAX_POSTING_LIST_LEN
+        ):
+            postings = self._db.read_posting_list_page(
+                query.query_type, query.query_str, results_start_index,
+                SEARCH_RESULTS_PAGE_SIZE, total_results
+            )
+
+        if postings is not None:
+            search_result_docs = self._get_article_docs_from_postings(
+                query, postings
+            )
+        else:
+            search_result_docs = (
+                self._get_article_docs_from_found_lexical_items(
+                    query, results_start_index
+                )
+            )
+
+        if total_results is None:
+            total_results = self._get_query_article_count(query)
+
         article_oids = [doc['article_oid'] for doc in search_result_docs]
         oid_article_map = self._read_articles(article_oids)
 
@@ -243,8 +576,11 @@ class ArticleIndexSearcher(object):
         )
         return SearchResultPage(
             query=query,
-            total_results=self._get_query_article_count(query),
-            search_results=search_results
+            total_results=total_results,
+            search_results=search_results,
+            last_rank_key=(
+                search_results[-1].get_rank_key() if search_results else None
+            )
         )
 
     def search_articles(self, query: Query) -> SearchResultPage:
@@ -2,20 +2,23 @@
 
 import logging
 import zlib
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, NamedTuple, Tuple
 
 from bson.objectid import ObjectId
 
 from myaku import utils
 from myaku.datastore import Query, SearchResult, SearchResultPage
-from myaku.datatypes import ArticleTextPosition, JpnArticle
+from myaku.datatypes import ArticleRankKey, ArticleTextPosition, JpnArticle
 
 _log = logging.getLogger(__name__)
 
 # Gzip compression level to use when compressing the serialized byte strings.
 _COMPRESS_LEVEL = 1
 
+# Naive UTC datetimes are serialized as the microseconds since this datetime.
+_EPOCH_DATETIME = datetime(1970, 1, 1)
+
 
 class SerializedSearchResultPage(NamedTuple):
     """Serialization of a page of search results.
@@ -154,6 +157,36 @@ def serialize_article(article: JpnArticle) -> bytes:
     return zlib.compress(b''.join(bytes_list), _COMPRESS_LEVEL)
 
 
+def serialize_rank_key(rank_key: ArticleRankKey) -> bytes:
+    """Serialize an article rank key without any loss of precision.
+
+    Unlike the rank key data serialized for the search results of a page, the
+    last updated datetime is serialized to the microsecond, so the
+    deserialized rank key can be used to seek to the exact rank of the article
+    in the database.
+
+    Args:
+        rank_key: Rank key with a naive UTC last updated datetime to
+            serialize.
+
+    Returns:
+        Serialized byte string for the rank key.
+    """
+    bytes_list = []
+    bytes_list.append(
+        rank_key.quality_score.to_bytes(2, 'little', signed=True)
+    )
+
+    up_dt_micros = (
+        (rank_key.last_updated_datetime - _EPOCH_DATETIME)
+        // timedelta(microseconds=1)
+    )
+    bytes_list.append(up_dt_micros.to_bytes(8, 'little', signed=True))
+    bytes_list.append(ObjectId(rank_key.database_id).binary)
+
+    return b''.join(bytes_list)
+
+
 @utils.add_debug_logging
 def serialize_search_result_page(
     page: SearchResultPage
@@ -294,6 +327,19 @@ def deserialize_search_results(
         out_page.search_results.append(search_result)
 
 
+def deserialize_rank_key(buffer: bytes) -> ArticleRankKey:
+    """Deserialize a rank key serialized with serialize_rank_key."""
+    quality_score = int.from_bytes(buffer[0:2], 'little', signed=True)
+    up_dt_micros = int.from_bytes(buffer[2:10], 'little', signed=True)
+    article_oid = ObjectId(buffer[10:22])
+
+    return ArticleRankKey(
+        quality_score,
+        _EPOCH_DATETIME + timedelta(microseconds=up_dt_micros),
+        str(article_oid)
+    )
+
+
 def deserialize_article(buffer: bytes, out_article: JpnArticle) -> None:
     """Deserialize an article from a buffer of bytes.
 
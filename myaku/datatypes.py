@@ -3,11 +3,13 @@
 import enum
 import hashlib
 import logging
+import sys
+from array import array
 from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
 from operator import attrgetter
-from typing import Dict, List, NamedTuple, Set, Tuple, TypeVar
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple, TypeVar
 
 from myaku import utils
 from myaku.errors import MissingDataError
@@ -27,6 +29,15 @@ FliInterpMap = Dict[
     Tuple[str, int], Dict['JpnLexicalItemInterp', Set['ArticleTextPosition']]
 ]
 
+# Typecode of the arrays used by FoundLexicalItemBatch.
+_BATCH_ARRAY_TYPECODE = 'i'
+
+# Found positions are packed into a single int key while building a batch of
+# found lexical items as (start << _POSITION_KEY_SHIFT) | len, so the keys sort
+# in the same order as the positions.
+_POSITION_KEY_SHIFT = 32
+_POSITION_KEY_LEN_MASK = (1 << _POSITION_KEY_SHIFT) - 1
+
 Crawlable_co = TypeVar('Crawlable_co', bound='Crawlable', covariant=True)
 
 
@@ -173,6 +184,10 @@ class JpnArticle(Crawlable):
             in.
         database_id: The ID for this article in the Myaku database.
         quality_score: Quality score for this article determined by Myaku.
+        sentence_ends: The end indexes of the sentences in full_text in
+            ascending order as given by utils.find_jpn_sentence_ends.
+            Evaluated automatically lazily after changes to full_text if not
+            set.
         text_hash: The hex digest of the SHA-256 hash of full_text. Evaluated
             automatically lazily after changes to full_text. Read-only.
     """
@@ -189,11 +204,13 @@ class JpnArticle(Crawlable):
     blog_section_article_order_num: int = None
     database_id: str = None
     quality_score: int = None
+    sentence_ends: List[int] = None
 
     # Read-only
     text_hash: str = None
 
     _full_text: str = field(init=False, repr=False)
+    _sentence_ends: List[int] = field(init=False, repr=False)
     _text_hash: str = field(default=None, init=False, repr=False)
     _text_hash_change: bool = field(default=False, init=False, repr=False)
 
@@ -205,8 +222,20 @@ class JpnArticle(Crawlable):
     @full_text.setter
     def full_text(self, set_value: str) -> None:
         self._text_hash_change = True
+        self._sentence_ends = None
         self._full_text = set_value
 
+    @property  # type: ignore  # Silence 'already defined' mypy error
+    def sentence_ends(self) -> List[int]:
+        """See class docstring for sentence_ends documentation."""
+        if self._sentence_ends is None and self.full_text is not None:
+            self._sentence_ends = utils.find_jpn_sentence_ends(self.full_text)
+        return self._sentence_ends
+
+    @sentence_ends.setter
+    def sentence_ends(self, set_value: List[int]) -> None:
+        self._sentence_ends = set_value
+
     @property  # type: ignore  # Silence 'already defined' mypy error
     def text_hash(self) -> str:
         """See class docstring for text_hash documentation."""
@@ -263,10 +292,10 @@ class JpnArticle(Crawlable):
             )
 
         start = utils.find_jpn_sentence_start(
-            self.full_text, item_pos.start
+            self.full_text, item_pos.start, self.sentence_ends
         )
         end = utils.find_jpn_sentence_end(
-            self.full_text, item_pos.start + item_pos.len
+            self.full_text, item_pos.start + item_pos.len, self.sentence_ends
         )
 
         return (self.full_text[start:end + 1], start)
@@ -284,14 +313,15 @@ class JpnArticle(Crawlable):
             tuples are sorted by sentence start index.
         """
         sentence_groups: SentenceGroupMap = defaultdict(list)
+        sentence_ends = self.sentence_ends
         end = -1
         for pos in sorted(text_positions, key=attrgetter('start')):
             if pos.start > end:
                 start = utils.find_jpn_sentence_start(
-                    self.full_text, pos.start
+                    self.full_text, pos.start, sentence_ends
                 )
                 end = utils.find_jpn_sentence_end(
-                    self.full_text, pos.start + pos.len
+                    self.full_text, pos.start + pos.len, sentence_ends
                 )
             sentence_groups[
                 ArticleTextPosition(start, end - start + 1)
@@ -503,3 +533,268 @@ def reduce_found_lexical_items(
         len(found_lexical_items), len(reduced_flis)
     )
     return reduced_flis
+
+
+class FoundLexicalItemBatch(object):
+    """The found lexical items for a single article in columnar form.
+
+    Holds the same data as a reduced list of FoundJpnLexicalItem objects for
+    the article, but stores the data for all of the items in a few flat arrays
+    instead of in many per-item Python objects. This makes the found lexical
+    items of an article much cheaper to hold in memory, pickle, score, and
+    convert to documents.
+
+    The data for the item at index i in the batch is stored as:
+        - base_forms[i] is its base form.
+        - position_starts and position_lens from position_offsets[i] to
+            position_offsets[i + 1] are its found positions sorted by start.
+        - interp_ids from interp_offsets[i] to interp_offsets[i + 1] are the
+            indexes in interps of its possible interps.
+        - quality_score_mods[i] is its quality score modifier.
+
+    For the possible interp at index j in interp_ids, interp_position_indexes
+    from interp_position_offsets[j] to interp_position_offsets[j + 1] are the
+    indexes of the found positions of its item that the interp applies to. If
+    that range is empty, the interp applies to all found positions of its
+    item.
+
+    Use FoundLexicalItemBatchBuilder to create batches.
+
+    Attributes:
+        article: The article where the lexical items were found.
+        base_forms: The interned base forms of the lexical items.
+        interps: The distinct interps of the lexical items in the batch.
+        position_offsets: See class docstring.
+        position_starts: See class docstring.
+        position_lens: See class docstring.
+        interp_offsets: See class docstring.
+        interp_ids: See class docstring.
+        interp_position_offsets: See class docstring.
+        interp_position_indexes: See class docstring.
+        quality_score_mods: See class docstring. Set to 0 for all items until
+            the batch is scored.
+    """
+    __slots__ = (
+        'article',
+        'base_forms',
+        'interps',
+        'position_offsets',
+        'position_starts',
+        'position_lens',
+        'interp_offsets',
+        'interp_ids',
+        'interp_position_offsets',
+        'interp_position_indexes',
+        'quality_score_mods',
+    )
+
+    def __init__(self, article: JpnArticle = None) -> None:
+        """Init an empty batch for the article."""
+        self.article = article
+        self.base_forms: List[str] = []
+        self.interps: List[JpnLexicalItemInterp] = []
+        self.position_offsets = array(_BATCH_ARRAY_TYPECODE, [0])
+        self.position_starts = array(_BATCH_ARRAY_TYPECODE)
+        self.position_lens = array(_BATCH_ARRAY_TYPECODE)
+        self.interp_offsets = array(_BATCH_ARRAY_TYPECODE, [0])
+        self.interp_ids = array(_BATCH_ARRAY_TYPECODE)
+        self.interp_position_offsets = array(_BATCH_ARRAY_TYPECODE, [0])
+        self.interp_position_indexes = array(_BATCH_ARRAY_TYPECODE)
+        self.quality_score_mods = array(_BATCH_ARRAY_TYPECODE)
+
+    def __len__(self) -> int:
+        """Return the number of found lexical items in the batch."""
+        return len(self.base_forms)
+
+    def __repr__(self) -> str:
+        """Return the article identifying data and item count of the batch."""
+        return '{}({}, {} items)'.format(
+            type(self).__name__, self.article, len(self)
+        )
+
+    def get_found_position_count(self, index: int) -> int:
+        """Get the number of found positions of the item at index."""
+        return self.position_offsets[index + 1] - self.position_offsets[index]
+
+    def get_found_positions(self, index: int) -> List[ArticleTextPosition]:
+        """Get the found positions of the item at index."""
+        start = self.position_offsets[index]
+        end = self.position_offsets[index + 1]
+        return [
+            ArticleTextPosition(pos_start, pos_len)
+            for pos_start, pos_len in zip(
+                self.position_starts[start:end], self.position_lens[start:end]
+            )
+        ]
+
+    def get_possible_interps(
+        self, index: int
+    ) -> List[JpnLexicalItemInterp]:
+        """Get the possible interps of the item at index."""
+        start = self.interp_offsets[index]
+        end = self.interp_offsets[index + 1]
+        return [self.interps[i] for i in self.interp_ids[start:end]]
+
+    def get_interp_position_map(
+        self, index: int
+    ) -> Dict[JpnLexicalItemInterp, List[ArticleTextPosition]]:
+        """Get the interp position map of the item at index.
+
+        See the FoundJpnLexicalItem class docstring for the format of the map.
+        """
+        found_positions = None
+        interp_position_map = {}
+        for j in range(
+            self.interp_offsets[index], self.interp_offsets[index + 1]
+        ):
+            start = self.interp_position_offsets[j]
+            end = self.interp_position_offsets[j + 1]
+            if start == end:
+                continue
+
+            if found_positions is None:
+                found_positions = self.get_found_positions(index)
+            interp_position_map[self.interps[self.interp_ids[j]]] = [
+                found_positions[k]
+                for k in self.interp_position_indexes[start:end]
+            ]
+        return interp_position_map
+
+    def get_found_lexical_item(self, index: int) -> FoundJpnLexicalItem:
+        """Create a found lexical item object for the item at index."""
+        fli = FoundJpnLexicalItem(
+            article=self.article,
+            found_positions=self.get_found_positions(index),
+            possible_interps=self.get_possible_interps(index),
+            interp_position_map=self.get_interp_position_map(index),
+            quality_score_mod=self.quality_score_mods[index]
+        )
+
+        # The base forms in the batch are already normalized.
+        fli._base_form = self.base_forms[index]
+        return fli
+
+    def to_found_lexical_items(self) -> List[FoundJpnLexicalItem]:
+        """Create found lexical item objects for all items in the batch."""
+        return [self.get_found_lexical_item(i) for i in range(len(self))]
+
+
+class FoundLexicalItemBatchBuilder(object):
+    """Builder for a batch of the found lexical items in an article.
+
+    Found lexical items added to the builder with the same base form are
+    reduced into a single item in the built batch in the same way as
+    reduce_found_lexical_items.
+    """
+
+    def __init__(self, article: JpnArticle) -> None:
+        """Init the builder for a batch for the article."""
+        self._article = article
+        self._base_forms: List[str] = []
+        self._base_form_index_map: Dict[str, int] = {}
+        self._interps: List[JpnLexicalItemInterp] = []
+        self._interp_index_map: Dict[JpnLexicalItemInterp, int] = {}
+
+        # For each item, a map from the index of each of its interps to the
+        # set of keys for the positions the interp applies to.
+        self._item_interp_positions: List[Dict[int, Set[int]]] = []
+
+    def add(
+        self, base_form: str, start: int, length: int,
+        interps: Iterable[JpnLexicalItemInterp]
+    ) -> None:
+        """Add a found lexical item at a single position to the batch.
+
+        Args:
+            base_form: Base form of the lexical item. Its character widths
+                must already be normalized.
+            start: Start index of the found position of the lexical item.
+            length: Length of the found position of the lexical item.
+            interps: The possible interps of the lexical item at the position.
+        """
+        position_key = (start << _POSITION_KEY_SHIFT) | length
+        interp_positions = self._get_interp_positions(base_form)
+        for interp in interps:
+            interp_index = self._get_interp_index(interp)
+            positions = interp_positions.get(interp_index)
+            if positions is None:
+                interp_positions[interp_index] = {position_key}
+            else:
+                positions.add(position_key)
+
+    def add_found_lexical_item(self, fli: FoundJpnLexicalItem) -> None:
+        """Add a found lexical item to the batch.
+
+        The article of the found lexical item is ignored.
+        """
+        found_position_keys = [
+            (pos.start << _POSITION_KEY_SHIFT) | pos.len
+            for pos in fli.found_positions
+        ]
+        interp_position_map = fli.interp_position_map
+        interp_positions = self._get_interp_positions(fli.base_form)
+        for interp in fli.possible_interps:
+            if interp_position_map and interp in interp_position_map:
+                position_keys = [
+                    (pos.start << _POSITION_KEY_SHIFT) | pos.len
+                    for pos in interp_position_map[interp]
+                ]
+            else:
+                position_keys = found_position_keys
+
+            interp_index = self._get_interp_index(interp)
+            positions = interp_positions.get(interp_index)
+            if positions is None:
+                interp_positions[interp_index] = set(position_keys)
+            else:
+                positions.update(position_keys)
+
+    def _get_interp_positions(self, base_form: str) -> Dict[int, Set[int]]:
+        """Get the interp positions map for the item with the base form."""
+        index = self._base_form_index_map.get(base_form)
+        if index is None:
+            base_form = sys.intern(base_form)
+            index = len(self._base_forms)
+            self._base_form_index_map[base_form] = index
+            self._base_forms.append(base_form)
+            self._item_interp_positions.append({})
+        return self._item_interp_positions[index]
+
+    def _get_interp_index(self, interp: JpnLexicalItemInterp) -> int:
+        """Get the index of the interp in the interps of the batch."""
+        index = self._interp_index_map.get(interp)
+        if index is None:
+            index = len(self._interps)
+            self._interp_index_map[interp] = index
+            self._interps.append(interp)
+        return index
+
+    def build(self) -> FoundLexicalItemBatch:
+        """Build the batch from the found lexical items added so far."""
+        batch = FoundLexicalItemBatch(self._article)
+        batch.base_forms = self._base_forms
+        batch.interps = self._interps
+
+        for interp_positions in self._item_interp_positions:
+            position_keys = sorted(set().union(*interp_positions.values()))
+            key_index_map = {key: i for i, key in enumerate(position_keys)}
+            for key in position_keys:
+                batch.position_starts.append(key >> _POSITION_KEY_SHIFT)
+                batch.position_lens.append(key & _POSITION_KEY_LEN_MASK)
+            batch.position_offsets.append(len(batch.position_starts))
+
+            for interp_index, keys in interp_positions.items():
+                batch.interp_ids.append(interp_index)
+                if len(keys) != len(position_keys):
+                    batch.interp_position_indexes.extend(
+                        sorted(key_index_map[key] for key in keys)
+                    )
+                batch.interp_position_offsets.append(
+                    len(batch.interp_position_indexes)
+                )
+            batch.interp_offsets.append(len(batch.interp_ids))
+
+        batch.quality_score_mods = array(
+            _BATCH_ARRAY_TYPECODE, [0]
+        ) * len(self._base_forms)
+        return batch
@@ -1,31 +1,60 @@
 """Utilities for analyzing Japanese text."""
 
+import csv
+import dbm
+import functools
+import hashlib
+import json
 import logging
+import mmap
+import multiprocessing
 import os
+import pickle
 import re
 import shelve
+import shutil
+import struct
 import subprocess
 import sys
-from collections import defaultdict
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Tuple, Union
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 from xml.etree import ElementTree
 
 import MeCab
+from typing_extensions import Literal
 
 import myaku
 from myaku import utils
 from myaku.datatypes import (
     ArticleTextPosition,
     FoundJpnLexicalItem,
+    FoundLexicalItemBatch,
+    FoundLexicalItemBatchBuilder,
     InterpSource,
     JpnArticle,
     JpnLexicalItemInterp,
     MecabLexicalItemInterp,
-    reduce_found_lexical_items,
 )
 from myaku.errors import (
+    EnvironmentNotSetError,
     ResourceLoadError,
     ResourceNotReadyError,
     TextAnalysisError,
@@ -38,6 +67,17 @@ _JMDICT_FILE_VERSION_REGEX = re.compile(
     r'^<!-- JMdict created: (\d\d\d\d)-(\d\d)-(\d\d) -->$'
 )
 
+_JMDICT_DECOMP_WORKERS_ENV_VAR = 'MYAKU_JMDICT_DECOMP_WORKERS'
+_JMDICT_DECOMP_CACHE_ENV_VAR = 'MYAKU_JMDICT_DECOMP_CACHE'
+_JMDICT_INCREMENTAL_BUILD_ENV_VAR = 'MYAKU_JMDICT_INCREMENTAL_BUILD'
+
+_PARSE_CACHE_SIZE_ENV_VAR = 'MYAKU_PARSE_CACHE_SIZE'
+
+_RESOURCE_MANIFEST_FILENAME = 'resource_manifest.json'
+_RESOURCE_MANIFEST_FORMAT_VERSION = 2
+
+_MECAB_CONFIG_EXECUTABLE = 'mecab-config'
+
 _IPADIC_NEOLOGD_GIT_DIR_ENV_VAR = 'IPADIC_NEOLOGD_GIT_DIR'
 _IPADIC_NEOLOGD_CHANGELOG_FILENAME = 'ChangeLog'
 _IPADIC_NEOLOGD_VERSION_REGEX = re.compile(
@@ -46,6 +86,27 @@ _IPADIC_NEOLOGD_VERSION_REGEX = re.compile(
 
 MecabTags = Tuple[str, ...]
 
+# The lexical items found in a text block as stored in the parse cache. It is
+# a pickled tuple with a (base form, start, len, possible interps) tuple for
+# each lexical item where the start and len are the position of the lexical
+# item in the text block.
+#
+# The lexical items are pickled because the GC is otherwise slowed down by
+# having to traverse the many container objects held in a large cache.
+_CachedLexicalItems = bytes
+
+
+class ParseCacheCounts(NamedTuple):
+    """Counts of the text block lookups in the parse cache of an analyzer.
+
+    Attributes:
+        hits: Number of text blocks whose lexical items were in the cache.
+        misses: Number of text blocks that had to be analyzed because their
+            lexical items were not in the cache.
+    """
+    hits: int = 0
+    misses: int = 0
+
 
 def get_resource_version_info() -> Dict[str, str]:
     """Return the version info of the resources used by this module.
@@ -53,32 +114,208 @@ def get_resource_version_info() -> Dict[str, str]:
     Includes versions of resources such as Japanese dictionaries and
     morphological analyzers used by this module.
 
+    The versions are read from the resource manifest if it is up to date. If
+    not, the resources are probed for their versions, and the manifest is
+    rewritten so that later calls in any process can read it instead.
+
     Returns:
         Dictionary where the keys are the names of resources used by this
         module and the values are the versions of those resources currently
         being used by the module.
     """
-    version_info = {}
-    version_info['MeCab'] = _get_mecab_version()
-    version_info['JMdict'] = _get_jmdict_version()
-    version_info['ipadic-NEologd'] = _get_ipadic_neologd_version()
+    manifest = _read_resource_manifest()
+    if manifest is None:
+        manifest = write_resource_manifest()
+
+    return dict(manifest['versions'])
+
+
+def write_resource_manifest() -> Dict[str, Any]:
+    """Probe the resources used by this module and write their manifest.
+
+    The manifest is written to the app data dir, so it is only written if the
+    MYAKU_APP_DATA_DIR environment variable is set.
+
+    Should be called whenever the resources are installed or updated so that
+    processes can read the manifest instead of probing the resources again.
+
+    Returns:
+        The manifest for the resources.
+    """
+    mecab_dicdir = _get_mecab_dicdir()
+    manifest = {
+        'format_version': _RESOURCE_MANIFEST_FORMAT_VERSION,
+        'source_mtimes': _get_resource_source_mtimes(mecab_dicdir),
+        'mecab_dicdir': mecab_dicdir,
+        'versions': {
+            'MeCab': _get_mecab_version(),
+            'JMdict': _get_jmdict_version(),
+            'ipadic-NEologd': _get_ipadic_neologd_version(),
+        },
+    }
+
+    manifest_path = _get_resource_manifest_filepath()
+    if manifest_path is None:
+        return manifest
+
+    # Write to a temp file first so that other processes never read a
+    # partially written manifest.
+    temp_filepath = '{}.{}.tmp'.format(manifest_path, os.getpid())
+    try:
+        with open(temp_filepath, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=4, sort_keys=True)
+        os.replace(temp_filepath, manifest_path)
+    except OSError:
+        _log.warning(
+            'Resource manifest could not be written to "%s"', manifest_path,
+            exc_info=True
+        )
+    else:
+        _log.debug('Wrote resource manifest to "%s"', manifest_path)
+
+    return manifest
+
+
+def _get_resource_manifest_filepath() -> Optional[str]:
+    """Return the path of the resource manifest.
+
+    Returns None if the app data dir is not set in the environment.
+    """
+    app_data_dir = os.environ.get(myaku.APP_DATA_DIR_ENV_VAR)
+    if not app_data_dir:
+        return None
+
+    return os.path.join(app_data_dir, _RESOURCE_MANIFEST_FILENAME)
+
+
+def _get_resource_source_mtimes(mecab_dicdir: str) -> Dict[str, int]:
+    """Return the last modified times of the resource version sources.
+
+    The sources are the files the JMdict and ipadic-NEologd versions are read
+    from, the mecab-config executable that gives the MeCab version, and the
+    MeCab dictionary directory, so reinstalling MeCab or adding or removing a
+    MeCab dictionary also changes the source times.
+
+    Args:
+        mecab_dicdir: The MeCab dictionary directory given by mecab-config.
+
+    Returns:
+        A dict that maps the paths of the sources to their last modified times
+        in nanoseconds.
+    """
+    source_paths = [
+        utils.get_value_from_env_variable(_JMDICT_XML_FILEPATH_ENV_VAR),
+        os.path.join(
+            utils.get_value_from_env_variable(
+                _IPADIC_NEOLOGD_GIT_DIR_ENV_VAR
+            ),
+            _IPADIC_NEOLOGD_CHANGELOG_FILENAME
+        ),
+        shutil.which(_MECAB_CONFIG_EXECUTABLE) or _MECAB_CONFIG_EXECUTABLE,
+        mecab_dicdir,
+    ]
+
+    source_mtimes = {}
+    for path in source_paths:
+        try:
+            source_mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            source_mtimes[path] = None
+    return source_mtimes
+
+
+def _read_resource_manifest() -> Optional[Dict[str, Any]]:
+    """Read the resource manifest if it is up to date.
+
+    Returns:
+        The resource manifest, or None if there is no resource manifest or it
+        is stale because a resource version source has changed since it was
+        written.
+    """
+    manifest_path = _get_resource_manifest_filepath()
+    if manifest_path is None:
+        return None
+
+    try:
+        with open(manifest_path, 'r') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        _log.debug(
+            'No readable resource manifest at "%s"', manifest_path
+        )
+        return None
+
+    if manifest.get('format_version') != _RESOURCE_MANIFEST_FORMAT_VERSION:
+        _log.debug(
+            'Resource manifest at "%s" has format version %s instead of %s',
+            manifest_path, manifest.get('format_version'),
+            _RESOURCE_MANIFEST_FORMAT_VERSION
+        )
+        return None
 
-    return version_info
+    mecab_dicdir = manifest.get('mecab_dicdir')
+    if not isinstance(mecab_dicdir, str):
+        _log.debug(
+            'Resource manifest at "%s" has no MeCab dictionary dir',
+            manifest_path
+        )
+        return None
+
+    try:
+        source_mtimes = _get_resource_source_mtimes(mecab_dicdir)
+    except EnvironmentNotSetError:
+        return None
+    if manifest.get('source_mtimes') != source_mtimes:
+        _log.debug(
+            'Resource manifest at "%s" is stale: %s != %s', manifest_path,
+            manifest.get('source_mtimes'), source_mtimes
+        )
+        return None
+
+    return manifest
 
 
 def _get_mecab_version() -> str:
     """Return version of MeCab on the system."""
-    output = subprocess.run(
-        ['mecab-config', '--version'], capture_output=True
+    return _run_mecab_config(
+        '--version', 'mecab is not available on this system'
     )
-    if output.returncode != 0:
-        utils.log_and_raise(
-            _log, ResourceLoadError,
-            'mecab is not available on this system'
+
+
+def _get_mecab_dicdir() -> str:
+    """Return the MeCab dictionary directory on the system."""
+    return _run_mecab_config(
+        '--dicdir', 'MeCab dictionary directory could not be retrieved'
+    )
+
+
+def _run_mecab_config(option: str, error_msg: str) -> str:
+    """Return the output of mecab-config for the option.
+
+    Raises:
+        ResourceLoadError: mecab-config failed, so error_msg is raised.
+    """
+    try:
+        output = subprocess.run(
+            [_MECAB_CONFIG_EXECUTABLE, option], capture_output=True
         )
+    except OSError:
+        output = None
+    if output is None or output.returncode != 0:
+        utils.log_and_raise(_log, ResourceLoadError, error_msg)
+
+    return output.stdout.decode(sys.stdout.encoding).strip()
 
-    mecab_version = output.stdout.decode(sys.stdout.encoding).strip()
-    return mecab_version
+
+def _get_mecab_decomp_version() -> str:
+    """Return the version of the MeCab setup used to decompose text forms.
+
+    The MeCab decomposition of a text form can change with either the MeCab
+    version or the ipadic-NEologd version, so both are included.
+    """
+    return 'MeCab {} ipadic-NEologd {}'.format(
+        _get_mecab_version(), _get_ipadic_neologd_version()
+    )
 
 
 def _get_jmdict_version() -> str:
@@ -159,7 +396,17 @@ class JapaneseTextAnalyzer(object):
     _SYMBOL_PART_OF_SPEECH = '記号'  # Japanese word for symbol (kigou)
 
     def __init__(self) -> None:
-        """Load the external resources needed for text analysis."""
+        """Load the external resources needed for text analysis.
+
+        If MYAKU_PARSE_CACHE_SIZE is set in the environment to a positive
+        integer, the lexical items found in up to that many distinct text
+        blocks are cached so that text blocks that repeat across articles are
+        only analyzed once.
+
+        Raises:
+            EnvironmentNotSetError: MYAKU_PARSE_CACHE_SIZE is set to a value
+                that is not a positive integer.
+        """
         jmdict_xml_filepath = utils.get_value_from_env_variable(
             _JMDICT_XML_FILEPATH_ENV_VAR
         )
@@ -169,12 +416,38 @@ class JapaneseTextAnalyzer(object):
 
         self._mecab_tagger = MecabTagger()
 
+        parse_cache_size = utils.get_positive_int_from_env(
+            _PARSE_CACHE_SIZE_ENV_VAR
+        )
+        self._parse_cache_size = (
+            0 if parse_cache_size is None else parse_cache_size
+        )
+        self._parse_cache: 'OrderedDict[bytes, _CachedLexicalItems]' = (
+            OrderedDict()
+        )
+        self._parse_cache_hits = 0
+        self._parse_cache_misses = 0
+        self._parse_cache_key_hash = None
+        if self._parse_cache_size > 0:
+            self._parse_cache_key_hash = self._get_parse_cache_key_base_hash()
+
+    @property
+    def parse_cache_counts(self) -> ParseCacheCounts:
+        """Counts of all lookups in the parse cache of the analyzer so far."""
+        return ParseCacheCounts(
+            self._parse_cache_hits, self._parse_cache_misses
+        )
+
     @utils.add_debug_logging
     def find_article_lexical_items(
         self, article: JpnArticle
     ) -> List[FoundJpnLexicalItem]:
         """Find all Japanese lexical items in an article.
 
+        Creates a found lexical item object for each lexical item, so
+        find_article_lexical_item_batch should be used instead if the found
+        lexical items are only going to be scored and stored.
+
         Args:
             article: Japnaese article whose full_text will be analyzed to find
                 lexical items.
@@ -182,48 +455,267 @@ class JapaneseTextAnalyzer(object):
         Returns:
             A list of all of the found lexical items in the article.
         """
+        return self.find_article_lexical_item_batch(
+            article
+        ).to_found_lexical_items()
+
+    @utils.add_debug_logging
+    def find_article_lexical_item_batch(
+        self, article: JpnArticle
+    ) -> FoundLexicalItemBatch:
+        """Find all Japanese lexical items in an article as a batch.
+
+        Args:
+            article: Japnaese article whose full_text will be analyzed to find
+                lexical items.
+
+        Returns:
+            A batch of all of the found lexical items in the article.
+        """
         article_blocks = article.full_text.splitlines()
         _log.debug(
             'Article "%s" split into %s blocks',
             article, len([b for b in article_blocks if len(b) > 0])
         )
 
-        offset = 0
-        article_lexical_items = []
-        for text_block in article_blocks:
+        builder = FoundLexicalItemBatchBuilder(article)
+        if self._parse_cache_size > 0:
+            self._add_blocks_lexical_items_cached(article_blocks, builder)
+            return builder.build()
+
+        blocks_lexical_items = self._find_blocks_lexical_items(
+            article_blocks, article
+        )
+        for text_block, found_lexical_items in zip(
+            article_blocks, blocks_lexical_items
+        ):
             if len(text_block) == 0:
-                offset += 1  # for new line char
                 continue
 
-            found_lexical_items = self._find_lexical_items(
-                text_block, offset, article
-            )
-
             _log.debug(
                 'Found %s lexical items in block "%s"',
                 len(found_lexical_items), utils.shorten_repr(text_block, 15)
             )
-            article_lexical_items.extend(found_lexical_items)
+            for fli in found_lexical_items:
+                builder.add_found_lexical_item(fli)
 
-            offset += len(text_block) + 1  # +1 for new line char
+        return builder.build()
+
+    def _find_blocks_lexical_items(
+        self, text_blocks: List[str], article: Optional[JpnArticle]
+    ) -> List[List[FoundJpnLexicalItem]]:
+        """Find the Japanese lexical items in each of the text blocks.
+
+        Args:
+            text_blocks: The text blocks to analyze. The found positions of
+                the found lexical items will be relative to the text made by
+                joining the blocks with new line characters.
+            article: The article containing the text blocks.
+
+        Returns:
+            A list with the found lexical items for each of the text blocks in
+            the same order as the given text blocks.
+        """
+        blocks_mecab_lexical_items = self._mecab_tagger.parse_blocks(
+            text_blocks
+        )
+
+        blocks_lexical_items: List[List[FoundJpnLexicalItem]] = []
+        for text_block, mecab_lexical_items in zip(
+            text_blocks, blocks_mecab_lexical_items
+        ):
+            if len(text_block) == 0:
+                blocks_lexical_items.append([])
+                continue
+
+            blocks_lexical_items.append(
+                self._find_lexical_items(mecab_lexical_items, article)
+            )
+        return blocks_lexical_items
+
+    def _add_blocks_lexical_items_cached(
+        self, text_blocks: List[str], builder: FoundLexicalItemBatchBuilder
+    ) -> None:
+        """Add the lexical items in each text block using the parse cache.
+
+        Only the text blocks whose lexical items are not in the parse cache are
+        analyzed, and the lexical items for them are then added to the cache.
+
+        The lexical items for the text blocks are added to the builder straight
+        from their cached form, so no found lexical item objects are created
+        for text blocks that hit the cache.
+
+        Args:
+            text_blocks: The text blocks of the article separated by new line
+                characters in the article text.
+            builder: Builder for the batch of found lexical items of the
+                article to add the lexical items to.
+        """
+        block_keys = [self._get_parse_cache_key(b) for b in text_blocks]
+        block_cached_items: Dict[bytes, _CachedLexicalItems] = {}
+        missed_blocks: Dict[bytes, str] = {}
+        for text_block, key in zip(text_blocks, block_keys):
+            if len(text_block) == 0:
+                continue
+
+            # Each non-empty block is counted as one lookup. A block repeated
+            # in the article is a hit after its first occurrence whether or not
+            # that first occurrence hit, since it is never analyzed again.
+            if key in block_cached_items or key in missed_blocks:
+                self._parse_cache_hits += 1
+                continue
+
+            cached_items = self._parse_cache.get(key)
+            if cached_items is not None:
+                self._parse_cache.move_to_end(key)
+                block_cached_items[key] = cached_items
+                self._parse_cache_hits += 1
+            else:
+                missed_blocks[key] = text_block
+                self._parse_cache_misses += 1
+
+        missed_block_results = self._find_missed_blocks_lexical_items(
+            missed_blocks, block_cached_items
+        )
+
+        block_offset = 0
+        for text_block, key in zip(text_blocks, block_keys):
+            if len(text_block) == 0:
+                pass
+            elif key in missed_block_results:
+                # The lexical items found for a missed block can be used
+                # directly for its first occurrence in the article instead of
+                # unpickling them from the cache.
+                found_lexical_items, block_start = missed_block_results.pop(
+                    key
+                )
+                shift = block_offset - block_start
+                for fli in found_lexical_items:
+                    position = fli.found_positions[0]
+                    builder.add(
+                        fli.base_form, position.start + shift, position.len,
+                        fli.possible_interps
+                    )
+            else:
+                cached_items = pickle.loads(block_cached_items[key])
+                for base_form, start, length, interps in cached_items:
+                    builder.add(
+                        base_form, start + block_offset, length, interps
+                    )
+            block_offset += len(text_block) + 1
+
+    def _find_missed_blocks_lexical_items(
+        self, missed_blocks: Dict[bytes, str],
+        block_cached_items: Dict[bytes, _CachedLexicalItems]
+    ) -> Dict[bytes, Tuple[List[FoundJpnLexicalItem], int]]:
+        """Find the lexical items in text blocks and add them to the cache.
+
+        Args:
+            missed_blocks: A map from the parse cache key of each text block to
+                analyze to the text block.
+            block_cached_items: A map from parse cache keys to cached lexical
+                items. The cached form of the lexical items found for each of
+                the missed blocks is added to it as well as to the parse cache
+                so that they can't be evicted before they are used.
+
+        Returns:
+            A map from the parse cache key of each of the text blocks to a
+            tuple of the lexical items found in the text block and the start
+            index of the block that the found positions of the lexical items
+            are relative to.
+        """
+        missed_blocks_lexical_items = self._find_blocks_lexical_items(
+            list(missed_blocks.values()), None
+        )
+
+        missed_block_results = {}
+        block_start = 0
+        for key, text_block, found_lexical_items in zip(
+            missed_blocks.keys(), missed_blocks.values(),
+            missed_blocks_lexical_items
+        ):
+            cached_items = self._to_cached_lexical_items(
+                found_lexical_items, block_start
+            )
+            block_cached_items[key] = cached_items
+            self._add_to_parse_cache(key, cached_items)
+            missed_block_results[key] = (found_lexical_items, block_start)
+            block_start += len(text_block) + 1
+        return missed_block_results
+
+    def _get_parse_cache_key_base_hash(self) -> 'hashlib.blake2b':
+        """Get the hash of the versions that all parse cache keys start with.
+
+        Including the versions in the keys means cached lexical items are never
+        used with different versions of the resources used to find them.
+        """
+        version_info = myaku.get_version_info()
+        versions_str = '\n'.join(
+            f'{name}={version}' for name, version in sorted(
+                version_info.items()
+            )
+        )
+        return hashlib.blake2b(
+            versions_str.encode('utf-8'), digest_size=16
+        )
+
+    @utils.skip_method_debug_logging
+    def _get_parse_cache_key(self, text_block: str) -> bytes:
+        """Get the parse cache key for a text block."""
+        key_hash = self._parse_cache_key_hash.copy()
+        key_hash.update(text_block.encode('utf-8'))
+        return key_hash.digest()
 
-        reduced_flis = reduce_found_lexical_items(article_lexical_items)
-        return reduced_flis
+    @utils.skip_method_debug_logging
+    def _add_to_parse_cache(
+        self, key: bytes, cached_items: _CachedLexicalItems
+    ) -> None:
+        """Add lexical items to the parse cache evicting the LRU if full."""
+        self._parse_cache[key] = cached_items
+        if len(self._parse_cache) > self._parse_cache_size:
+            self._parse_cache.popitem(last=False)
+
+    @utils.skip_method_debug_logging
+    def _to_cached_lexical_items(
+        self, found_lexical_items: List[FoundJpnLexicalItem], block_start: int
+    ) -> _CachedLexicalItems:
+        """Convert found lexical items for a block to their cached form.
+
+        Args:
+            found_lexical_items: Lexical items found in a text block. Each
+                must have only a single found position.
+            block_start: The start index of the text block in the text the
+                found positions of the found lexical items are relative to.
+
+        Returns:
+            The cached form of the found lexical items with positions relative
+            to the start of the text block.
+        """
+        return pickle.dumps(
+            tuple(
+                (
+                    fli.base_form, fli.found_positions[0].start - block_start,
+                    fli.found_positions[0].len, tuple(fli.possible_interps)
+                )
+                for fli in found_lexical_items
+            ),
+            pickle.HIGHEST_PROTOCOL
+        )
 
     def _find_lexical_items(
-        self, text: str, offset: int, article: JpnArticle
+        self, mecab_lexical_items: List[FoundJpnLexicalItem],
+        article: JpnArticle
     ) -> List[FoundJpnLexicalItem]:
         """Find all Japanese lexical items in a block of text.
 
         Args:
-            text: Text block that will be analyzed for lexical items.
-            offset: The character offset of the text block in its article.
+            mecab_lexical_items: The lexical items found by MeCab in the text
+                block in the order they were found in the text block.
             article: The article containing the text block.
 
         Returns:
-            The found Japanese lexical items in the text.
+            The found Japanese lexical items in the text block.
         """
-        mecab_lexical_items = self._mecab_tagger.parse(text, offset)
         for lexical_item in mecab_lexical_items:
             lexical_item.article = article
 
@@ -262,85 +754,120 @@ class JapaneseTextAnalyzer(object):
             A list of the meta lexical items found within the given base
             lexical items.
         """
-        start = 0
         meta_lexical_items: List[FoundJpnLexicalItem] = []
-
-        while start < len(base_lexical_items):
-            end = start + 1
-            while end < len(base_lexical_items):
-                decomp = base_lexical_items[start:end + 1]
-                if not self._within_jmdict_max_entry_len(decomp):
-                    break
-
-                lookup_lexical_items = self._lookup_meta_lexical_item(decomp)
-                meta_lexical_items.extend(lookup_lexical_items)
-                end += 1
-            start += 1
+        for start in range(len(base_lexical_items)):
+            meta_lexical_items.extend(
+                self._find_meta_lexical_items_from_start(
+                    base_lexical_items, start
+                )
+            )
 
         return meta_lexical_items
 
     @utils.skip_method_debug_logging
-    def _within_jmdict_max_entry_len(
-        self, flis: List[FoundJpnLexicalItem]
-    ) -> bool:
-        """Check if a lexical item series len is <= max JMdict entry len.
+    def _find_meta_lexical_items_from_start(
+        self, base_lexical_items: List[FoundJpnLexicalItem], start: int
+    ) -> List[FoundJpnLexicalItem]:
+        """Find the meta lexical items starting at a base lexical item.
 
-        There are several ways to measure the length of a lexical item series
-        (i.e. # of items, len of surface forms, len of base forms), so this
-        function checks if any of those measures results in a length less than
-        the maximum JMdict entry length for that measure.
+        Walks the JMdict prefix tries one base lexical item at a time starting
+        from the base lexical item at the start index, and stops as soon as
+        none of the MeCab decomposition, surface form, or base form of the
+        series walked so far is a prefix of any JMdict entry.
 
         Args:
-            flis: A series of lexical items to check if <= max JMdict entry
-                len.
+            base_lexical_items: A series of base lexical items in the same
+                order that they were in the text they were found in.
+            start: Index of the base lexical item in base_lexical_items that
+                the found meta lexical items must start with.
 
         Returns:
-            True if at least one measure of the len of the lexical item series
-            is less than the max JMdict entry length for that measure, and
-            False if otherwise.
+            A list of the meta lexical items found that start with the base
+            lexical item at the start index.
         """
-        if len(flis) <= self._jmdict.max_mecab_decomp_len:
-            return True
+        decomp_trie = self._jmdict.mecab_decomp_trie
+        text_form_trie = self._jmdict.text_form_trie
+        decomp_node = decomp_trie.root
+        surface_node = text_form_trie.root
+        base_node = text_form_trie.root
+
+        meta_lexical_items: List[FoundJpnLexicalItem] = []
+        for end in range(start, len(base_lexical_items)):
+            item = base_lexical_items[end]
+            if decomp_node is not None:
+                decomp_node = decomp_trie.get_child(
+                    decomp_node, (item.base_form,)
+                )
+            if surface_node is not None:
+                surface_node = text_form_trie.get_child(
+                    surface_node, item.get_first_surface_form()
+                )
+            if base_node is not None:
+                base_node = text_form_trie.get_child(
+                    base_node, item.base_form
+                )
 
-        base_form_len = sum(len(item.base_form) for item in flis)
-        if base_form_len <= self._jmdict.max_text_form_len:
-            return True
+            if (decomp_node is None and surface_node is None
+                    and base_node is None):
+                break
 
-        surface_form_len = sum(
-            len(item.get_first_surface_form()) for item in flis
-        )
-        if surface_form_len <= self._jmdict.max_text_form_len:
-            return True
+            # A meta lexical item must consist of at least two base lexical
+            # items.
+            if end == start:
+                continue
 
-        return False
+            lookup_lexical_items = self._lookup_meta_lexical_item(
+                base_lexical_items[start:end + 1],
+                self._get_trie_node_entries(decomp_trie, decomp_node),
+                self._get_trie_node_entries(text_form_trie, surface_node),
+                self._get_trie_node_entries(text_form_trie, base_node)
+            )
+            meta_lexical_items.extend(lookup_lexical_items)
+
+        return meta_lexical_items
+
+    @utils.skip_method_debug_logging
+    def _get_trie_node_entries(
+        self, trie: 'SortedPrefixTrie', node: Optional['PrefixTrieNode']
+    ) -> List['JMdictEntry']:
+        """Get the JMdict entries whose key is the prefix of the trie node.
+
+        Returns an empty list if node is None or if its prefix is only a
+        prefix of JMdict entry keys rather than a full key itself.
+        """
+        if node is None or not trie.is_key(node):
+            return []
+        return self._jmdict[node.prefix]
 
     @utils.skip_method_debug_logging
     def _lookup_meta_lexical_item(
-        self, base_decomp: List[FoundJpnLexicalItem]
+        self, base_decomp: List[FoundJpnLexicalItem],
+        decomp_entries: List['JMdictEntry'],
+        surface_entries: List['JMdictEntry'],
+        base_entries: List['JMdictEntry']
     ) -> List[FoundJpnLexicalItem]:
-        """Look up the meta lexical item in JMdict.
+        """Create the lexical items for a meta lexical item's JMdict entries.
 
         Args:
             base_decomp: The decomposition of the meta lexical item into base
                 lexical items.
+            decomp_entries: The JMdict entries matching the MeCab
+                decomposition of the meta lexical item.
+            surface_entries: The JMdict entries matching the surface form of
+                the meta lexical item.
+            base_entries: The JMdict entries matching the concatenated base
+                forms of the meta lexical item.
 
         Returns:
             A list of all of the lexical items found in JMdict that match the
             meta lexical item.
         """
-        decomp_base_forms = tuple(item.base_form for item in base_decomp)
-        decomp_entries = self._jmdict[decomp_base_forms]
-
-        surface_form = ''.join(
-            item.get_first_surface_form() for item in base_decomp
-        )
-        surface_entries = self._jmdict[surface_form]
-
-        base_form = ''.join(decomp_base_forms)
-        base_entries = self._jmdict[base_form]
         if not (decomp_entries or surface_entries or base_entries):
             return []
 
+        surface_form_len = sum(
+            len(item.get_first_surface_form()) for item in base_decomp
+        )
         lexical_items = []
         entries = utils.unique(decomp_entries + surface_entries + base_entries)
         for entry in entries:
@@ -355,7 +882,7 @@ class JapaneseTextAnalyzer(object):
             lexical_item = FoundJpnLexicalItem(
                 base_form=entry.text_form,
                 found_positions=[ArticleTextPosition(
-                    base_decomp[0].found_positions[0].start, len(surface_form)
+                    base_decomp[0].found_positions[0].start, surface_form_len
                 )],
                 possible_interps=[
                     JpnLexicalItemInterp(
@@ -384,7 +911,88 @@ class JapaneseTextAnalyzer(object):
         return False
 
 
-@dataclass
+class PrefixTrieNode(NamedTuple):
+    """A node of a SortedPrefixTrie.
+
+    Attributes:
+        prefix: The key prefix that the node represents.
+        start: Index of the first key in the sorted key array of the trie that
+            starts with the prefix.
+        end: Index one past the last key in the sorted key array of the trie
+            that starts with the prefix.
+    """
+    prefix: Union[str, Tuple[str, ...]]
+    start: int
+    end: int
+
+
+class SortedPrefixTrie(object):
+    """Prefix trie for a fixed set of keys stored in a sorted array.
+
+    Instead of creating an object for every node, each node of the trie is
+    represented by the range of the sorted key array holding the keys that
+    start with the prefix for that node, and moving from a node to one of its
+    children narrows that range with two binary searches. This keeps the
+    memory cost of the trie at one reference per key.
+
+    Works for both str keys (extended by substrings) and tuple keys (extended
+    by subtuples).
+    """
+
+    def __init__(
+        self, keys: Sequence[Union[str, Tuple[str, ...]]],
+        empty_key: Union[str, Tuple[str, ...]],
+        end_marker: Union[str, Tuple[str, ...]], keys_sorted: bool = False
+    ) -> None:
+        """Build the sorted key array for the trie.
+
+        Args:
+            keys: The keys to store in the trie.
+            empty_key: The empty value of the type of the keys (e.g. '' for
+                str keys). Used as the prefix for the root node.
+            end_marker: A length one value of the type of the keys that
+                compares greater than any part of a key that could follow a
+                prefix.
+            keys_sorted: If True, keys must already be sorted, and keys will
+                be used as the sorted key array of the trie instead of making
+                a sorted copy of keys.
+        """
+        self._keys: Sequence[Union[str, Tuple[str, ...]]]
+        if keys_sorted:
+            self._keys = keys
+        else:
+            self._keys = sorted(keys)
+        self._end_marker = end_marker
+        self.root = PrefixTrieNode(empty_key, 0, len(self._keys))
+
+    def __len__(self) -> int:
+        """Return the number of keys in the trie."""
+        return len(self._keys)
+
+    def get_child(
+        self, node: PrefixTrieNode, key_part: Union[str, Tuple[str, ...]]
+    ) -> Optional[PrefixTrieNode]:
+        """Get the node for the prefix of node extended by key_part.
+
+        Returns None if no key in the trie starts with the extended prefix.
+        """
+        # The prefix, key part, and end marker are always all str or all
+        # tuples, but mypy can't tell that from the Union types.
+        prefix = node.prefix + key_part  # type: ignore
+        end_prefix = prefix + self._end_marker  # type: ignore
+        start = bisect_left(self._keys, prefix, node.start, node.end)
+        end = bisect_left(self._keys, end_prefix, start, node.end)
+        if start == end:
+            return None
+
+        return PrefixTrieNode(prefix, start, end)
+
+    def is_key(self, node: PrefixTrieNode) -> bool:
+        """Return True if the prefix of the node is a key in the trie."""
+        return self._keys[node.start] == node.prefix
+
+
+@dataclass(init=False)
 class JMdictEntry(object):
     """The data for an entry from JMdict.
 
@@ -395,30 +1003,705 @@ class JMdictEntry(object):
     entry related to that text form. This form is used because it is easier to
     work with for text analysis.
 
-    Attributes:
-        entry_id: The unique ID of the JMdict XML entry that the data for this
-            entry came from.
-        text_form: The Japanese text representation of the entry. The defining
-            part of the entry.
-        text_form_info: Info related to this specific text form that may not
-            apply to other text forms of the same entry (e.g. if the text form
-            uses ateji kanji).
-        text_form_freq: Info related to how frequently this entry is used in
-            Japanese. See JMdict schema for how to decode this info.
-        parts_of_speech: Parts of speech that apply to this entry.
-        fields: The fields of application for this entry (e.g. food term,
-            baseball term, etc.)
-        dialect: The dialects that apply for this entry (e.g. kansaiben).
-        misc: Other miscellaneous info recorded for this entry from JMdict.
-    """
-    entry_id: str = None
-    text_form: str = None
-    text_form_info: Tuple[str, ...] = None
-    text_form_freq: Tuple[str, ...] = None
-    parts_of_speech: Tuple[str, ...] = None
-    fields: Tuple[str, ...] = None
-    dialects: Tuple[str, ...] = None
-    misc: Tuple[str, ...] = None
+    Attributes:
+        entry_id: The unique ID of the JMdict XML entry that the data for this
+            entry came from.
+        text_form: The Japanese text representation of the entry. The defining
+            part of the entry.
+        text_form_info: Info related to this specific text form that may not
+            apply to other text forms of the same entry (e.g. if the text form
+            uses ateji kanji).
+        text_form_freq: Info related to how frequently this entry is used in
+            Japanese. See JMdict schema for how to decode this info.
+        parts_of_speech: Parts of speech that apply to this entry.
+        fields: The fields of application for this entry (e.g. food term,
+            baseball term, etc.)
+        dialect: The dialects that apply for this entry (e.g. kansaiben).
+        misc: Other miscellaneous info recorded for this entry from JMdict.
+
+    Entries use __slots__ instead of an instance dict because many thousands
+    of them can be held in memory at once. Because of this, the fields have no
+    class-level defaults, so the init is defined explicitly instead of by the
+    dataclass decorator.
+    """
+    __slots__ = (
+        'entry_id',
+        'text_form',
+        'text_form_info',
+        'text_form_freq',
+        'parts_of_speech',
+        'fields',
+        'dialects',
+        'misc',
+    )
+
+    entry_id: str
+    text_form: str
+    text_form_info: Tuple[str, ...]
+    text_form_freq: Tuple[str, ...]
+    parts_of_speech: Tuple[str, ...]
+    fields: Tuple[str, ...]
+    dialects: Tuple[str, ...]
+    misc: Tuple[str, ...]
+
+    def __init__(
+        self,
+        entry_id: str = None,
+        text_form: str = None,
+        text_form_info: Tuple[str, ...] = None,
+        text_form_freq: Tuple[str, ...] = None,
+        parts_of_speech: Tuple[str, ...] = None,
+        fields: Tuple[str, ...] = None,
+        dialects: Tuple[str, ...] = None,
+        misc: Tuple[str, ...] = None
+    ) -> None:
+        """Initialize the entry with the given field values."""
+        self.entry_id = entry_id
+        self.text_form = text_form
+        self.text_form_info = text_form_info
+        self.text_form_freq = text_form_freq
+        self.parts_of_speech = parts_of_speech
+        self.fields = fields
+        self.dialects = dialects
+        self.misc = misc
+
+
+class JMdictXmlEntryInfo(NamedTuple):
+    """Info for an entry element from a JMdict XML file.
+
+    Attributes:
+        entry_id: The unique ID (ent_seq) of the XML entry.
+        content_hash: Hash of the XML of the entry element. Changes if any of
+            the content of the entry element changes.
+        entry_count: The number of JMdictEntry objects parsed from the XML
+            entry.
+    """
+    entry_id: str
+    content_hash: int
+    entry_count: int
+
+
+class _LazyDecodedSequence(Sequence):
+    """Sequence whose items are only decoded when first accessed.
+
+    Each item is cached once decoded, so every access of an item after the
+    first gives the same object.
+    """
+
+    def __init__(
+        self, length: int, decode_item: Callable[[int], Any],
+        first_items: Optional[List[Any]] = None
+    ) -> None:
+        """Init the sequence without decoding any more of its items.
+
+        Args:
+            length: Number of items in the sequence.
+            decode_item: Function that decodes the item at the index given to
+                it. Only called with indexes in the range of the sequence.
+            first_items: Already decoded items for the start of the sequence.
+        """
+        self._decode_item = decode_item
+        self._items: List[Any] = list(first_items or [])
+        self._items.extend([None] * (length - len(self._items)))
+
+    def __len__(self) -> int:
+        """Return the number of items in the sequence."""
+        return len(self._items)
+
+    def __getitem__(self, index):
+        """Get the item at the index, decoding it if not yet decoded."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+
+        item = self._items[index]
+        if item is None:
+            if index < 0:
+                index += len(self._items)
+            item = self._decode_item(index)
+            self._items[index] = item
+        return item
+
+    @property
+    def decoded_items(self) -> List[Any]:
+        """List of the items of the sequence with None if not yet decoded."""
+        return self._items
+
+
+class JMdictIndex(object):
+    """Memory-mapped compact binary index of JMdict entries.
+
+    The index file is made up of a header followed by these sections:
+        - String table: Every distinct string in the entries UTF-8 encoded and
+            concatenated. The sorted text forms of the entries come first in
+            the table so that they can be used as the text form keys of the
+            index.
+        - Decomposition version: The versions of MeCab and ipadic-NEologd used
+            for the MeCab decompositions.
+        - String offsets: The byte offset of each string in the string table.
+        - MeCab decomposition keys: Offsets array and string ID array for the
+            sorted distinct MeCab decompositions of the entries.
+        - Tuple table: Offsets array and string ID array for every distinct
+            tuple of strings in the entries.
+        - Entry records: A fixed size record of string and tuple IDs for each
+            entry.
+        - Entry decompositions: The MeCab decomposition key index for each
+            entry.
+        - Key entry lists: Offsets array and entry index array for the entries
+            of each text form key and each MeCab decomposition key.
+        - XML entries: The ID, entry offset, and content hash of each entry
+            element of the JMdict XML file the entries were parsed from.
+
+    Only the text form keys and MeCab decomposition keys are decoded on open
+    so that they can be binary searched as lists of str and tuple objects.
+    Each other string is decoded from the memory-mapped file the first time
+    it is accessed and cached after that, and the rest of the data is only
+    decoded into JMdictEntry objects on lookup. The memory pages for the data
+    not yet decoded are shared by every process using the same index file via
+    the OS page cache.
+
+    Arrays in the index file use the native byte order of the system that
+    wrote the file, so an index file should only be used on the system that
+    wrote it.
+    """
+
+    _MAGIC = b'MYAKUJMI'
+    _FORMAT_VERSION = 4
+
+    # Format: magic, format version, entry count, string count, text form key
+    # count, MeCab decomposition key count, XML entry count, max text form
+    # len, max MeCab decomposition len, then the byte offset and byte len of
+    # each section.
+    _HEADER_STRUCT = struct.Struct('=8s8I32Q')
+    _SECTION_ALIGNMENT = 8
+
+    _ARRAY_TYPECODE: Literal['I'] = 'I'
+    _HASH_ARRAY_TYPECODE: Literal['Q'] = 'Q'
+    _NONE_ID = 0xFFFFFFFF
+
+    _ENTRY_TUPLE_ATTRS = [
+        'text_form_info',
+        'text_form_freq',
+        'parts_of_speech',
+        'fields',
+        'dialects',
+        'misc',
+    ]
+    _ENTRY_RECORD_LEN = 2 + len(_ENTRY_TUPLE_ATTRS)
+
+    # Max number of decoded entries to keep cached per index.
+    _ENTRY_CACHE_SIZE = 2**16
+
+    @property
+    def max_text_form_len(self) -> int:
+        """Max len of a text form of the index entries."""
+        return self._max_text_form_len
+
+    @property
+    def max_mecab_decomp_len(self) -> int:
+        """Max len of a MeCab decomposition of the index entries."""
+        return self._max_mecab_decomp_len
+
+    @property
+    def decomp_version(self) -> str:
+        """Versions of MeCab and ipadic-NEologd used for the decompositions."""
+        return self._decomp_version
+
+    @property
+    def text_form_keys(self) -> List[str]:
+        """Sorted list of the distinct text forms of the entries."""
+        return self._text_form_keys
+
+    @property
+    def mecab_decomp_keys(self) -> List[Tuple[str, ...]]:
+        """Sorted list of the distinct decompositions of the entries."""
+        return self._mecab_decomp_keys
+
+    def __init__(self, filepath: str) -> None:
+        """Open and memory map the index file.
+
+        Args:
+            filepath: Path to a JMdict index file written by
+                JMdictIndex.write.
+
+        Raises:
+            ResourceLoadError: The file is not a valid JMdict index file of the
+                current format version.
+        """
+        with open(filepath, 'rb') as index_file:
+            header = self._read_header(index_file, filepath)
+            self._mmap = mmap.mmap(
+                index_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        (self._entry_count, string_count, text_form_count, decomp_count,
+         self._xml_entry_count, self._max_text_form_len,
+         self._max_mecab_decomp_len) = header[2:9]
+        sections = [
+            self._get_section_view(header[i], header[i + 1])
+            for i in range(9, len(header), 2)
+        ]
+
+        self._string_table = sections[0]
+        self._decomp_version = str(sections[1], 'utf-8')
+        array_sections = [
+            section.cast(self._ARRAY_TYPECODE) for section in sections[2:-1]
+        ]
+        (self._string_offsets, self._decomp_key_offsets,
+         self._decomp_key_items, self._tuple_offsets, self._tuple_items,
+         self._entries,
+         self._entry_decomp_keys, self._text_form_entry_offsets,
+         self._text_form_entry_items, self._decomp_entry_offsets,
+         self._decomp_entry_items, self._xml_entry_ids,
+         self._xml_entry_offsets) = array_sections
+        self._xml_entry_hashes = sections[-1].cast(self._HASH_ARRAY_TYPECODE)
+
+        # The text forms are the first strings in the string table, so the
+        # decoded text form keys are given to the string table to share the
+        # str objects with it.
+        self._text_form_keys = self._decode_text_form_keys(text_form_count)
+        self._strings = _LazyDecodedSequence(
+            string_count, self._decode_string, self._text_form_keys
+        )
+        self._mecab_decomp_keys = self._decode_decomp_keys(decomp_count)
+
+        # The tuple table only has a few thousand distinct tuples, so every
+        # decoded tuple is cached to share it between all decoded entries.
+        self._tuple_cache: Dict[int, Tuple[str, ...]] = {}
+        self._get_entry = functools.lru_cache(self._ENTRY_CACHE_SIZE)(
+            self._decode_entry
+        )
+
+    def __len__(self) -> int:
+        """Return the number of entries in the index."""
+        return self._entry_count
+
+    def _read_header(
+        self, index_file: BinaryIO, filepath: str
+    ) -> Tuple[Any, ...]:
+        """Read and check the header of an index file before mapping it.
+
+        Raises:
+            ResourceLoadError: The file is empty, is not a JMdict index file
+                of the current format version, or is shorter than the sections
+                given in its header.
+        """
+        header_bytes = index_file.read(self._HEADER_STRUCT.size)
+        if len(header_bytes) < self._HEADER_STRUCT.size:
+            utils.log_and_raise(
+                _log, ResourceLoadError,
+                'JMdict index file at "{}" is too short to contain an index '
+                'header'.format(filepath)
+            )
+
+        header = self._HEADER_STRUCT.unpack(header_bytes)
+        if header[0] != self._MAGIC or header[1] != self._FORMAT_VERSION:
+            utils.log_and_raise(
+                _log, ResourceLoadError,
+                'File at "{}" is not a version {} JMdict index file'.format(
+                    filepath, self._FORMAT_VERSION
+                )
+            )
+
+        file_size = os.fstat(index_file.fileno()).st_size
+        if any(
+            header[i] + header[i + 1] > file_size
+            for i in range(9, len(header), 2)
+        ):
+            utils.log_and_raise(
+                _log, ResourceLoadError,
+                'JMdict index file at "{}" is truncated'.format(filepath)
+            )
+        return header
+
+    def _get_section_view(self, offset: int, byte_len: int) -> memoryview:
+        """Get a memoryview of a section of the memory-mapped index file."""
+        return memoryview(self._mmap)[offset:offset + byte_len]
+
+    def _decode_string(self, string_id: int) -> str:
+        """Decode the string with the ID from the string table."""
+        start = self._string_offsets[string_id]
+        end = self._string_offsets[string_id + 1]
+        return str(self._string_table[start:end], 'utf-8')
+
+    def _decode_text_form_keys(self, key_count: int) -> List[str]:
+        """Decode the text form keys from the start of the string table."""
+        offsets = self._string_offsets[:key_count + 1].tolist()
+        string_table = self._string_table
+        return [
+            str(string_table[start:end], 'utf-8')
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def _decode_decomp_keys(self, key_count: int) -> List[Tuple[str, ...]]:
+        """Decode all of the MeCab decomposition keys.
+
+        The base forms of the decompositions are decoded through the string
+        table, so a single str object is shared for each distinct base form
+        and text form.
+        """
+        offsets = self._decomp_key_offsets.tolist()
+        items = self._decomp_key_items.tolist()
+        strings = self._strings
+        return [
+            tuple([strings[i] for i in items[start:end]])
+            for start, end in zip(offsets, offsets[1:key_count + 1])
+        ]
+
+    def memory_stats(self) -> Dict[str, int]:
+        """Get stats on the memory used by the index.
+
+        Objects shared between the parts of the index are only counted in the
+        first part listed that uses them. The entry cache size is an estimate
+        based on the size of a single entry since the cached entries are not
+        accessible.
+
+        Returns:
+            A map from the name of each stat to its value. The names ending in
+            "_bytes" are sizes in bytes, and the names ending in "_count" are
+            object counts.
+        """
+        seen_ids: Set[int] = set()
+        stats = {
+            'index_file_bytes': len(self._mmap),
+            'text_form_key_bytes': utils.get_deep_size(
+                self._text_form_keys, seen_ids
+            ),
+            'mecab_decomp_key_bytes': utils.get_deep_size(
+                self._mecab_decomp_keys, seen_ids
+            ),
+            'string_table_bytes': utils.get_deep_size(
+                self._strings.decoded_items, seen_ids
+            ),
+            'string_decoded_count': self._get_decoded_count(self._strings),
+            'tuple_cache_bytes': utils.get_deep_size(
+                self._tuple_cache, seen_ids
+            ),
+            'tuple_cache_count': len(self._tuple_cache),
+            'entry_cache_bytes': 0,
+            'entry_cache_count': self._get_entry.cache_info().currsize,
+        }
+
+        if stats['entry_cache_count'] > 0:
+            # The text form and tuples of cached entries are shared with the
+            # string table and tuple cache, so only the entry objects and
+            # their entry ID strs are counted.
+            entry = self._decode_entry(0)
+            stats['entry_cache_bytes'] = stats['entry_cache_count'] * (
+                sys.getsizeof(entry) + sys.getsizeof(entry.entry_id)
+            )
+        return stats
+
+    def _get_decoded_count(self, sequence: _LazyDecodedSequence) -> int:
+        """Get the number of items of the sequence decoded so far."""
+        return len(sequence) - sequence.decoded_items.count(None)
+
+    def get_text_form_entries(self, text_form: str) -> List[JMdictEntry]:
+        """Get the entries in the index with the given text form."""
+        key_index = bisect_left(self._text_form_keys, text_form)
+        if (key_index == len(self._text_form_keys)
+                or self._text_form_keys[key_index] != text_form):
+            return []
+
+        return self._get_key_entries(
+            self._text_form_entry_offsets, self._text_form_entry_items,
+            key_index
+        )
+
+    def get_mecab_decomp_entries(
+        self, mecab_decomp: Tuple[str, ...]
+    ) -> List[JMdictEntry]:
+        """Get the entries in the index with the given MeCab decomposition."""
+        key_index = bisect_left(self._mecab_decomp_keys, mecab_decomp)
+        if (key_index == len(self._mecab_decomp_keys)
+                or self._mecab_decomp_keys[key_index] != mecab_decomp):
+            return []
+
+        return self._get_key_entries(
+            self._decomp_entry_offsets, self._decomp_entry_items, key_index
+        )
+
+    def _get_key_entries(
+        self, entry_offsets: memoryview, entry_items: memoryview,
+        key_index: int
+    ) -> List[JMdictEntry]:
+        """Get the entries for a key from a key entry list section."""
+        start = entry_offsets[key_index]
+        end = entry_offsets[key_index + 1]
+        return [self._get_entry(i) for i in entry_items[start:end].tolist()]
+
+    def get_xml_entry_hashes(self) -> Dict[str, Tuple[int, int]]:
+        """Get the content hash of each XML entry the index was built from.
+
+        Returns:
+            A map from the ID of each XML entry to a tuple of the content hash
+            of the XML entry and the index of the XML entry in the index. The
+            index of the XML entry can be used to get its data with
+            get_xml_entry_data.
+        """
+        return {
+            str(entry_id): (content_hash, i)
+            for i, (entry_id, content_hash) in enumerate(zip(
+                self._xml_entry_ids.tolist(), self._xml_entry_hashes.tolist()
+            ))
+        }
+
+    def get_xml_entry_data(
+        self, xml_entry_index: int
+    ) -> Tuple[List[JMdictEntry], List[Tuple[str, ...]]]:
+        """Get the entries parsed from an XML entry the index was built from.
+
+        Args:
+            xml_entry_index: Index of the XML entry in the index as given by
+                get_xml_entry_hashes.
+
+        Returns:
+            A tuple of the list of entries parsed from the XML entry and a list
+            of the MeCab decompositions of each of those entries.
+        """
+        start = self._xml_entry_offsets[xml_entry_index]
+        end = self._xml_entry_offsets[xml_entry_index + 1]
+        entries = [self._decode_entry(i) for i in range(start, end)]
+        mecab_decomps = [
+            self._mecab_decomp_keys[i]
+            for i in self._entry_decomp_keys[start:end].tolist()
+        ]
+        return (entries, mecab_decomps)
+
+    def _decode_entry(self, entry_index: int) -> JMdictEntry:
+        """Decode the entry record at the index into a JMdictEntry."""
+        record_start = entry_index * self._ENTRY_RECORD_LEN
+        record = self._entries[
+            record_start:record_start + self._ENTRY_RECORD_LEN
+        ].tolist()
+
+        # The tuple attrs are in the same order as the JMdictEntry fields, so
+        # they can be given as positional args.
+        return JMdictEntry(
+            str(record[0]), self._strings[record[1]],
+            *[self._decode_tuple(tuple_id) for tuple_id in record[2:]]
+        )
+
+    def _decode_tuple(self, tuple_id: int) -> Optional[Tuple[str, ...]]:
+        """Decode the tuple with the ID from the tuple table."""
+        if tuple_id == self._NONE_ID:
+            return None
+
+        decoded_tuple = self._tuple_cache.get(tuple_id)
+        if decoded_tuple is None:
+            start = self._tuple_offsets[tuple_id]
+            end = self._tuple_offsets[tuple_id + 1]
+            decoded_tuple = tuple(
+                self._strings[i]
+                for i in self._tuple_items[start:end].tolist()
+            )
+            self._tuple_cache[tuple_id] = decoded_tuple
+        return decoded_tuple
+
+    @classmethod
+    def write(
+        cls, filepath: str, entries: List[JMdictEntry],
+        mecab_decomps: List[Tuple[str, ...]],
+        xml_entry_infos: List[JMdictXmlEntryInfo], decomp_version: str
+    ) -> None:
+        """Write an index file for the given entries.
+
+        The file is written to a temporary path first and then moved into
+        place, so processes with the previous index file at the path open are
+        not affected.
+
+        Args:
+            filepath: Path to write the index file to.
+            entries: The JMdict entries for the index. Lookups in the index
+                give entries in the same order as this list.
+            mecab_decomps: The MeCab decomposition of the text form of each
+                entry in entries.
+            xml_entry_infos: The info for each XML entry the entries were
+                parsed from in the same order as the entries. The entries
+                parsed from each XML entry must be contiguous in entries.
+            decomp_version: The versions of MeCab and ipadic-NEologd used for
+                the MeCab decompositions as given by _get_mecab_decomp_version.
+
+        Raises:
+            ResourceLoadError: Some data for the entries could not be stored in
+                the index format.
+        """
+        text_form_entry_lists: Dict[str, List[int]] = defaultdict(list)
+        decomp_entry_lists: Dict[Tuple[str, ...], List[int]] = (
+            defaultdict(list)
+        )
+        for i, (entry, decomp) in enumerate(zip(entries, mecab_decomps)):
+            text_form_entry_lists[entry.text_form].append(i)
+            decomp_entry_lists[decomp].append(i)
+        text_forms = sorted(text_form_entry_lists)
+        decomps = sorted(decomp_entry_lists)
+
+        # The text forms are given the first string IDs so that they come
+        # first in the string table.
+        string_ids = {text_form: i for i, text_form in enumerate(text_forms)}
+        tuple_ids: Dict[Tuple[str, ...], int] = {}
+        entry_records = array(cls._ARRAY_TYPECODE)
+        for entry in entries:
+            entry_records.extend(
+                cls._encode_entry(entry, string_ids, tuple_ids)
+            )
+
+        decomp_key_indexes = {decomp: i for i, decomp in enumerate(decomps)}
+        entry_decomp_keys = array(
+            cls._ARRAY_TYPECODE,
+            (decomp_key_indexes[decomp] for decomp in mecab_decomps)
+        )
+
+        # The string IDs for the decompositions and tuples are added to
+        # string_ids as they are encoded, so the string table must be encoded
+        # after them.
+        decomp_key_sections = cls._encode_string_tuples(decomps, string_ids)
+        tuple_sections = cls._encode_string_tuples(
+            list(tuple_ids), string_ids
+        )
+        string_table, string_offsets = cls._encode_strings(list(string_ids))
+
+        sections = [
+            string_table,
+            decomp_version.encode('utf-8'),
+            string_offsets,
+            *decomp_key_sections,
+            *tuple_sections,
+            entry_records.tobytes(),
+            entry_decomp_keys.tobytes(),
+            *cls._encode_key_entry_lists(text_forms, text_form_entry_lists),
+            *cls._encode_key_entry_lists(decomps, decomp_entry_lists),
+            *cls._encode_xml_entry_infos(xml_entry_infos),
+        ]
+
+        header_values: List[Any] = [
+            cls._MAGIC, cls._FORMAT_VERSION, len(entries), len(string_ids),
+            len(text_forms), len(decomps), len(xml_entry_infos),
+            max((len(text_form) for text_form in text_forms), default=0),
+            max((len(decomp) for decomp in decomps), default=0),
+        ]
+        offset = cls._HEADER_STRUCT.size
+        for section in sections:
+            offset += cls._get_alignment_padding_len(offset)
+            header_values.extend([offset, len(section)])
+            offset += len(section)
+
+        temp_filepath = filepath + '.tmp'
+        with open(temp_filepath, 'wb') as index_file:
+            index_file.write(cls._HEADER_STRUCT.pack(*header_values))
+            for section in sections:
+                index_file.write(
+                    b'\x00' * cls._get_alignment_padding_len(
+                        index_file.tell()
+                    )
+                )
+                index_file.write(section)
+        os.replace(temp_filepath, filepath)
+
+    @classmethod
+    def _encode_entry(
+        cls, entry: JMdictEntry, string_ids: Dict[str, int],
+        tuple_ids: Dict[Tuple[str, ...], int]
+    ) -> List[int]:
+        """Encode an entry into an entry record.
+
+        Args:
+            entry: The entry to encode.
+            string_ids: Map of strings to their IDs in the string table. Must
+                already contain the text form of the entry.
+            tuple_ids: Map of tuples to their IDs in the tuple table. The
+                tuples of the entry are added to it if not already in it.
+
+        Returns:
+            The entry record for the entry.
+
+        Raises:
+            ResourceLoadError: The entry ID is not an integer.
+        """
+        if not entry.entry_id.isdigit():
+            utils.log_and_raise(
+                _log, ResourceLoadError,
+                'JMdict entry ID "{}" is not an integer'.format(
+                    entry.entry_id
+                )
+            )
+
+        record = [int(entry.entry_id), string_ids[entry.text_form]]
+        for attr in cls._ENTRY_TUPLE_ATTRS:
+            value = getattr(entry, attr)
+            if value is None:
+                record.append(cls._NONE_ID)
+            else:
+                record.append(tuple_ids.setdefault(value, len(tuple_ids)))
+        return record
+
+    @classmethod
+    def _encode_string_tuples(
+        cls, string_tuples: List[Tuple[str, ...]], string_ids: Dict[str, int]
+    ) -> Tuple[bytes, bytes]:
+        """Encode tuples of strings into offset and string ID arrays.
+
+        Args:
+            string_tuples: The tuples of strings to encode.
+            string_ids: Map of strings to their IDs in the string table. The
+                strings of the tuples are added to it if not already in it.
+        """
+        tuple_offsets = array(cls._ARRAY_TYPECODE, [0])
+        tuple_items = array(cls._ARRAY_TYPECODE)
+        for string_tuple in string_tuples:
+            for string in string_tuple:
+                tuple_items.append(string_ids.setdefault(
+                    string, len(string_ids)
+                ))
+            tuple_offsets.append(len(tuple_items))
+        return (tuple_offsets.tobytes(), tuple_items.tobytes())
+
+    @classmethod
+    def _encode_xml_entry_infos(
+        cls, xml_entry_infos: List[JMdictXmlEntryInfo]
+    ) -> Tuple[bytes, bytes, bytes]:
+        """Encode the XML entry infos into ID, offset, and hash arrays."""
+        xml_entry_ids = array(
+            cls._ARRAY_TYPECODE,
+            (int(info.entry_id) for info in xml_entry_infos)
+        )
+        xml_entry_offsets = array(cls._ARRAY_TYPECODE, [0])
+        for info in xml_entry_infos:
+            xml_entry_offsets.append(xml_entry_offsets[-1] + info.entry_count)
+        xml_entry_hashes = array(
+            cls._HASH_ARRAY_TYPECODE,
+            (info.content_hash for info in xml_entry_infos)
+        )
+        return (
+            xml_entry_ids.tobytes(), xml_entry_offsets.tobytes(),
+            xml_entry_hashes.tobytes()
+        )
+
+    @classmethod
+    def _get_alignment_padding_len(cls, offset: int) -> int:
+        """Get the number of padding bytes to align a section at offset."""
+        return -offset % cls._SECTION_ALIGNMENT
+
+    @classmethod
+    def _encode_strings(cls, strings: List[str]) -> Tuple[bytes, bytes]:
+        """Encode the strings into a string table and its offsets array."""
+        encoded_strings = [string.encode('utf-8') for string in strings]
+        string_offsets = array(cls._ARRAY_TYPECODE, [0])
+        for encoded_string in encoded_strings:
+            string_offsets.append(string_offsets[-1] + len(encoded_string))
+        return (b''.join(encoded_strings), string_offsets.tobytes())
+
+    @classmethod
+    def _encode_key_entry_lists(
+        cls, keys: Sequence[Union[str, Tuple[str, ...]]],
+        key_entry_lists: Dict[Any, List[int]]
+    ) -> Tuple[bytes, bytes]:
+        """Encode the entry lists for the keys into offset and item arrays."""
+        entry_offsets = array(cls._ARRAY_TYPECODE, [0])
+        entry_items = array(cls._ARRAY_TYPECODE)
+        for key in keys:
+            entry_items.extend(key_entry_lists[key])
+            entry_offsets.append(len(entry_items))
+        return (entry_offsets.tobytes(), entry_items.tobytes())
 
 
 @utils.singleton_per_config
@@ -426,16 +1709,28 @@ class JMdictEntry(object):
 class JMdict(object):
     """Object representation of a JMdict dictionary."""
 
-    EntryMap = Dict[str, List[JMdictEntry]]
-    MecabDecompMap = Dict[Tuple[str, ...], List[JMdictEntry]]
+    _INDEX_FILENAME = 'JMdict.index'
+    _DECOMP_CACHE_FILENAME = 'JMdict_decomp_cache.shelf'
+
+    # Number of text forms given to a worker process at a time when getting
+    # the MeCab decompositions of the text forms.
+    _DECOMP_CHUNK_SIZE = 2000
 
-    _SHELF_FILENAME = 'JMdict.shelf'
+    # Number of XML entries to load between logs of the JMdict XML load
+    # progress.
+    _LOAD_PROGRESS_LOG_INTERVAL = 10000
 
     _REPR_ELEMENT_TAGS = {
         'k_ele',  # Kanji representation
         'r_ele',  # Reading (kana) representation
     }
 
+    _ENTRY_ELEMENT_TAG = 'entry'
+
+    # Separator for the parts of an XML entry hashed for incremental builds.
+    # It can't occur in JMdict XML text, so it keeps the parts unambiguous.
+    _HASH_PART_SEPARATOR = '\x00'
+
     _SENSE_ELEMENT_TAG = 'sense'
 
     _ENTRY_ID_TAG = 'ent_seq'
@@ -527,6 +1822,34 @@ class JMdict(object):
 
         return self._max_mecab_decomp_len
 
+    @property
+    def text_form_trie(self) -> SortedPrefixTrie:
+        """Prefix trie of the text forms of the loaded JMdict entries.
+
+        Property in order to make it read-only.
+        """
+        if self._text_form_trie is None:
+            utils.log_and_raise(
+                _log, ResourceNotReadyError,
+                'JMdict object used before loading any JMdict data.'
+            )
+
+        return self._text_form_trie
+
+    @property
+    def mecab_decomp_trie(self) -> SortedPrefixTrie:
+        """Prefix trie of the MeCab decompositions of the loaded entries.
+
+        Property in order to make it read-only.
+        """
+        if self._mecab_decomp_trie is None:
+            utils.log_and_raise(
+                _log, ResourceNotReadyError,
+                'JMdict object used before loading any JMdict data.'
+            )
+
+        return self._mecab_decomp_trie
+
     @dataclass
     class _JMdictSense(object):
         """The data for a sense element for a JMdict entry.
@@ -558,11 +1881,11 @@ class JMdict(object):
         Args:
             jmdict_xml_filepath: JMdict XML file to load the JMdict data from.
         """
-        self._entry_map: JMdict.EntryMap = None
-        self._mecab_decomp_map: JMdict.MecabDecompMap = None
+        self._index: JMdictIndex = None
         self._max_text_form_len: int = None
         self._max_mecab_decomp_len: int = None
-        self._mecab_tagger = MecabTagger()
+        self._text_form_trie: SortedPrefixTrie = None
+        self._mecab_decomp_trie: SortedPrefixTrie = None
 
         if jmdict_xml_filepath is not None:
             self.load_jmdict(jmdict_xml_filepath)
@@ -685,6 +2008,9 @@ class JMdict(object):
         self, storage_obj: Any, attr_name: str, append_item: str
     ) -> None:
         """Create new tuple for attr of storage object with item appended."""
+        # Tuple items such as parts of speech are from a small set of values
+        # repeated across most entries, so they are interned to share them.
+        append_item = sys.intern(append_item)
         current_val = getattr(storage_obj, attr_name)
         if current_val is None:
             setattr(storage_obj, attr_name, (append_item,))
@@ -728,6 +2054,15 @@ class JMdict(object):
     def load_jmdict(self, xml_filepath: str) -> None:
         """Load data from a JMdict XML file.
 
+        If the JMdict index file was last modified after the XML file, loads
+        the data from the index file. Otherwise, builds a new index file from
+        the XML file and loads the data from it.
+
+        If MYAKU_JMDICT_INCREMENTAL_BUILD is set to 1 in the environment and
+        there is an existing index file, only the XML entries that were added
+        or changed since that index file was built are parsed and decomposed.
+        The data for all other XML entries is taken from the existing index.
+
         Args:
             xml_filepath: Path to an JMdict XML file.
 
@@ -736,7 +2071,7 @@ class JMdict(object):
                 file that prevented it from being loaded.
         """
         xml_last_modified_time = os.path.getmtime(xml_filepath)
-        if self._load_from_shelf_if_newer(xml_last_modified_time):
+        if self._load_index_if_newer(xml_last_modified_time):
             return
 
         if not os.path.exists(xml_filepath):
@@ -745,111 +2080,453 @@ class JMdict(object):
                 'JMdict file not found at "{}"'.format(xml_filepath)
             )
 
+        index_path = self._get_index_filepath()
+        decomp_version = _get_mecab_decomp_version()
+        prev_index = None
+        if int(os.environ.get(_JMDICT_INCREMENTAL_BUILD_ENV_VAR, 0)) == 1:
+            prev_index = self._open_prev_index(index_path)
+
         _log.debug('Reading JMdict XML file at "%s"', xml_filepath)
-        tree = ElementTree.parse(xml_filepath)
+        entries, mecab_decomps, xml_entry_infos = self._read_xml_entries(
+            xml_filepath, prev_index, decomp_version
+        )
         _log.debug('Reading of JMdict XML file complete')
 
-        self._entry_map = defaultdict(list)
-        self._mecab_decomp_map = defaultdict(list)
-        root = tree.getroot()
-        for entry_element in root:
-            entry_objs = self._parse_entry_xml(entry_element)
-            for entry_obj in entry_objs:
-                mecab_decomp = self._get_mecab_decomb(entry_obj)
-                self._mecab_decomp_map[mecab_decomp].append(entry_obj)
-                self._entry_map[entry_obj.text_form].append(entry_obj)
+        undecomposed_indexes = [
+            i for i, decomp in enumerate(mecab_decomps) if decomp is None
+        ]
+        new_decomps = self._get_mecab_decomps(
+            [entries[i].text_form for i in undecomposed_indexes],
+            decomp_version
+        )
+        for i, decomp in zip(undecomposed_indexes, new_decomps):
+            mecab_decomps[i] = decomp
+
+        _log.debug('Writing JMdict index to "%s"', index_path)
+        JMdictIndex.write(
+            index_path, entries, mecab_decomps, xml_entry_infos,
+            decomp_version
+        )
+        self._load_index(index_path)
+
+    def _open_prev_index(self, index_path: str) -> Optional[JMdictIndex]:
+        """Open the previously built index for an incremental build.
+
+        Returns:
+            The previously built index, or None if there is no usable index
+            at the index path.
+        """
+        if not os.path.exists(index_path):
+            _log.info(
+                'No previous JMdict index at "%s", so doing a full build',
+                index_path
+            )
+            return None
+
+        try:
+            return JMdictIndex(index_path)
+        except ResourceLoadError:
+            _log.info(
+                'Previous JMdict index at "%s" could not be loaded, so '
+                'doing a full build', index_path
+            )
+            return None
+
+    def _read_xml_entries(
+        self, xml_filepath: str, prev_index: Optional[JMdictIndex],
+        decomp_version: str
+    ) -> Tuple[List[JMdictEntry], List[Optional[Tuple[str, ...]]],
+               List[JMdictXmlEntryInfo]]:
+        """Read the entries from a JMdict XML file.
+
+        Args:
+            xml_filepath: Path to an JMdict XML file.
+            prev_index: A previously built index. If given, the entries and
+                MeCab decompositions for XML entries that have not changed
+                since the previous index was built are taken from it instead of
+                being parsed from the XML. The MeCab decompositions are only
+                taken from it if it was built with the same MeCab and
+                ipadic-NEologd versions.
+            decomp_version: The versions of MeCab and ipadic-NEologd
+                currently in use as given by _get_mecab_decomp_version.
+
+        Returns:
+            A 3-tuple of the JMdict entries from the file, the MeCab
+            decomposition of each entry or None if the entry still needs to be
+            decomposed, and the info for each XML entry in the file.
+
+        Raises:
+            ResourceLoadError: An XML entry element in the file was malformed.
+        """
+        prev_xml_entry_hashes = {}
+        reuse_decomps = False
+        if prev_index is not None:
+            prev_xml_entry_hashes = prev_index.get_xml_entry_hashes()
+            reuse_decomps = prev_index.decomp_version == decomp_version
+
+        entries: List[JMdictEntry] = []
+        mecab_decomps: List[Optional[Tuple[str, ...]]] = []
+        xml_entry_infos = []
+        reused_count = 0
+        changed_count = 0
+        for entry_element in self._iterparse_xml_entries(xml_filepath):
+            entry_id = entry_element.findtext(self._ENTRY_ID_TAG)
+            content_hash = self._hash_entry_xml(entry_element)
+            prev_hash, prev_xml_entry_index = prev_xml_entry_hashes.get(
+                entry_id, (None, None)
+            )
+
+            if prev_hash == content_hash:
+                entry_objs, entry_decomps = prev_index.get_xml_entry_data(
+                    prev_xml_entry_index
+                )
+                if not reuse_decomps:
+                    entry_decomps = [None] * len(entry_objs)
+                reused_count += 1
+            else:
+                entry_objs = self._parse_entry_xml(entry_element)
+                entry_decomps = [None] * len(entry_objs)
+                if prev_hash is not None:
+                    changed_count += 1
+
+            entries.extend(entry_objs)
+            mecab_decomps.extend(entry_decomps)
+            xml_entry_infos.append(JMdictXmlEntryInfo(
+                entry_id, content_hash, len(entry_objs)
+            ))
+
+        if prev_index is not None:
+            prev_kept_count = reused_count + changed_count
+            _log.info(
+                'Compared to the previous JMdict index, %s XML entries were '
+                'unchanged, %s were changed, %s were added, and %s were '
+                'removed', f'{reused_count:,}',
+                f'{changed_count:,}',
+                f'{len(xml_entry_infos) - prev_kept_count:,}',
+                f'{len(prev_xml_entry_hashes) - prev_kept_count:,}'
+            )
+        return (entries, mecab_decomps, xml_entry_infos)
+
+    @utils.skip_method_debug_logging
+    def _hash_entry_xml(self, entry_element: ElementTree.Element) -> int:
+        """Get a 64-bit hash of the XML content of an entry element.
+
+        The hash covers the tag, attributes, text, and child count of every
+        element under the entry element in document order, which together
+        uniquely determine the content of the entry. JMdict has no mixed
+        content, so the element tails are only white space and are skipped.
+
+        The index format version is hashed along with the content, so an
+        index written with another format version never has its entries reused
+        even though their XML content is unchanged.
+
+        This is several times faster than hashing the serialized XML of the
+        element.
+        """
+        content_parts = [str(JMdictIndex._FORMAT_VERSION)]
+        for element in entry_element.iter():
+            content_parts.append(element.tag)
+            content_parts.append(str(len(element)))
+            if element.attrib:
+                content_parts.append(repr(sorted(element.attrib.items())))
+            content_parts.append(element.text or '')
+
+        content = self._HASH_PART_SEPARATOR.join(content_parts)
+        return int.from_bytes(
+            hashlib.blake2b(
+                content.encode('utf-8'), digest_size=8
+            ).digest(),
+            'little'
+        )
+
+    def _iterparse_xml_entries(
+        self, xml_filepath: str
+    ) -> Iterator[ElementTree.Element]:
+        """Parse the entry elements from a JMdict XML file one at a time.
 
-        self._set_max_entry_lens()
-        self._write_to_shelf()
+        The XML file is parsed incrementally, and each XML entry element is
+        cleared from the parsed tree once the caller is done with it, so the
+        whole XML tree is never held in memory at once.
+
+        Logs the parse progress every _LOAD_PROGRESS_LOG_INTERVAL XML entries.
+        The entries are parsed lazily, so the progress entries/sec includes
+        the time spent by the caller processing each yielded entry.
+
+        Args:
+            xml_filepath: Path to an JMdict XML file.
+
+        Yields:
+            Each XML entry element in the order they are in the file. An
+            element is cleared as soon as the next element is requested.
+        """
+        start_time = time.perf_counter()
+        xml_entry_count = 0
+        root = None
+        for event, element in ElementTree.iterparse(
+            xml_filepath, events=('start', 'end')
+        ):
+            # The first event is always the start of the root element.
+            if root is None:
+                root = element
+                continue
+            if event != 'end' or element.tag != self._ENTRY_ELEMENT_TAG:
+                continue
+
+            yield element
+
+            # Clear the whole root rather than just the entry element so that
+            # the root does not keep a reference to every parsed entry element.
+            root.clear()
+            xml_entry_count += 1
+            if xml_entry_count % self._LOAD_PROGRESS_LOG_INTERVAL == 0:
+                self._log_load_progress(xml_entry_count, start_time)
+
+        if xml_entry_count % self._LOAD_PROGRESS_LOG_INTERVAL != 0:
+            self._log_load_progress(xml_entry_count, start_time)
 
     @utils.skip_method_debug_logging
-    def _get_mecab_decomb(self, entry: JMdictEntry) -> Tuple[str, ...]:
-        """Get the MeCab decomposition of the text form of the entry."""
-        flis = self._mecab_tagger.parse(entry.text_form)
-        base_forms = [item.base_form for item in flis]
-        return tuple(base_forms)
-
-    def _set_max_entry_lens(self) -> None:
-        """Set the properties for max entry lengths."""
-        self._max_text_form_len = max(
-            len(text_form) for text_form in self._entry_map.keys()
+    def _log_load_progress(
+        self, xml_entry_count: int, start_time: float
+    ) -> None:
+        """Log the number of XML entries loaded so far and the load rate."""
+        run_secs = time.perf_counter() - start_time
+        _log.info(
+            'Loaded %s JMdict XML entries in %.1f seconds (%s entries/sec)',
+            f'{xml_entry_count:,}', run_secs,
+            f'{round(xml_entry_count / run_secs):,}' if run_secs > 0 else 'N/A'
+        )
+
+    def _get_mecab_decomps(
+        self, text_forms: List[str], decomp_version: str
+    ) -> List[Tuple[str, ...]]:
+        """Get the MeCab decompositions of the text forms.
+
+        Each distinct text form is only decomposed once. The decompositions are
+        done in a pool of MYAKU_JMDICT_DECOMP_WORKERS worker processes if that
+        environment variable is set to more than 1.
+
+        If MYAKU_JMDICT_DECOMP_CACHE is set to 1 in the environment, the
+        decompositions are cached on disk keyed by text form and MeCab and
+        ipadic-NEologd versions, and only text forms not in the cache for the
+        current versions are decomposed.
+
+        Args:
+            text_forms: The text forms to get the decompositions of.
+            decomp_version: The versions of MeCab and ipadic-NEologd
+                currently in use as given by _get_mecab_decomp_version.
+
+        Returns:
+            The decomposition of each of the text forms in the same order as
+            the given text forms.
+        """
+        use_cache = int(os.environ.get(_JMDICT_DECOMP_CACHE_ENV_VAR, 0)) == 1
+        worker_count = int(os.environ.get(_JMDICT_DECOMP_WORKERS_ENV_VAR, 1))
+
+        distinct_text_forms = list(dict.fromkeys(text_forms))
+        decomp_map = {}
+        if use_cache:
+            decomp_map = self._read_decomp_cache(decomp_version)
+
+        uncached_text_forms = [
+            text_form for text_form in distinct_text_forms
+            if text_form not in decomp_map
+        ]
+        _log.info(
+            'Getting MeCab decompositions for %s text forms (%s cached) '
+            'using %s worker(s)', f'{len(distinct_text_forms):,}',
+            f'{len(distinct_text_forms) - len(uncached_text_forms):,}',
+            worker_count
+        )
+        decomp_map.update(zip(
+            uncached_text_forms,
+            self._decompose_text_forms(uncached_text_forms, worker_count)
+        ))
+
+        if use_cache and len(uncached_text_forms) > 0:
+            self._write_decomp_cache(decomp_version, {
+                text_form: decomp_map[text_form]
+                for text_form in distinct_text_forms
+            })
+        return [decomp_map[text_form] for text_form in text_forms]
+
+    def _decompose_text_forms(
+        self, text_forms: List[str], worker_count: int
+    ) -> List[Tuple[str, ...]]:
+        """Decompose the text forms with MeCab in chunks.
+
+        Args:
+            text_forms: The text forms to decompose.
+            worker_count: The number of worker processes to decompose the
+                chunks of text forms in. If 1, the chunks are decomposed in the
+                current process instead.
+
+        Returns:
+            The decomposition of each of the text forms in the same order as
+            the given text forms regardless of the number of workers used.
+        """
+        chunks = [
+            text_forms[i:i + self._DECOMP_CHUNK_SIZE]
+            for i in range(0, len(text_forms), self._DECOMP_CHUNK_SIZE)
+        ]
+        start_time = time.perf_counter()
+        if worker_count > 1 and len(chunks) > 1:
+            with multiprocessing.Pool(worker_count) as pool:
+                # imap gives the results in the same order as the chunks
+                # regardless of the order the workers finish them in.
+                decomp_chunks = list(
+                    pool.imap(_decompose_text_form_chunk, chunks)
+                )
+        else:
+            decomp_chunks = [
+                _decompose_text_form_chunk(chunk) for chunk in chunks
+            ]
+
+        run_secs = time.perf_counter() - start_time
+        _log.info(
+            'Decomposed %s text forms in %.1f seconds', f'{len(text_forms):,}',
+            run_secs
+        )
+        return [decomp for chunk in decomp_chunks for decomp in chunk]
+
+    def _get_decomp_cache_filepath(self) -> str:
+        """Return the file path used for the decomposition cache shelf."""
+        cache_dir = utils.get_value_from_env_variable(
+            myaku.APP_DATA_DIR_ENV_VAR
         )
-        self._max_mecab_decomp_len = max(
-            len(decomp) for decomp in self._mecab_decomp_map.keys()
+
+        return os.path.join(cache_dir, self._DECOMP_CACHE_FILENAME)
+
+    def _read_decomp_cache(
+        self, decomp_version: str
+    ) -> Dict[str, Tuple[str, ...]]:
+        """Read the cached decompositions for the decomposition version.
+
+        Returns:
+            A map of text forms to their cached decompositions. Empty if there
+            are no cached decompositions for the decomposition version.
+        """
+        cache_path = self._get_decomp_cache_filepath()
+        try:
+            shelf = shelve.open(cache_path, 'r')
+        except dbm.error:
+            _log.debug(
+                'Decomposition cache could not be opened at "%s", so no '
+                'cached decompositions used', cache_path
+            )
+            return {}
+
+        with shelf:
+            try:
+                cache_version = shelf.get('decomp_version')
+                if cache_version != decomp_version:
+                    _log.debug(
+                        'Decomposition cache at "%s" is for decomposition '
+                        'version "%s" instead of "%s", so no cached '
+                        'decompositions used',
+                        cache_path, cache_version, decomp_version
+                    )
+                    return {}
+                return shelf['decomp_map']
+            except (pickle.UnpicklingError, EOFError, KeyError):
+                _log.debug(
+                    'Decomposition cache at "%s" could not be read, so no '
+                    'cached decompositions used', cache_path
+                )
+                return {}
+
+    def _write_decomp_cache(
+        self, decomp_version: str, decomp_map: Dict[str, Tuple[str, ...]]
+    ) -> None:
+        """Write the decompositions for the version to the cache shelf."""
+        cache_path = self._get_decomp_cache_filepath()
+        _log.debug(
+            'Writing %s decompositions to decomposition cache at "%s"',
+            len(decomp_map), cache_path
+        )
+        with shelve.open(cache_path, 'n') as shelf:
+            shelf['decomp_version'] = decomp_version
+            shelf['decomp_map'] = decomp_map
+
+    def _load_index(self, index_path: str) -> None:
+        """Load the JMdict index file and build the prefix tries for it."""
+        self._index = JMdictIndex(index_path)
+        self._max_text_form_len = self._index.max_text_form_len
+        self._max_mecab_decomp_len = self._index.max_mecab_decomp_len
+
+        # No JMdict text form or MeCab decomposition base form can contain the
+        # last unicode code point, so it can mark the end of a prefix range.
+        self._text_form_trie = SortedPrefixTrie(
+            self._index.text_form_keys, '', '\U0010ffff', keys_sorted=True
+        )
+        self._mecab_decomp_trie = SortedPrefixTrie(
+            self._index.mecab_decomp_keys, (), ('\U0010ffff',),
+            keys_sorted=True
+        )
+        _log.debug(
+            'Loaded JMdict index with %s entries, %s text forms, and %s MeCab '
+            'decompositions', len(self._index), len(self._text_form_trie),
+            len(self._mecab_decomp_trie)
         )
 
-    def _get_shelf_filepath(self) -> str:
-        """Return the file path used for the JMdict shelf."""
-        shelf_dir = utils.get_value_from_env_variable(
+    def _get_index_filepath(self) -> str:
+        """Return the file path used for the JMdict index."""
+        index_dir = utils.get_value_from_env_variable(
             myaku.APP_DATA_DIR_ENV_VAR
         )
 
-        return os.path.join(shelf_dir, self._SHELF_FILENAME)
+        return os.path.join(index_dir, self._INDEX_FILENAME)
 
-    def _load_from_shelf_if_newer(self, comp_timestamp: float) -> bool:
-        """Load JMdict maps from shelf if shelf is newer than given timestamp.
+    def _load_index_if_newer(self, comp_timestamp: float) -> bool:
+        """Load JMdict index if index is newer than given timestamp.
 
-        If the shelf file for JMdict exists and was last modified after the
-        given timestamp, loads JMdict data from the shelf.
+        If the index file for JMdict exists and was last modified after the
+        given timestamp, loads JMdict data from the index.
 
         Args:
-            comp_timestamp: Unix timestamp to compare the shelf last modified
-                time against to see if the shelf is newer.
+            comp_timestamp: Unix timestamp to compare the index last modified
+                time against to see if the index is newer.
 
         Returns:
-            True if the shelf file was newer and JMdict data was loaded from
-            the shelf, or False if the shelf did not exist or was older and no
-            JMdict data was loaded.
+            True if the index file was newer and JMdict data was loaded from
+            the index, or False if the index did not exist, was older, or was
+            not a valid index file of the current format version and no JMdict
+            data was loaded.
         """
-        shelf_path = self._get_shelf_filepath()
-        if not os.path.exists(shelf_path):
+        index_path = self._get_index_filepath()
+        if not os.path.exists(index_path):
             _log.debug(
-                'Shelf file does not exist at "%s", so no data loaded from '
-                'the shelf', shelf_path
+                'Index file does not exist at "%s", so no data loaded from '
+                'the index', index_path
             )
             return False
 
-        shelf_timestamp = os.path.getmtime(shelf_path)
-        shelf_dt_timestamp = datetime.utcfromtimestamp(shelf_timestamp)
+        index_timestamp = os.path.getmtime(index_path)
+        index_dt_timestamp = datetime.utcfromtimestamp(index_timestamp)
         comp_dt_timestamp = datetime.utcfromtimestamp(comp_timestamp)
-        if shelf_timestamp <= comp_timestamp:
+        if index_timestamp <= comp_timestamp:
             _log.debug(
-                'Shelf file (%s) last mod time (%s) is before or equal to '
-                'compare last mod time (%s), so no data loaded from the shelf',
-                shelf_path, shelf_dt_timestamp.isoformat(),
+                'Index file (%s) last mod time (%s) is before or equal to '
+                'compare last mod time (%s), so no data loaded from the index',
+                index_path, index_dt_timestamp.isoformat(),
                 comp_dt_timestamp.isoformat()
             )
             return False
 
         _log.debug(
-            'Shelf file (%s) last mod time (%s) is after compare last mod '
-            'time (%s), so loading data from the shelf',
-            shelf_path, shelf_dt_timestamp.isoformat(),
+            'Index file (%s) last mod time (%s) is after compare last mod '
+            'time (%s), so loading data from the index',
+            index_path, index_dt_timestamp.isoformat(),
             comp_dt_timestamp.isoformat()
         )
-        with shelve.open(shelf_path, 'r') as shelf:
-            self._entry_map = defaultdict(list)
-            self._mecab_decomp_map = {}
-
-            mecab_decomp_map_items = shelf['_mecab_decomp_map_items']
-            for mecab_decomp, entry_list in mecab_decomp_map_items:
-                self._mecab_decomp_map[mecab_decomp] = entry_list
-                for entry in entry_list:
-                    self._entry_map[entry.text_form].append(entry)
-
-        self._set_max_entry_lens()
-        return True
-
-    def _write_to_shelf(self) -> None:
-        """Write current JMdict objects to shelf."""
-        shelf_path = self._get_shelf_filepath()
-        _log.debug(
-            'Writing current JMdict maps to shelf at "%s"', shelf_path
-        )
-        with shelve.open(shelf_path, 'n') as shelf:
-            shelf['_mecab_decomp_map_items'] = list(
-                self._mecab_decomp_map.items()
+        try:
+            self._load_index(index_path)
+        except ResourceLoadError:
+            _log.info(
+                'Index file (%s) could not be loaded, so no data loaded from '
+                'the index', index_path
             )
+            return False
+        return True
 
     def contains_entry(self, entry: Union[str, Tuple[str, ...]]) -> bool:
         """Test if entry is in the JMdict entries.
@@ -866,15 +2543,7 @@ class JMdict(object):
             ResourceNotReadyError: JMdict data has not been loaded into this
                 JMdict object yet.
         """
-        if self._entry_map is None or self._mecab_decomp_map is None:
-            utils.log_and_raise(
-                _log, ResourceNotReadyError,
-                'JMdict object used before loading any JMdict data.'
-            )
-
-        if isinstance(entry, str):
-            return entry in self._entry_map
-        return entry in self._mecab_decomp_map
+        return len(self.get_entries(entry)) > 0
 
     def __contains__(self, entry: Union[str, Tuple[str, ...]]) -> bool:
         """Simply call self.contains_entry."""
@@ -898,15 +2567,15 @@ class JMdict(object):
             ResourceNotReadyError: JMdict data has not been loaded into this
                 JMdict object yet.
         """
-        if self._entry_map is None or self._mecab_decomp_map is None:
+        if self._index is None:
             utils.log_and_raise(
                 _log, ResourceNotReadyError,
                 'JMdict object used before loading any JMdict data.'
             )
 
         if isinstance(entry, str):
-            return self._entry_map.get(entry, [])
-        return self._mecab_decomp_map.get(entry, [])
+            return self._index.get_text_form_entries(entry)
+        return self._index.get_mecab_decomp_entries(entry)
 
     @utils.skip_method_debug_logging
     def __getitem__(
@@ -915,6 +2584,49 @@ class JMdict(object):
         """Simply call self.get_entries."""
         return self.get_entries(entry)
 
+    def memory_stats(self) -> Dict[str, int]:
+        """Get stats on the memory used by the loaded JMdict data.
+
+        The memory-mapped index file is shared by every process using it via
+        the OS page cache, so it is not included in the total heap bytes.
+
+        Returns:
+            A map from the name of each stat to its value. Includes the stats
+            from JMdictIndex.memory_stats plus the total heap bytes used by
+            all of the loaded JMdict data.
+
+        Raises:
+            ResourceNotReadyError: JMdict data has not been loaded into this
+                JMdict object yet.
+        """
+        if self._index is None:
+            utils.log_and_raise(
+                _log, ResourceNotReadyError,
+                'JMdict object used before loading any JMdict data.'
+            )
+
+        stats = self._index.memory_stats()
+        stats['total_heap_bytes'] = sum(
+            value for name, value in stats.items()
+            if name.endswith('_bytes') and name != 'index_file_bytes'
+        )
+        return stats
+
+
+def _decompose_text_form_chunk(
+    text_forms: List[str]
+) -> List[Tuple[str, ...]]:
+    """Get the MeCab decomposition into base forms of each of the text forms.
+
+    Module-level so that it can be run in worker processes.
+    """
+    mecab_tagger = MecabTagger()
+    decomps = []
+    for text_form in text_forms:
+        flis = mecab_tagger.parse(text_form)
+        decomps.append(tuple(item.base_form for item in flis))
+    return decomps
+
 
 @utils.singleton_per_config
 class MecabTagger:
@@ -931,6 +2643,18 @@ class MecabTagger:
     _TOKEN_SPLITTER = '\t'
     _EXPECTED_TOKEN_TAG_COUNTS = {4, 5, 6}
 
+    # MeCab node values used by the node output parsing.
+    _FEATURE_SPLITTER = ','
+    _FEATURE_COUNT = 9
+    _BLANK_FEATURE = '*'
+    _UNKNOWN_NODE_STAT = MeCab.MECAB_UNK_NODE
+    _BOS_EOS_NODE_STATS = {MeCab.MECAB_BOS_NODE, MeCab.MECAB_EOS_NODE}
+
+    # The same nodes are given by MeCab many times over in Japanese text, so
+    # the tags for the most recently used nodes are cached up to this many
+    # nodes.
+    _MAX_NODE_TAGS_CACHE_SIZE = 100000
+
     _ADJUST_TAGS_MAP: Dict[MecabTags, MecabTags] = {
         # MeCab tags a single な character with the base form だ, which is
         # technically correct, but in the vast majority of cases, it works
@@ -939,7 +2663,9 @@ class MecabTagger:
             ('な', 'ナ', 'な', '助動詞', '特殊・ダ', '体言接続'),
     }
 
-    def __init__(self, use_default_ipadic: bool = False) -> None:
+    def __init__(
+        self, use_default_ipadic: bool = False, use_node_output: bool = False
+    ) -> None:
         """Init the MeCab tagger wrapper.
 
         Unless use_default_ipadic is True, uses the ipadic-NEologd dictionary
@@ -949,8 +2675,16 @@ class MecabTagger:
         Args:
             use_default_ipadic: If True, forces tagger to use the default
                 ipadic dictionary instead of the ipadic-NEologd dictionary.
+            use_node_output: If True, the tagger will get its parse results by
+                walking the MeCab nodes for the text instead of by parsing the
+                chasen text output from MeCab. Both ways give the same found
+                lexical items.
         """
         self._mecab_tagger = None
+        self._use_node_output = use_node_output
+        self._node_tags_cache: (
+            'OrderedDict[Tuple[str, str, int], MecabTags]'
+        ) = OrderedDict()
 
         # The "-Ochasen" arg here is specifying the output type for MeCab to
         # use. The chasen output type is used because it includes the important
@@ -978,16 +2712,13 @@ class MecabTagger:
             TextAnalysisError: MeCab gave an unexpected output when parsing the
                 text.
         """
-        mecab_out = self._mecab_tagger.parse(text)
-        parsed_tokens = self._parse_mecab_output(mecab_out)
+        if self._use_node_output:
+            tagged_tokens = self._get_node_tagged_tokens(text)
+        else:
+            tagged_tokens = self._get_chasen_tagged_tokens(text)
 
-        offset = 0
         found_lexical_items = []
-        for parsed_token_tags in parsed_tokens:
-            if (len(parsed_token_tags) == 1
-                    and parsed_token_tags[0] == self._END_OF_SECTION_MARKER):
-                continue
-
+        for parsed_token_tags, offset in tagged_tokens:
             if len(parsed_token_tags) not in self._EXPECTED_TOKEN_TAG_COUNTS:
                 utils.log_and_raise(
                     _log, TextAnalysisError,
@@ -997,20 +2728,205 @@ class MecabTagger:
                     )
                 )
 
+            interp = self._create_mecab_interp(parsed_token_tags)
+            fli = self._create_found_lexical_item(
+                parsed_token_tags, interp, text_offset + offset
+            )
+            found_lexical_items.append(fli)
+
+        return found_lexical_items
+
+    def _get_chasen_tagged_tokens(
+        self, text: str
+    ) -> List[Tuple[List[str], int]]:
+        """Get the tags and offset of each token using MeCab chasen output.
+
+        Args:
+            text: The text to parse with MeCab.
+
+        Returns:
+            A list of (tags, offset) tuples for each token parsed from the text
+            by MeCab in the order they occur in the text.
+        """
+        mecab_out = self._mecab_tagger.parse(text)
+        parsed_tokens = self._parse_mecab_output(mecab_out)
+
+        offset = 0
+        tagged_tokens = []
+        for parsed_token_tags in parsed_tokens:
+            if (len(parsed_token_tags) == 1
+                    and parsed_token_tags[0] == self._END_OF_SECTION_MARKER):
+                continue
+
             # Adjust offset to account for MeCab skipping some white space
             # characters.
             while (text[offset:offset + len(parsed_token_tags[0])]
                    != parsed_token_tags[0]):
                 offset += 1
 
-            interp = self._create_mecab_interp(parsed_token_tags)
-            fli = self._create_found_lexical_item(
-                parsed_token_tags, interp, text_offset + offset
-            )
+            tagged_tokens.append((parsed_token_tags, offset))
             offset += len(parsed_token_tags[0])
-            found_lexical_items.append(fli)
 
-        return found_lexical_items
+        return tagged_tokens
+
+    def _get_node_tagged_tokens(
+        self, text: str
+    ) -> List[Tuple[List[str], int]]:
+        """Get the tags and offset of each token by walking the MeCab nodes.
+
+        The tags are put in the same form as the tags parsed from the chasen
+        output, and the offsets are calculated from the byte lengths given for
+        the nodes by MeCab rather than by searching the text.
+
+        Args:
+            text: The text to parse with MeCab.
+
+        Returns:
+            A list of (tags, offset) tuples for each token parsed from the text
+            by MeCab in the order they occur in the text.
+        """
+        text_bytes = text.encode('utf-8')
+        byte_offset = 0
+        offset = 0
+        tagged_tokens = []
+
+        node = self._mecab_tagger.parseToNode(text)
+        while node is not None:
+            # Each node attribute access goes through the MeCab wrapper, so
+            # each attribute is only accessed once per node.
+            stat = node.stat
+            if stat in self._BOS_EOS_NODE_STATS:
+                node = node.next
+                continue
+            surface = node.surface
+            byte_len = node.length
+
+            # MeCab skips some white space characters, and the byte length of
+            # the skipped white space before a node is included in its rlength.
+            white_space_byte_len = node.rlength - byte_len
+            if white_space_byte_len > 0:
+                white_space_end = byte_offset + white_space_byte_len
+                offset += len(
+                    text_bytes[byte_offset:white_space_end].decode('utf-8')
+                )
+                byte_offset = white_space_end
+
+            tags = self._get_cached_node_tags((surface, node.feature, stat))
+            tagged_tokens.append((list(tags), offset))
+
+            offset += len(surface)
+            byte_offset += byte_len
+            node = node.next
+
+        return tagged_tokens
+
+    def _get_cached_node_tags(
+        self, node_key: Tuple[str, str, int]
+    ) -> MecabTags:
+        """Get the tags for a MeCab node using the node tags cache.
+
+        Evicts the least recently used node from the cache if it is full.
+
+        Args:
+            node_key: The (surface, feature, stat) of the MeCab node.
+        """
+        tags = self._node_tags_cache.get(node_key)
+        if tags is not None:
+            self._node_tags_cache.move_to_end(node_key)
+            return tags
+
+        tags = self._get_node_tags(*node_key)
+        self._node_tags_cache[node_key] = tags
+        if len(self._node_tags_cache) > self._MAX_NODE_TAGS_CACHE_SIZE:
+            self._node_tags_cache.popitem(last=False)
+        return tags
+
+    def _get_node_tags(
+        self, surface: str, feature: str, stat: int
+    ) -> MecabTags:
+        """Get the tags for a MeCab node in the same form as chasen output.
+
+        Adjusts the tags if they are known problems in the same way as is done
+        for the tags parsed from chasen output.
+        """
+        tags = self._get_node_chasen_tags(surface, feature, stat)
+        self._adjust_if_known_problem(tags)
+        return tuple(t for t in tags if len(t) > 0)
+
+    def _get_node_chasen_tags(
+        self, surface: str, feature: str, stat: int
+    ) -> List[str]:
+        """Get the tags for a MeCab node in the chasen output tag order.
+
+        Follows the ipadic chasen node formats, so '*' feature values and
+        feature values not given for a node become blank tags just like in the
+        chasen output.
+
+        Args:
+            surface: The surface of the MeCab node.
+            feature: The feature string of the MeCab node.
+            stat: The stat of the MeCab node. Must not be the stat for a BOS or
+                EOS node.
+
+        Returns:
+            The list of the surface form, reading, base form, parts of speech,
+            conjugated type, and conjugated form tags for the node.
+        """
+        if '"' in feature:
+            features = next(csv.reader([feature]))
+        else:
+            features = feature.split(self._FEATURE_SPLITTER)
+        features = [
+            f if f != self._BLANK_FEATURE else '' for f in features
+        ]
+        features += [''] * (self._FEATURE_COUNT - len(features))
+
+        parts_of_speech = self._POS_SPLITTER.join(
+            pos for pos in features[:4] if len(pos) > 0
+        )
+        if stat == self._UNKNOWN_NODE_STAT:
+            return [surface, surface, surface, parts_of_speech, '', '']
+        return [
+            surface, features[7], features[6], parts_of_speech, features[4],
+            features[5]
+        ]
+
+    def parse_blocks(
+        self, text_blocks: List[str], text_offset: int = 0
+    ) -> List[List[FoundJpnLexicalItem]]:
+        """Return the lexical items found by MeCab in each of the text blocks.
+
+        Each block is parsed with a separate MeCab call so that the MeCab
+        lattice starts fresh at the start of each block. Parsing all of the
+        blocks joined with new lines in a single call was not measurably
+        faster, and it let the connection costs of the end of a block affect
+        how the start of the next block was segmented.
+
+        Args:
+            text_blocks: The text blocks to parse with MeCab for lexical items.
+            text_offset: Offset that the first text block starts at if the
+                blocks are part of a larger body of text where each block is
+                separated by a single new line character.
+
+        Returns:
+            A list with an entry for each of the given text blocks in the same
+            order. Each entry is the list of the lexical items found by MeCab
+            in that text block.
+
+        Raises:
+            TextAnalysisError: MeCab gave an unexpected output when parsing the
+                text blocks.
+        """
+        blocks_lexical_items: List[List[FoundJpnLexicalItem]] = []
+        offset = text_offset
+        for text_block in text_blocks:
+            if len(text_block) == 0:
+                blocks_lexical_items.append([])
+            else:
+                blocks_lexical_items.append(self.parse(text_block, offset))
+            offset += len(text_block) + 1  # +1 for new line char
+
+        return blocks_lexical_items
 
     def _parse_mecab_output(self, output: str) -> List[List[str]]:
         """Parse the individual tags from MeCab chasen output.
@@ -1111,29 +3027,16 @@ class MecabTagger:
         Returns:
             The path to the directory containing the NEologd dictionary.
         """
-        output = subprocess.run(
-            ['mecab-config', '--version'], capture_output=True
-        )
-        if output.returncode != 0:
-            utils.log_and_raise(
-                _log, ResourceLoadError,
-                'MeCab is not installed on this system, so the '
-                'mecab-ipadic-NEologd dictionary cannot be used'
-            )
-
-        output = subprocess.run(
-            ['mecab-config', '--dicdir'], capture_output=True
-        )
-        if output.returncode != 0:
-            utils.log_and_raise(
-                _log, ResourceLoadError,
-                'MeCab dictionary directory could not be retrieved, so the '
-                'mecab-ipadic-NEologd dictionary cannot be used'
-            )
+        # Use the dictionary directory from the resource manifest if possible
+        # to avoid running mecab-config every time a tagger is created.
+        manifest = _read_resource_manifest()
+        if manifest is not None:
+            mecab_dicdir = manifest['mecab_dicdir']
+        else:
+            mecab_dicdir = _get_mecab_dicdir()
 
         neologd_path = os.path.join(
-            output.stdout.decode(sys.stdout.encoding).strip(),
-            self._MECAB_NEOLOGD_DIR_NAME
+            mecab_dicdir, self._MECAB_NEOLOGD_DIR_NAME
         )
         if not os.path.exists(neologd_path):
             utils.log_and_raise(
@@ -0,0 +1,217 @@
+"""Benchmarks for the hot paths of Myaku.
+
+Usage: benchmark.py [<benchmark_list>]
+
+<benchmark_list>: A comma-separated list of the benchmarks to run. Possible
+    values are the keys of BENCHMARKS. If not given, all benchmarks are run.
+"""
+
+import logging
+import sys
+import timeit
+from typing import Any, Callable, List
+
+from myaku import utils
+from myaku.datatypes import JpnArticle
+from myaku.errors import ScriptArgsError
+from myaku.japanese_analysis import MecabTagger
+from myaku.sample_text import SAMPLE_TEXT
+
+_log = logging.getLogger(__name__)
+
+LOG_NAME = 'benchmark'
+
+BENCHMARK_ARG_LIST_SPLITTER = ','
+
+# Number of times each timing is repeated. The fastest repeat is used as the
+# result of the timing to limit the effect of noise from other processes.
+# Shared with the other benchmark runners so all timings are comparable.
+TIMING_REPEAT = 5
+
+
+def time_per_call(func: Callable[[], Any], number: int) -> float:
+    """Return the fastest time in seconds for one call to func.
+
+    Args:
+        func: Function to time.
+        number: Number of times to call func in each timing repeat.
+    """
+    return min(timeit.repeat(func, number=number, repeat=TIMING_REPEAT)) / (
+        number
+    )
+
+
+def benchmark_mecab_parse() -> None:
+    """Time the MeCab parse throughput for the blocks of an article.
+
+    Uses the sample text as the article to parse.
+    """
+    tagger = MecabTagger()
+    text_blocks = SAMPLE_TEXT.splitlines()
+    token_count = sum(len(flis) for flis in tagger.parse_blocks(text_blocks))
+
+    parse_secs = time_per_call(lambda: tagger.parse_blocks(text_blocks), 20)
+
+    _log.info(
+        'MeCab parse of %s blocks (%s tokens): %s tokens/sec',
+        len(text_blocks), f'{token_count:,}',
+        f'{round(token_count / parse_secs):,}'
+    )
+
+
+def benchmark_mecab_output() -> None:
+    """Compare MeCab chasen and node output parse throughput.
+
+    Uses the sample text as the text to parse.
+    """
+    chasen_tagger = MecabTagger()
+    node_tagger = MecabTagger(use_node_output=True)
+    token_count = len(chasen_tagger.parse(SAMPLE_TEXT))
+
+    chasen_secs = time_per_call(lambda: chasen_tagger.parse(SAMPLE_TEXT), 20)
+    node_secs = time_per_call(lambda: node_tagger.parse(SAMPLE_TEXT), 20)
+
+    _log.info(
+        'MeCab parse of sample text (%s tokens):\n'
+        '\tChasen output: %s tokens/sec\n'
+        '\tNode output: %s tokens/sec (%.2fx)',
+        f'{token_count:,}', f'{round(token_count / chasen_secs):,}',
+        f'{round(token_count / node_secs):,}', chasen_secs / node_secs
+    )
+
+
+def _debug_logging_benchmark_func(
+    article: JpnArticle, flis: List[str]
+) -> List[str]:
+    """Do nothing so only the debug logging decorator overhead is timed."""
+    return flis
+
+
+def benchmark_debug_logging() -> None:
+    """Compare the per-call overhead of the debug logging decorator.
+
+    Times calls with an article of the sample text and a list of its lines as
+    the args and return value with the DEBUG level both enabled and disabled
+    for the log.
+    """
+    article = JpnArticle(full_text=SAMPLE_TEXT)
+    lines = SAMPLE_TEXT.splitlines()
+    logged_func = utils.add_debug_logging(_debug_logging_benchmark_func)
+
+    raw_secs = time_per_call(
+        lambda: _debug_logging_benchmark_func(article, lines), 10000
+    )
+
+    # Remove the package log handlers while timing with DEBUG enabled so that
+    # the time to write the log records is not included.
+    utils.toggle_myaku_package_log(enable=False)
+    package_log = logging.getLogger('myaku')
+    before_level = package_log.level
+    try:
+        package_log.setLevel(logging.DEBUG)
+        debug_enabled_secs = time_per_call(
+            lambda: logged_func(article, lines), 1000
+        )
+        package_log.setLevel(logging.INFO)
+        debug_disabled_secs = time_per_call(
+            lambda: logged_func(article, lines), 10000
+        )
+    finally:
+        package_log.setLevel(before_level)
+        utils.toggle_myaku_package_log(filename_base=LOG_NAME)
+
+    _log.info(
+        'Debug logging decorator overhead per call:\n'
+        '\tDEBUG enabled: %.2f µs\n'
+        '\tDEBUG disabled: %.2f µs\n'
+        '\tUndecorated call: %.2f µs',
+        (debug_enabled_secs - raw_secs) * 1e6,
+        (debug_disabled_secs - raw_secs) * 1e6, raw_secs * 1e6
+    )
+
+
+def benchmark_char_width() -> None:
+    """Compare jaconv and translate table char width normalization speed.
+
+    Uses the base forms of the MeCab tokens in the sample text as the strings
+    to normalize. The memoized time is for normalizing base forms that were
+    recently normalized already.
+    """
+    tagger = MecabTagger()
+    base_forms = [fli.base_form for fli in tagger.parse(SAMPLE_TEXT)]
+
+    def normalize_all(normalize_func: Callable[[str], str]) -> None:
+        for base_form in base_forms:
+            normalize_func(base_form)
+
+    jaconv_secs = time_per_call(
+        lambda: normalize_all(utils._jaconv_normalize_char_width), 20
+    )
+    translate_secs = time_per_call(
+        lambda: normalize_all(utils.normalize_char_width.__wrapped__), 20
+    )
+    memoized_secs = time_per_call(
+        lambda: normalize_all(utils.normalize_char_width), 20
+    )
+
+    _log.info(
+        'Char width normalization of %s base forms:\n'
+        '\tjaconv: %s base forms/sec\n'
+        '\tTranslate table: %s base forms/sec (%.2fx)\n'
+        '\tMemoized: %s base forms/sec (%.2fx)',
+        f'{len(base_forms):,}',
+        f'{round(len(base_forms) / jaconv_secs):,}',
+        f'{round(len(base_forms) / translate_secs):,}',
+        jaconv_secs / translate_secs,
+        f'{round(len(base_forms) / memoized_secs):,}',
+        jaconv_secs / memoized_secs
+    )
+
+
+BENCHMARKS = {
+    'mecab_parse': benchmark_mecab_parse,
+    'mecab_output': benchmark_mecab_output,
+    'debug_logging': benchmark_debug_logging,
+    'char_width': benchmark_char_width,
+}
+
+
+def parse_benchmarks_arg() -> List[Callable[[], None]]:
+    """Parse the benchmarks to run from the argument given to this script."""
+    if len(sys.argv) == 1:
+        return list(BENCHMARKS.values())
+
+    if len(sys.argv) != 2:
+        raise ScriptArgsError(
+            'benchmark.py script given {} args instead of 1 or 2: {}'.format(
+                len(sys.argv), sys.argv
+            )
+        )
+
+    benchmarks = []
+    for benchmark_arg in sys.argv[1].split(BENCHMARK_ARG_LIST_SPLITTER):
+        benchmark_name = benchmark_arg.strip()
+        if benchmark_name not in BENCHMARKS:
+            raise ScriptArgsError(
+                '"{}" is not a valid benchmark name. Valid benchmark names '
+                'are: {}'.format(benchmark_name, set(BENCHMARKS))
+            )
+        benchmarks.append(BENCHMARKS[benchmark_name])
+
+    return benchmarks
+
+
+def main() -> None:
+    """Run the script arg-specified benchmarks."""
+    utils.toggle_myaku_package_log(filename_base=LOG_NAME)
+    for benchmark in parse_benchmarks_arg():
+        benchmark()
+
+
+if __name__ == '__main__':
+    _log = logging.getLogger('myaku.runners.benchmark')
+    try:
+        main()
+    except BaseException:
+        _log.exception('Unhandled exception in main')
+        raise
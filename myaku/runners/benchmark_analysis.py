@@ -0,0 +1,340 @@
+"""Benchmark of each stage of the article analysis pipeline.
+
+Usage: benchmark_analysis.py <output_json_path> [<exported_articles_path>]
+
+<output_json_path>: Path to write the JSON benchmark results to.
+<exported_articles_path>: Path to a JSON lines file with stored articles to
+    add to the benchmark corpus. Each line must be a JSON object with at least
+    a full_text field, such as the output of
+    "mongoexport --collection=articles --fields=title,full_text".
+
+The corpus always includes the sample text as an article. Each stage is run
+over the whole corpus with the output of the previous stages as its input,
+and chars/sec, tokens/sec, traced memory allocations, and peak RSS are reported
+for each stage. Tokens are the lexical items found by MeCab in the corpus.
+"""
+
+import json
+import logging
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from bson.objectid import ObjectId
+
+import myaku
+from myaku import utils
+from myaku.datastore.document_convert import (
+    convert_found_lexical_item_batch_to_docs,
+)
+from myaku.datatypes import (
+    FoundJpnLexicalItem,
+    FoundLexicalItemBatch,
+    FoundLexicalItemBatchBuilder,
+    JpnArticle,
+    reduce_found_lexical_items,
+)
+from myaku.errors import ScriptArgsError
+from myaku.japanese_analysis import JapaneseTextAnalyzer, MecabTagger
+from myaku.runners.benchmark import TIMING_REPEAT, time_per_call
+from myaku.sample_text import SAMPLE_TEXT
+from myaku.scorer import MyakuArticleScorer
+
+_log = logging.getLogger(__name__)
+
+LOG_NAME = 'benchmark_analysis'
+
+# Version of the format of the output JSON. Should be incremented whenever
+# the format changes so results are only compared with compatible results.
+_RESULTS_FORMAT_VERSION = 1
+
+# The found lexical items of each text block of each article in the corpus.
+CorpusBlockFlis = List[List[List[FoundJpnLexicalItem]]]
+
+
+class StageResult(NamedTuple):
+    """The benchmark results for one stage of the analysis pipeline.
+
+    Attributes:
+        secs: Fastest time in seconds to run the stage over the corpus.
+        chars_per_sec: Chars of the corpus processed per second.
+        tokens_per_sec: Tokens of the corpus processed per second.
+        alloc_peak_bytes: Peak size of the memory blocks traced by
+            tracemalloc while running the stage once over the corpus.
+        alloc_retained_bytes: Size of the memory blocks allocated while
+            running the stage once over the corpus that were still allocated
+            after the run.
+        peak_rss_kb: Peak RSS of the process so far after running the stage.
+    """
+    secs: float
+    chars_per_sec: float
+    tokens_per_sec: float
+    alloc_peak_bytes: int
+    alloc_retained_bytes: int
+    peak_rss_kb: int
+
+
+def load_corpus(exported_articles_path: Optional[str]) -> List[JpnArticle]:
+    """Load the articles of the benchmark corpus.
+
+    Args:
+        exported_articles_path: Path to a JSON lines file with stored articles
+            to include in the corpus in addition to the sample text. If None,
+            only the sample text is included.
+    """
+    corpus = [_create_corpus_article('Sample text', SAMPLE_TEXT)]
+    if exported_articles_path is None:
+        return corpus
+
+    with open(exported_articles_path, 'r') as articles_file:
+        for line in articles_file:
+            if len(line.strip()) == 0:
+                continue
+            article_obj = json.loads(line)
+            corpus.append(_create_corpus_article(
+                article_obj.get('title'), article_obj['full_text']
+            ))
+    return corpus
+
+
+def _create_corpus_article(title: str, full_text: str) -> JpnArticle:
+    """Create an article for the corpus with the data needed to score it."""
+    return JpnArticle(
+        title=title,
+        full_text=full_text,
+        alnum_count=utils.get_alnum_count(full_text),
+        has_video=False,
+        last_updated_datetime=datetime.utcnow(),
+    )
+
+
+def run_stage(
+    stage_func: Callable[[], Any], char_count: int, token_count: int
+) -> StageResult:
+    """Benchmark a stage of the pipeline.
+
+    Args:
+        stage_func: Function that runs the stage over the whole corpus.
+        char_count: Number of chars in the corpus.
+        token_count: Number of tokens in the corpus.
+    """
+    secs = time_per_call(stage_func, 1)
+
+    tracemalloc.start()
+    try:
+        stage_func()
+        retained_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return StageResult(
+        secs=secs,
+        chars_per_sec=char_count / secs,
+        tokens_per_sec=token_count / secs,
+        alloc_peak_bytes=peak_bytes,
+        alloc_retained_bytes=retained_bytes,
+        peak_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    )
+
+
+def _mecab_parse(
+    tagger: MecabTagger, corpus_blocks: List[List[str]]
+) -> CorpusBlockFlis:
+    """Parse the text blocks of each article in the corpus with MeCab."""
+    return [tagger.parse_blocks(blocks) for blocks in corpus_blocks]
+
+
+def _find_meta_lexical_items(
+    jta: JapaneseTextAnalyzer, corpus_mecab_flis: CorpusBlockFlis
+) -> CorpusBlockFlis:
+    """Find the meta lexical items in each MeCab parsed text block."""
+    return [
+        [jta._find_meta_lexical_items(flis) for flis in article_flis]
+        for article_flis in corpus_mecab_flis
+    ]
+
+
+def _find_corpus_lexical_items(
+    jta: JapaneseTextAnalyzer, corpus: List[JpnArticle],
+    corpus_mecab_flis: CorpusBlockFlis
+) -> List[List[FoundJpnLexicalItem]]:
+    """Get the found lexical items the analyzer gives for each article."""
+    corpus_flis = []
+    for article, article_flis in zip(corpus, corpus_mecab_flis):
+        corpus_flis.append([
+            fli for flis in article_flis
+            for fli in jta._find_lexical_items(flis, article)
+        ])
+    return corpus_flis
+
+
+def _reduce(
+    corpus_flis: List[List[FoundJpnLexicalItem]]
+) -> List[List[FoundJpnLexicalItem]]:
+    """Reduce the found lexical items of each article in the corpus."""
+    return [reduce_found_lexical_items(flis) for flis in corpus_flis]
+
+
+def _build_batches(
+    corpus: List[JpnArticle], corpus_flis: List[List[FoundJpnLexicalItem]]
+) -> List[FoundLexicalItemBatch]:
+    """Build a found lexical item batch for each article in the corpus."""
+    batches = []
+    for article, flis in zip(corpus, corpus_flis):
+        builder = FoundLexicalItemBatchBuilder(article)
+        for fli in flis:
+            builder.add_found_lexical_item(fli)
+        batches.append(builder.build())
+    return batches
+
+
+def _score(
+    scorer: MyakuArticleScorer, corpus_batches: List[FoundLexicalItemBatch]
+) -> None:
+    """Score each article in the corpus and its found lexical items."""
+    for batch in corpus_batches:
+        scorer.score_article(batch.article)
+        scorer.score_fli_batch_modifiers(batch)
+
+
+def _convert_to_docs(
+    corpus_batches: List[FoundLexicalItemBatch], article_oid: ObjectId
+) -> List[List[Dict[str, Any]]]:
+    """Convert the batch of each article in the corpus to documents."""
+    return [
+        convert_found_lexical_item_batch_to_docs(batch, article_oid)
+        for batch in corpus_batches
+    ]
+
+
+def benchmark_pipeline(
+    corpus: List[JpnArticle]
+) -> Tuple[int, Dict[str, StageResult]]:
+    """Benchmark each stage of the analysis pipeline over the corpus.
+
+    Returns:
+        The token count of the corpus and a mapping from the name of each
+        stage to its results in pipeline order.
+    """
+    jta = JapaneseTextAnalyzer()
+    tagger = MecabTagger()
+    scorer = MyakuArticleScorer()
+    corpus_blocks = [article.full_text.splitlines() for article in corpus]
+    char_count = sum(len(article.full_text) for article in corpus)
+
+    corpus_mecab_flis = _mecab_parse(tagger, corpus_blocks)
+    token_count = sum(
+        len(flis) for article_flis in corpus_mecab_flis
+        for flis in article_flis
+    )
+
+    # The input for the reduce stages is the found lexical items the analyzer
+    # gives for each article, so it is created outside of any timed stage.
+    corpus_flis = _find_corpus_lexical_items(jta, corpus, corpus_mecab_flis)
+    corpus_batches = _build_batches(corpus, corpus_flis)
+
+    stages: List[Tuple[str, Callable[[], Any]]] = [
+        ('mecab_parse', partial(_mecab_parse, tagger, corpus_blocks)),
+        (
+            'meta_lexical_items',
+            partial(_find_meta_lexical_items, jta, corpus_mecab_flis)
+        ),
+        ('reduce', partial(_reduce, corpus_flis)),
+        ('batch_build', partial(_build_batches, corpus, corpus_flis)),
+        ('scoring', partial(_score, scorer, corpus_batches)),
+        (
+            'doc_conversion',
+            partial(_convert_to_docs, corpus_batches, ObjectId())
+        ),
+    ]
+    results = {}
+    for stage_name, stage_func in stages:
+        _log.info('Benchmarking stage %s', stage_name)
+        results[stage_name] = run_stage(
+            stage_func, char_count, token_count
+        )
+    return token_count, results
+
+
+def write_results(
+    output_path: str, corpus: List[JpnArticle], token_count: int,
+    stage_results: Dict[str, StageResult]
+) -> None:
+    """Write the benchmark results to a JSON file at the output path."""
+    results = {
+        'format_version': _RESULTS_FORMAT_VERSION,
+        'run_datetime': datetime.utcnow().isoformat(),
+        'version_info': myaku.get_version_info(),
+        'python_version': sys.version,
+        'stage_repeat': TIMING_REPEAT,
+        'corpus': {
+            'article_count': len(corpus),
+            'char_count': sum(len(a.full_text) for a in corpus),
+            'token_count': token_count,
+        },
+        'stages': {
+            name: result._asdict() for name, result in stage_results.items()
+        },
+    }
+    with open(output_path, 'w') as output_file:
+        json.dump(results, output_file, indent=4)
+
+
+def log_results(stage_results: Dict[str, StageResult]) -> None:
+    """Log a human readable summary of the benchmark results."""
+    lines = ['Analysis pipeline benchmark results:']
+    for name, result in stage_results.items():
+        lines.append(
+            '\t{}: {:.3f} secs, {:,} chars/sec, {:,} tokens/sec, '
+            '{:,} peak alloc bytes, {:,} KB peak RSS'.format(
+                name, result.secs, round(result.chars_per_sec),
+                round(result.tokens_per_sec), result.alloc_peak_bytes,
+                result.peak_rss_kb
+            )
+        )
+    _log.info('\n'.join(lines))
+
+
+def parse_script_args() -> Tuple[str, Optional[str]]:
+    """Parse the output and exported article paths from the script args."""
+    if len(sys.argv) not in {2, 3}:
+        raise ScriptArgsError(
+            'benchmark_analysis.py script given {} args instead of 2 or 3: '
+            '{}'.format(len(sys.argv), sys.argv)
+        )
+
+    exported_articles_path = sys.argv[2] if len(sys.argv) == 3 else None
+    return sys.argv[1], exported_articles_path
+
+
+def main() -> None:
+    """Benchmark the analysis pipeline and write the results."""
+    utils.toggle_myaku_package_log(filename_base=LOG_NAME)
+    output_path, exported_articles_path = parse_script_args()
+
+    corpus = load_corpus(exported_articles_path)
+    _log.info('Loaded benchmark corpus of %s articles', len(corpus))
+
+    start_time = time.perf_counter()
+    token_count, stage_results = benchmark_pipeline(corpus)
+    _log.info(
+        'Benchmarked analysis pipeline in %.1f seconds',
+        time.perf_counter() - start_time
+    )
+
+    log_results(stage_results)
+    write_results(output_path, corpus, token_count, stage_results)
+    _log.info('Wrote benchmark results to "%s"', output_path)
+
+
+if __name__ == '__main__':
+    _log = logging.getLogger('myaku.runners.benchmark_analysis')
+    try:
+        main()
+    except BaseException:
+        _log.exception('Unhandled exception in main')
+        raise
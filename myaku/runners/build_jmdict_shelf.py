@@ -1,21 +1,44 @@
-"""Builder for a shelf for quick loading of JMdict data."""
+"""Builder for an index for quick loading of JMdict data.
+
+The MeCab decompositions of the JMdict text forms needed for the index can be
+done in parallel by setting the MYAKU_JMDICT_DECOMP_WORKERS environment
+variable to the number of worker processes to use.
+
+If the MYAKU_JMDICT_DECOMP_CACHE environment variable is set to 1, the
+decompositions are cached in the app data dir so that only the text forms that
+are new since the last build are decomposed if ipadic-NEologd has not been
+updated since the last build.
+
+If the MYAKU_JMDICT_INCREMENTAL_BUILD environment variable is set to 1, the
+previously built index is used to only parse the JMdict XML entries that were
+added or changed since the last build.
+
+Also writes the resource manifest with the versions of the Japanese analysis
+resources so that processes using them don't have to probe them for their
+versions.
+"""
 
 import logging
 
 from myaku import utils
-from myaku.japanese_analysis import JapaneseTextAnalyzer
+from myaku.japanese_analysis import (
+    JapaneseTextAnalyzer,
+    write_resource_manifest,
+)
 
 _log = logging.getLogger(__name__)
 
 
 def main() -> None:
-    """Build a shelf for JMdict data."""
+    """Build an index for JMdict data."""
     utils.toggle_myaku_package_log(filename_base='build_shelf')
 
     # Creating a JapanenTextAnalyzer object will automatically create the
-    # JMdict shelf if it's not already created.
+    # JMdict index if it's not already created.
     JapaneseTextAnalyzer()
 
+    write_resource_manifest()
+
 
 if __name__ == '__main__':
     _log = logging.getLogger('myaku.runners.build_cache')
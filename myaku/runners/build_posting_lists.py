@@ -0,0 +1,32 @@
+"""Builds the lexical item posting lists and article counts of the index.
+
+Needs to be run once for an article index built before posting lists were
+added and after copying an article index to another database. The posting
+lists and article counts are kept up to date by the index builder and
+rescorer after that.
+"""
+
+import logging
+
+from myaku import utils
+from myaku.datastore import DataAccessMode
+from myaku.datastore.database import ArticleIndexDb
+
+_log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Rebuild all posting lists and article counts of the article index."""
+    utils.toggle_myaku_package_log(filename_base='build_posting_lists')
+    with ArticleIndexDb(DataAccessMode.READ_WRITE) as db:
+        db.rebuild_posting_lists()
+    _log.info('Posting lists and article counts built successfully')
+
+
+if __name__ == '__main__':
+    _log = logging.getLogger('myaku.runners.build_posting_lists')
+    try:
+        main()
+    except BaseException:
+        _log.exception('Unhandled exception in main')
+        raise
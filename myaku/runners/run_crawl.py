@@ -4,23 +4,50 @@ Usage: run_crawl.py <crawler_list>
 
 <crawler_list>: A comma-separated list of the crawlers whose most recent crawls
     to run. Possible values are listed in VALID_CRAWLER_NAMES.
+
+The number of processes to use for analyzing and scoring the crawled articles
+can be set with the MYAKU_CRAWL_ANALYSIS_WORKERS environment variable. If it is
+not set, the articles are analyzed and scored in the main process.
+
+The number of distinct text blocks whose analysis results are cached by each
+analyzer can be set with the MYAKU_PARSE_CACHE_SIZE environment variable. The
+hit rate of the cache is included in the crawl stats.
+
+The analyzed articles can be written to the crawl db in bulk by setting the
+MYAKU_CRAWL_WRITE_BUFFER_SIZE environment variable to the max number of
+articles to buffer before writing them and the MYAKU_CRAWL_WRITE_BUFFER_SECS
+environment variable to the max number of seconds to buffer articles for. If
+they are not set, each article is written as soon as it is analyzed.
 """
 
 import abc
 import logging
 import math
+import multiprocessing
+import os
 import sys
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.pool import AsyncResult
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 import myaku.crawlers
 from myaku import utils
-from myaku.crawlers.base import Crawl
+from myaku.crawlers.base import Crawl, CrawlerABC
 from myaku.datastore.index_build import ArticleIndexBuilder
-from myaku.datatypes import FoundJpnLexicalItem, JpnArticle
+from myaku.datatypes import FoundLexicalItemBatch, JpnArticle
 from myaku.errors import ScriptArgsError
-from myaku.japanese_analysis import JapaneseTextAnalyzer
+from myaku.japanese_analysis import JapaneseTextAnalyzer, ParseCacheCounts
 from myaku.scorer import MyakuArticleScorer
 
 _log = logging.getLogger(__name__)
@@ -36,15 +63,52 @@ VALID_CRAWLER_NAMES = {
 
 CRAWLER_ARG_LIST_SPLITTER = ','
 
+_ANALYSIS_WORKERS_ENV_VAR = 'MYAKU_CRAWL_ANALYSIS_WORKERS'
+_WRITE_BUFFER_SIZE_ENV_VAR = 'MYAKU_CRAWL_WRITE_BUFFER_SIZE'
+_WRITE_BUFFER_SECS_ENV_VAR = 'MYAKU_CRAWL_WRITE_BUFFER_SECS'
+
+# Max number of articles per analysis worker that can be waiting to be
+# analyzed or waiting to be written at one time when using analysis workers.
+_MAX_PENDING_ARTICLES_PER_WORKER = 2
+
 CrawlId = Tuple[str, str]
 
 
+@dataclass
+class CrawlStageSecs(object):
+    """Seconds spent in each stage of handling articles during a web crawl.
+
+    When analysis workers are used, the analysis and scoring secs are the sums
+    of the secs spent by all of the workers.
+    """
+    crawl: float = 0
+    analysis: float = 0
+    scoring: float = 0
+    write: float = 0
+
+    def __iadd__(self, other) -> 'CrawlStageSecs':
+        """Add the secs from another CrawlStageSecs to this one."""
+        if not isinstance(other, CrawlStageSecs):
+            raise TypeError(
+                f'Can not add type {type(other)} to CrawlStageSecs'
+            )
+
+        self.crawl += other.crawl
+        self.analysis += other.analysis
+        self.scoring += other.scoring
+        self.write += other.write
+        return self
+
+
 @dataclass
 class CrawlCounts(object):
     """Counts related to a web crawl."""
     article_count: int = 0
     character_count: int = 0
     fli_count: int = 0
+    parse_cache_hit_count: int = 0
+    parse_cache_miss_count: int = 0
+    stage_secs: CrawlStageSecs = field(default_factory=CrawlStageSecs)
 
     def __iadd__(self, other) -> 'CrawlCounts':
         """Add the counts from another CrawlCounts to this one."""
@@ -54,14 +118,21 @@ class CrawlCounts(object):
         self.article_count += other.article_count
         self.character_count += other.character_count
         self.fli_count += other.fli_count
+        self.parse_cache_hit_count += other.parse_cache_hit_count
+        self.parse_cache_miss_count += other.parse_cache_miss_count
+        self.stage_secs += other.stage_secs
         return self
 
     @classmethod
     def from_article(
-        cls, article: JpnArticle, flis: List[FoundJpnLexicalItem]
+        cls, article: JpnArticle, fli_batch: FoundLexicalItemBatch,
+        stage_secs: CrawlStageSecs, parse_cache_counts: ParseCacheCounts
     ) -> 'CrawlCounts':
         """Create counts for single article with given found lexical items."""
-        return cls(1, article.alnum_count, len(flis))
+        return cls(
+            1, article.alnum_count, len(fli_batch), parse_cache_counts.hits,
+            parse_cache_counts.misses, stage_secs
+        )
 
 
 class CrawlStats(object):
@@ -99,11 +170,14 @@ class CrawlStats(object):
 
     def update_crawl(
         self, crawl: Crawl, article: JpnArticle,
-        flis: List[FoundJpnLexicalItem]
+        fli_batch: FoundLexicalItemBatch, stage_secs: CrawlStageSecs,
+        parse_cache_counts: ParseCacheCounts
     ) -> None:
         """Update a crawl stats with given found article and lexical items."""
-        _log.info('Found %s lexical items in %s', len(flis), article)
-        counts = CrawlCounts.from_article(article, flis)
+        _log.info('Found %s lexical items in %s', len(fli_batch), article)
+        counts = CrawlCounts.from_article(
+            article, fli_batch, stage_secs, parse_cache_counts
+        )
         self._crawl_counts[crawl.get_id()] += counts
         self._source_counts[crawl.source_name] += counts
         self._overall_counts += counts
@@ -140,13 +214,251 @@ class CrawlStats(object):
         str_list.append(f'Articles crawled: {counts.article_count:,}')
         str_list.append(f'Characters analyzed: {counts.character_count:,}')
         str_list.append(f'Found lexical items: {counts.fli_count:,}')
+        str_list.append(self._format_parse_cache_hit_rate(counts))
         str_list.append(
             'Run time: {:,} minutes, {} seconds'.format(
                 math.floor(run_secs / 60), round(run_secs % 60)
             )
         )
+
+        str_list.append('Stage throughput:')
+        stage_secs = counts.stage_secs
+        for stage_name, secs in [
+            ('Crawl', stage_secs.crawl),
+            ('Analysis', stage_secs.analysis),
+            ('Scoring', stage_secs.scoring),
+            ('Write', stage_secs.write),
+        ]:
+            str_list.append(
+                self._format_stage_throughput(stage_name, counts, secs)
+            )
         _log.info('\n%s\n', '\n'.join(str_list))
 
+    def _format_parse_cache_hit_rate(self, counts: CrawlCounts) -> str:
+        """Format the parse cache hit rate in a readable format."""
+        lookup_count = (
+            counts.parse_cache_hit_count + counts.parse_cache_miss_count
+        )
+        if lookup_count == 0:
+            return 'Parse cache hit rate: N/A'
+
+        return 'Parse cache hit rate: {:.1%} ({:,} of {:,} blocks)'.format(
+            counts.parse_cache_hit_count / lookup_count,
+            counts.parse_cache_hit_count, lookup_count
+        )
+
+    def _format_stage_throughput(
+        self, stage_name: str, counts: CrawlCounts, stage_secs: float
+    ) -> str:
+        """Format the throughput of a crawl stage in a readable format."""
+        if stage_secs == 0:
+            return f'    {stage_name}: N/A'
+
+        return (
+            '    {}: {:,} articles/sec, {:,} characters/sec '
+            '({:,.1f} seconds)'.format(
+                stage_name,
+                round(counts.article_count / stage_secs, 2),
+                round(counts.character_count / stage_secs),
+                stage_secs
+            )
+        )
+
+
+class CrawledArticle(NamedTuple):
+    """An article given by a crawl that is waiting to be stored.
+
+    Attributes:
+        article: The article.
+        crawl_position: Number of articles given by the crawls of the crawler
+            when this article was given, including this article.
+        stage_secs: Secs spent so far in each stage on the article.
+    """
+    article: JpnArticle
+    crawl_position: int
+    stage_secs: CrawlStageSecs
+
+
+class AnalyzedArticle(NamedTuple):
+    """An article that has been analyzed and scored.
+
+    Attributes:
+        article: The article. Its quality score will be set.
+        fli_batch: The batch of lexical items found in the article. Their
+            quality score modifiers will be set.
+        analysis_secs: Secs spent finding the lexical items in the article.
+        scoring_secs: Secs spent scoring the article and its found lexical
+            items.
+        parse_cache_counts: Counts of the parse cache lookups done for the
+            text blocks of the article.
+    """
+    article: JpnArticle
+    fli_batch: FoundLexicalItemBatch
+    analysis_secs: float
+    scoring_secs: float
+    parse_cache_counts: ParseCacheCounts
+
+
+def analyze_article(
+    article: JpnArticle, jta: JapaneseTextAnalyzer, scorer: MyakuArticleScorer
+) -> AnalyzedArticle:
+    """Find the lexical items in an article and score them and the article."""
+    start_cache_counts = jta.parse_cache_counts
+    start_time = time.perf_counter()
+    fli_batch = jta.find_article_lexical_item_batch(article)
+    analysis_end_time = time.perf_counter()
+    end_cache_counts = jta.parse_cache_counts
+
+    scorer.score_article(article)
+    scorer.score_fli_batch_modifiers(fli_batch)
+
+    return AnalyzedArticle(
+        article, fli_batch, analysis_end_time - start_time,
+        time.perf_counter() - analysis_end_time,
+        ParseCacheCounts(
+            end_cache_counts.hits - start_cache_counts.hits,
+            end_cache_counts.misses - start_cache_counts.misses
+        )
+    )
+
+
+# The analyzer and scorer for an analysis worker process, or the error raised
+# while initializing them. Set by the initializer for each worker process.
+_worker_jta: JapaneseTextAnalyzer = None
+_worker_scorer: MyakuArticleScorer = None
+_worker_init_error: Optional[Exception] = None
+
+
+def _init_analysis_worker() -> None:
+    """Init the analyzer and scorer for an analysis worker process.
+
+    An error raised during the init is saved to be raised for each article
+    given to the worker instead. If the error was raised here, the pool would
+    keep replacing the worker with new workers that fail the same way, and
+    the results for the articles given to the pool would never be ready.
+    """
+    global _worker_jta, _worker_scorer, _worker_init_error
+    try:
+        _worker_jta = JapaneseTextAnalyzer()
+        _worker_scorer = MyakuArticleScorer()
+    except Exception as e:
+        _log.exception('Analysis worker %s failed to init', os.getpid())
+        _worker_init_error = e
+
+
+def _analyze_article_in_worker(article: JpnArticle) -> AnalyzedArticle:
+    """Analyze and score an article in an analysis worker process.
+
+    Raises:
+        The error raised while initializing the worker if its init failed.
+    """
+    if _worker_init_error is not None:
+        raise _worker_init_error
+    return analyze_article(article, _worker_jta, _worker_scorer)
+
+
+class CrawlArticleAnalyzer(object):
+    """Analyzer and scorer for crawled articles.
+
+    If more than one worker is used, the articles are analyzed and scored in a
+    pool of worker processes that each get their own JapaneseTextAnalyzer.
+    Otherwise, the articles are analyzed and scored in the current process.
+
+    Should be closed after use to end its worker processes. It can be used as
+    a context manager to close it automatically.
+    """
+
+    def __init__(self, worker_count: int = 1) -> None:
+        """Start the worker processes for the analyzer if any.
+
+        The analyzer and scorer are always loaded in the current process
+        first so that any error loading them is raised here rather than in the
+        worker processes. When the worker processes are forked, they also
+        reuse the analyzer and scorer loaded in the current process instead
+        of loading their own.
+
+        Args:
+            worker_count: The number of worker processes to use to analyze and
+                score articles. If 1, no worker processes are used, and the
+                articles are instead analyzed and scored in the current
+                process.
+        """
+        self._worker_count = worker_count
+        self._pool = None
+        self._jta = JapaneseTextAnalyzer()
+        self._scorer = MyakuArticleScorer()
+
+        if worker_count > 1:
+            self._pool = multiprocessing.Pool(
+                worker_count, initializer=_init_analysis_worker
+            )
+
+    def __enter__(self) -> 'CrawlArticleAnalyzer':
+        """Return self on context enter."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        """Invoke close method on context exit."""
+        self.close()
+
+    def close(self) -> None:
+        """End the worker processes of the analyzer if any."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def analyze_articles(
+        self, articles: Iterable[CrawledArticle]
+    ) -> Iterator[Tuple[AnalyzedArticle, CrawledArticle]]:
+        """Analyze and score articles.
+
+        The articles are only taken from the given iterable as they are needed
+        to keep the workers busy, so at most a few articles per worker are
+        waiting to be analyzed at any time.
+
+        Args:
+            articles: Iterable of the crawled articles to analyze.
+
+        Yields:
+            Each analyzed article and its crawled article in the same order as
+            the given articles with the analysis and scoring secs added to the
+            stage secs of the crawled article.
+        """
+        if self._pool is None:
+            for crawled_article in articles:
+                analyzed_article = analyze_article(
+                    crawled_article.article, self._jta, self._scorer
+                )
+                yield self._add_stage_secs(analyzed_article, crawled_article)
+            return
+
+        max_pending = self._worker_count * _MAX_PENDING_ARTICLES_PER_WORKER
+        pending: Deque[Tuple[AsyncResult, CrawledArticle]] = deque()
+        for crawled_article in articles:
+            pending.append((
+                self._pool.apply_async(
+                    _analyze_article_in_worker, (crawled_article.article,)
+                ),
+                crawled_article
+            ))
+            if len(pending) >= max_pending:
+                result, crawled_article = pending.popleft()
+                yield self._add_stage_secs(result.get(), crawled_article)
+
+        while len(pending) > 0:
+            result, crawled_article = pending.popleft()
+            yield self._add_stage_secs(result.get(), crawled_article)
+
+    def _add_stage_secs(
+        self, analyzed_article: AnalyzedArticle,
+        crawled_article: CrawledArticle
+    ) -> Tuple[AnalyzedArticle, CrawledArticle]:
+        """Add the analysis and scoring secs of the article to stage secs."""
+        crawled_article.stage_secs.analysis += analyzed_article.analysis_secs
+        crawled_article.stage_secs.scoring += analyzed_article.scoring_secs
+        return (analyzed_article, crawled_article)
+
 
 def parse_crawler_types_arg() -> List[abc.ABCMeta]:
     """Parse the crawler types from the argument given to this script."""
@@ -171,31 +483,97 @@ def parse_crawler_types_arg() -> List[abc.ABCMeta]:
     return crawler_types
 
 
+def get_analysis_worker_count() -> int:
+    """Get the number of analysis workers to use from the environment.
+
+    Raises:
+        EnvironmentNotSetError: The analysis worker count environment variable
+            is set to a value that is not a positive integer.
+    """
+    worker_count = utils.get_positive_int_from_env(_ANALYSIS_WORKERS_ENV_VAR)
+    return 1 if worker_count is None else worker_count
+
+
+def create_index_builder() -> ArticleIndexBuilder:
+    """Create an index builder with the write buffer set in the environment.
+
+    Raises:
+        EnvironmentNotSetError: A write buffer environment variable is set to
+            a value that is not a positive integer.
+    """
+    write_buffer_size = utils.get_positive_int_from_env(
+        _WRITE_BUFFER_SIZE_ENV_VAR
+    )
+    return ArticleIndexBuilder(
+        1 if write_buffer_size is None else write_buffer_size,
+        utils.get_positive_int_from_env(_WRITE_BUFFER_SECS_ENV_VAR)
+    )
+
+
+def get_storable_articles(
+    crawl: Crawl, crawler: CrawlerABC, index_builder: ArticleIndexBuilder
+) -> Iterator[CrawledArticle]:
+    """Get the articles from a crawl that can be stored in the crawl db.
+
+    Yields:
+        Each storable article from the crawl with stage secs that have the secs
+        spent crawling for the article set.
+    """
+    start_time = time.perf_counter()
+    for article in crawl.crawl_gen:
+        # Don't waste time running Japanese analysis on articles that can't be
+        # stored in the crawl db anyway.
+        if not index_builder.can_store_article(article):
+            continue
+
+        yield CrawledArticle(
+            article, crawler.crawled_article_count,
+            CrawlStageSecs(crawl=time.perf_counter() - start_time)
+        )
+        start_time = time.perf_counter()
+
+
 def crawl_most_recent(
-    crawler_type: abc.ABCMeta, jta: JapaneseTextAnalyzer,
-    scorer: MyakuArticleScorer, stats: CrawlStats
+    crawler_type: abc.ABCMeta, article_analyzer: CrawlArticleAnalyzer,
+    stats: CrawlStats
 ) -> None:
     """Run the most recent articles crawl for the given crawler type."""
-    with ArticleIndexBuilder() as index_builder, crawler_type() as crawler:
+    with create_index_builder() as index_builder, crawler_type() as crawler:
+        # Articles are taken from the crawls before the previous articles are
+        # written when analysis workers or the write buffer are used, so the
+        # crawl tracking is only updated once the articles are written.
+        crawler.defer_crawl_tracking()
         stats.add_crawl_source(crawler.SOURCE_NAME)
         crawls = crawler.get_crawls_for_most_recent()
         for crawl in crawls:
             stats.add_crawl(crawl)
 
-            for article in crawl.crawl_gen:
-                # Don't waste time running Japanese analysis on articles that
-                # can't be stored in the crawl db anyway.
-                if not index_builder.can_store_article(article):
-                    continue
-
-                flis = jta.find_article_lexical_items(article)
-                scorer.score_article(article)
-                for fli in flis:
-                    scorer.score_fli_modifier(fli)
-
-                index_builder.write_found_lexical_items(flis)
-                stats.update_crawl(crawl, article, flis)
-
+            analyzed_articles = article_analyzer.analyze_articles(
+                get_storable_articles(crawl, crawler, index_builder)
+            )
+            for analyzed_article, crawled_article in analyzed_articles:
+                # When the write buffer is used, the secs to write the
+                # buffered articles are counted for the article that causes
+                # the buffer to be flushed.
+                write_start_time = time.perf_counter()
+                index_builder.buffer_found_lexical_item_batch(
+                    analyzed_article.fli_batch
+                )
+                if index_builder.buffered_batch_count == 0:
+                    crawler.update_deferred_crawl_tracking(
+                        crawled_article.crawl_position
+                    )
+                stage_secs = crawled_article.stage_secs
+                stage_secs.write = time.perf_counter() - write_start_time
+
+                stats.update_crawl(
+                    crawl, analyzed_article.article,
+                    analyzed_article.fli_batch, stage_secs,
+                    analyzed_article.parse_cache_counts
+                )
+
+            index_builder.flush_write_buffer()
+            crawler.update_deferred_crawl_tracking()
             stats.finish_crawl(crawl)
         stats.finish_crawl_source(crawler.SOURCE_NAME)
 
@@ -203,13 +581,14 @@ def crawl_most_recent(
 def main() -> None:
     """Run a most recent crawl for the script arg-specified crawlers."""
     utils.toggle_myaku_package_log(filename_base=LOG_NAME)
-    stats = CrawlStats()
-    jta = JapaneseTextAnalyzer()
-    scorer = MyakuArticleScorer()
-
     crawler_types = parse_crawler_types_arg()
-    for crawler_type in crawler_types:
-        crawl_most_recent(crawler_type, jta, scorer, stats)
+    worker_count = get_analysis_worker_count()
+    _log.info('Using %s analysis worker(s)', worker_count)
+
+    stats = CrawlStats()
+    with CrawlArticleAnalyzer(worker_count) as article_analyzer:
+        for crawler_type in crawler_types:
+            crawl_most_recent(crawler_type, article_analyzer, stats)
     stats.finish_stat_tracking()
 
 
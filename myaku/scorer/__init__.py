@@ -2,8 +2,13 @@
 
 import logging
 import math
+from array import array
 
-from myaku.datatypes import FoundJpnLexicalItem, JpnArticle
+from myaku.datatypes import (
+    FoundJpnLexicalItem,
+    FoundLexicalItemBatch,
+    JpnArticle,
+)
 from myaku.scorer.factor_scorers import (
     ArticleLengthScorer,
     BlogArticleOrderScorer,
@@ -83,3 +88,25 @@ class MyakuArticleScorer(object):
                 scorer.score_fli_modifier(fli) * factor_weight
             )
         fli.quality_score_mod = fli_modifier_score
+
+    def score_fli_batch_modifiers(self, batch: FoundLexicalItemBatch) -> None:
+        """Determine the article score modifiers for a batch of found items.
+
+        Sets the scores in the quality_score_mods array of the batch. The
+        scores are the same as score_fli_modifier would give for each of the
+        found lexical items in the batch.
+
+        Args:
+            batch: The batch of found lexical items whose article score
+                modifiers to determine.
+        """
+        batch_modifier_scores = [0] * len(batch)
+        for (scorer, factor_weight) in self._FLI_MODIFIER_SCORE_FACTORS:
+            factor_scores = scorer.score_fli_batch_modifiers(batch)
+            for i, factor_score in enumerate(factor_scores):
+                batch_modifier_scores[i] += math.floor(
+                    factor_score * factor_weight
+                )
+        batch.quality_score_mods = array(
+            batch.quality_score_mods.typecode, batch_modifier_scores
+        )
@@ -9,7 +9,11 @@ from typing import Any, Generic, List, Tuple, TypeVar
 from typing_extensions import Protocol
 
 from myaku.crawlers import KakuyomuCrawler
-from myaku.datatypes import FoundJpnLexicalItem, JpnArticle
+from myaku.datatypes import (
+    FoundJpnLexicalItem,
+    FoundLexicalItemBatch,
+    JpnArticle,
+)
 
 T = TypeVar('T')
 C = TypeVar('C', bound='SameTypeComparable')
@@ -333,6 +337,27 @@ class FoundLexicalItemModifierFactorScorer(ABC):
         """
         return 0
 
+    def score_fli_batch_modifiers(
+        self, batch: FoundLexicalItemBatch
+    ) -> List[int]:
+        """Score the modifiers of a batch of found lexical items.
+
+        Creates a found lexical item object for each item in the batch to score
+        it with score_fli_modifier, so subclasses should override this if their
+        factor can be scored directly from the batch.
+
+        Args:
+            batch: The batch of found lexical items whose modifiers to score.
+
+        Returns:
+            The modifier score for each of the found lexical items in the batch
+            in the same order as the batch.
+        """
+        return [
+            self.score_fli_modifier(batch.get_found_lexical_item(i))
+            for i in range(len(batch))
+        ]
+
 
 class TermFrequencyScorer(FoundLexicalItemModifierFactorScorer):
     """Scorer based on how many times the fli is used in its article."""
@@ -361,3 +386,25 @@ class TermFrequencyScorer(FoundLexicalItemModifierFactorScorer):
             len(fli.found_positions)
         ]
         return math.floor(_MAX_FACTOR_SCORE * multiplier)
+
+    def score_fli_batch_modifiers(
+        self, batch: FoundLexicalItemBatch
+    ) -> List[int]:
+        """Score the term frequency modifiers of a found lexical item batch.
+
+        Args:
+            batch: The batch of found lexical items whose modifiers to score.
+
+        Returns:
+            The term frequency modifier score for each of the found lexical
+            items in the batch in the same order as the batch.
+        """
+        return [
+            math.floor(
+                _MAX_FACTOR_SCORE
+                * self._TERM_FREQUENCY_RANGE_MULTIPLIERS[end - start]
+            )
+            for start, end in zip(
+                batch.position_offsets, batch.position_offsets[1:]
+            )
+        ]
@@ -9,6 +9,8 @@ Thoroughly checks many aspects of the crawl during the test including:
     - All crawled data is correctly stored in the crawl database.
     - The search results first page cache is correctly set with the crawled
         data.
+    - The search path queries only read the docs they return from the crawl
+        database.
     - No unexpected network requests are attempted by the crawler.
 """
 
@@ -25,12 +27,14 @@ from unittest.mock import Mock
 import pymongo
 import requests
 from bson.objectid import ObjectId
+from pymongo.cursor import Cursor
 
 from myaku import utils
 from myaku.crawlers import kakuyomu
 from myaku.datastore import SEARCH_RESULTS_PAGE_SIZE, Query, SearchResult
 from myaku.datastore.cache import FirstPageCache
 from myaku.datastore.database import ArticleIndexDb, Document
+from myaku.datastore.index_search import ArticleIndexSearcher
 from myaku.datatypes import ArticleTextPosition
 from myaku.runners import run_crawl
 
@@ -190,7 +194,7 @@ UPDATE_CRAWL_EXPECTED_BLOG_DOCS.append({
 })
 
 
-ARTICLE_DOC_EXPECTED_FIELD_COUNT = 20
+ARTICLE_DOC_EXPECTED_FIELD_COUNT = 21
 INITIAL_CRAWL_EXPECTED_ARTICLE_DOCS = [
     {
         'full_text':
@@ -926,8 +930,8 @@ INITIAL_CRAWL_EXPECTED_FLI_QUERY_DOCS = {
             'base_form_possible_group': '山賊',
             'article_oid': 'Kakuyomu Series 1 Article 2',
             'found_positions': [
-                {'index': 287, 'len': 2},
-                {'index': 34, 'len': 2}
+                {'index': 34, 'len': 2},
+                {'index': 287, 'len': 2}
             ],
             'found_positions_exact_count': 2,
             'found_positions_definite_count': 2,
@@ -963,8 +967,8 @@ INITIAL_CRAWL_EXPECTED_FLI_QUERY_DOCS = {
             'article_oid': 'Kakuyomu Series 1 Article 2',
             'found_positions': [
                 {'index': 30, 'len': 4},
-                {'index': 349, 'len': 4},
-                {'index': 339, 'len': 4}
+                {'index': 339, 'len': 4},
+                {'index': 349, 'len': 4}
             ],
             'found_positions_exact_count': 3,
             'found_positions_definite_count': 3,
@@ -1437,8 +1441,8 @@ INITIAL_CRAWL_EXPECTED_FLI_QUERY_DOCS = {
             'base_form_possible_group': '模倣',
             'article_oid': 'Asahi Editorial 20',
             'found_positions': [
-                {'index': 105, 'len': 2},
-                {'index': 70, 'len': 2}
+                {'index': 70, 'len': 2},
+                {'index': 105, 'len': 2}
             ],
             'found_positions_exact_count': 2,
             'found_positions_definite_count': 2,
@@ -1626,8 +1630,8 @@ UPDATE_CRAWL_EXPECTED_FLI_QUERY_DOCS['美しさ'] = [
         'base_form_possible_group': '美しさ',
         'article_oid': 'Asahi Editorial 28',
         'found_positions': [
-            {'index': 70, 'len': 3},
-            {'index': 63, 'len': 3}
+            {'index': 63, 'len': 3},
+            {'index': 70, 'len': 3}
         ],
         'found_positions_exact_count': 2,
         'found_positions_definite_count': 2,
@@ -2085,6 +2089,8 @@ def assert_doc_field_value(
         # expected.
         assert isinstance(value, ObjectId)
         assert len(value.binary) == 12
+    elif field == 'sentence_ends':
+        assert value == utils.find_jpn_sentence_ends(expected_doc['full_text'])
     elif field == 'myaku_version_info':
         assert len(value) == VERSION_DOC_EXPECTED_FIELD_COUNT
         for key, version in value.items():
@@ -2339,6 +2345,52 @@ def assert_first_page_cache_data() -> None:
         assert_first_page_cache_article_keys(cache, db, expected_article_oids)
 
 
+def assert_docs_examined(cursor: Cursor, max_docs_examined: int) -> None:
+    """Assert the query plan for a cursor examines at most the max docs."""
+    execution_stats = cursor.explain()['executionStats']
+    assert execution_stats['totalDocsExamined'] <= max_docs_examined
+
+
+def assert_search_query_plans() -> None:
+    """Assert the search path queries only read the docs they return.
+
+    Checks the query plans of the search path queries for the first page of
+    every base form in the crawl db, so that the data read per search does not
+    grow with the size of the crawl db.
+    """
+    with ArticleIndexDb() as db, ArticleIndexSearcher() as searcher:
+        base_form_cursor = db.found_lexical_item_collection.aggregate([
+            {'$group': {'_id': '$base_form'}}
+        ])
+        for doc in base_form_cursor:
+            query = Query(doc['_id'], 1)
+            score_field = db.QUERY_TYPE_SCORE_FIELD_MAP[query.query_type]
+
+            # The ranking scan must be covered by the search index.
+            assert_docs_examined(searcher._get_ranking_cursor(query), 0)
+
+            rank_key_docs = searcher._get_page_rank_key_docs(
+                searcher._get_ranking_cursor(query), 0
+            )
+            assert_docs_examined(
+                searcher._get_ranked_fli_cursor(query, rank_key_docs),
+                len(rank_key_docs)
+            )
+
+            article_count = db.read_article_count(
+                query.query_type, query.query_str
+            )
+            postings = db.read_posting_list_page(
+                query.query_type, query.query_str, 0, SEARCH_RESULTS_PAGE_SIZE,
+                article_count
+            )
+            assert postings is not None
+            assert_docs_examined(
+                searcher._get_posting_fli_cursor(postings, score_field),
+                sum(len(posting['base_forms']) for posting in postings)
+            )
+
+
 def patch_utcnow(mocker, patch_dt: datetime) -> None:
     """Patch datetime.utcnow to return a static datetime for the crawlers."""
     MockDatetime.utcnow_datetime = patch_dt
@@ -2385,3 +2437,5 @@ def test_crawl_end_to_end(mocker, monkeypatch) -> None:
     assert_update_crawl_db_data()
     assert_first_page_cache_data()
     MockRequestsSession.assert_request_counts()
+
+    assert_search_query_plans()
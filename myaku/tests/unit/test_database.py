@@ -0,0 +1,622 @@
+"""Tests for the parts of myaku.datastore.database that need no db server."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Union
+from unittest.mock import Mock
+
+import bson
+import pytest
+from bson.objectid import ObjectId
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+
+from myaku.datastore import DataAccessMode, QueryType, database
+from myaku.datastore.database import (
+    ArticleIndexDb,
+    _BulkCopyCheckpoint,
+    _PooledClientRegistry,
+)
+from myaku.errors import EnvironmentNotSetError
+
+TEST_COLLECTION = 'test_collection'
+
+# MongoDB max doc size in bytes.
+MAX_DOC_SIZE = 16 * 1024 * 1024
+
+TEST_HOST = 'test_host'
+TEST_USER = 'test_user'
+TEST_PASSWORD = 'test_password'
+
+
+class FakeCursor(object):
+    """Minimal stand-in for a pymongo cursor over a list of docs."""
+
+    def __init__(self, docs: List[Dict[str, Any]]) -> None:
+        self._docs = docs
+
+    def sort(self, key: str, direction: int) -> 'FakeCursor':
+        return FakeCursor(
+            sorted(self._docs, key=lambda d: d[key], reverse=direction < 0)
+        )
+
+    def skip(self, count: int) -> 'FakeCursor':
+        return FakeCursor(self._docs[count:])
+
+    def limit(self, count: int) -> 'FakeCursor':
+        return FakeCursor(self._docs[:count])
+
+    def __iter__(self):
+        return iter(self._docs)
+
+
+class FakeBulkWriteResult(NamedTuple):
+    """Stand-in for a pymongo BulkWriteResult."""
+    modified_count: int
+    upserted_count: int
+
+
+class FakeCollection(object):
+    """Minimal in-memory stand-in for a pymongo collection.
+
+    Only supports finding docs with queries of fields equal to a value, $in a
+    list of values, $lte a value, or $gt a value, aggregations of $match and
+    $group stages with $sum accumulators, and bulk writes of ReplaceOne
+    requests and UpdateOne requests with $set, $unset, and $inc updates.
+    """
+
+    def __init__(self, docs: List[Dict[str, Any]] = None) -> None:
+        self.name = TEST_COLLECTION
+        self.full_name = 'test_db.' + TEST_COLLECTION
+        self.docs = list(docs or [])
+        self.bulk_write_count = 0
+
+    def estimated_document_count(self) -> int:
+        return len(self.docs)
+
+    def _matches(self, doc: Dict[str, Any], query: Mapping[str, Any]) -> bool:
+        for field, value in query.items():
+            if isinstance(value, dict) and '$in' in value:
+                if doc.get(field) not in value['$in']:
+                    return False
+            elif isinstance(value, dict) and '$lte' in value:
+                if field not in doc or doc[field] > value['$lte']:
+                    return False
+            elif isinstance(value, dict) and '$gt' in value:
+                if field not in doc or doc[field] <= value['$gt']:
+                    return False
+            elif doc.get(field) != value:
+                return False
+        return True
+
+    def _project(
+        self, doc: Dict[str, Any], projection: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        slices = {
+            k: v['$slice'] for k, v in projection.items()
+            if isinstance(v, dict)
+        }
+        if len(slices) > 0:
+            projected = dict(doc)
+            for field, (start, count) in slices.items():
+                if field in projected:
+                    projected[field] = projected[field][start:start + count]
+            return projected
+
+        fields = [k for k, v in projection.items() if v]
+        if projection.get('_id', 1):
+            fields.append('_id')
+        return {k: doc[k] for k in fields if k in doc}
+
+    def find(
+        self, query: Dict[str, Any], projection: Dict[str, Any] = None
+    ) -> FakeCursor:
+        docs = [d for d in self.docs if self._matches(d, query)]
+        if projection is not None:
+            docs = [self._project(d, projection) for d in docs]
+        return FakeCursor(docs)
+
+    def find_one(
+        self, query: Dict[str, Any], projection: Dict[str, Any] = None
+    ) -> Optional[Dict[str, Any]]:
+        return next(iter(self.find(query, projection)), None)
+
+    def _get_expression_value(
+        self, doc: Dict[str, Any], expression: Any
+    ) -> Any:
+        if isinstance(expression, dict):
+            return {
+                k: self._get_expression_value(doc, v)
+                for k, v in expression.items()
+            }
+        if isinstance(expression, str) and expression.startswith('$'):
+            value = doc
+            for field in expression[1:].split('.'):
+                value = value[field]
+            return value
+        return expression
+
+    def aggregate(
+        self, pipeline: List[Dict[str, Any]], allowDiskUse: bool = False
+    ) -> FakeCursor:
+        docs = self.docs
+        for stage in pipeline:
+            if '$match' in stage:
+                docs = [d for d in docs if self._matches(d, stage['$match'])]
+                continue
+
+            group_docs: Dict[Any, Dict[str, Any]] = {}
+            for doc in docs:
+                group_id = self._get_expression_value(
+                    doc, stage['$group']['_id']
+                )
+                group_key = bson.encode({'_id': group_id})
+                group_doc = group_docs.setdefault(group_key, {'_id': group_id})
+                for field, accumulator in stage['$group'].items():
+                    if field != '_id':
+                        value = self._get_expression_value(
+                            doc, accumulator['$sum']
+                        )
+                        group_doc[field] = group_doc.get(field, 0) + value
+            docs = list(group_docs.values())
+        return FakeCursor(docs)
+
+    def _update(self, doc: Dict[str, Any], update: Any) -> None:
+        doc.update(update.get('$set', {}))
+        for field in update.get('$unset', {}):
+            doc.pop(field, None)
+        for field, inc in update.get('$inc', {}).items():
+            doc[field] = doc.get(field, 0) + inc
+
+    def bulk_write(
+        self, requests: List[Union[ReplaceOne, UpdateOne]],
+        ordered: bool = True
+    ) -> FakeBulkWriteResult:
+        self.bulk_write_count += 1
+        modified_count = 0
+        upserted_count = 0
+        for request in requests:
+            matches = [
+                d for d in self.docs if self._matches(d, request._filter)
+            ]
+            if len(matches) > 0:
+                if isinstance(request, ReplaceOne):
+                    replacement = dict(request._doc, _id=matches[0]['_id'])
+                else:
+                    replacement = dict(matches[0])
+                    self._update(replacement, request._doc)
+                if replacement != matches[0]:
+                    modified_count += 1
+                self.docs[self.docs.index(matches[0])] = replacement
+            elif request._upsert:
+                if isinstance(request, ReplaceOne):
+                    upserted = dict(request._doc)
+                else:
+                    upserted = dict(request._filter)
+                    self._update(upserted, request._doc)
+                self.docs.append(dict(upserted, _id=ObjectId()))
+                upserted_count += 1
+        return FakeBulkWriteResult(modified_count, upserted_count)
+
+    def insert_many(
+        self, docs: List[Dict[str, Any]], ordered: bool = True
+    ) -> None:
+        for doc in docs:
+            assert doc['_id'] not in {d['_id'] for d in self.docs}
+            self.docs.append(dict(doc))
+
+
+def test_checkpoint_save_and_load(tmp_path):
+    filepath = str(tmp_path / 'checkpoint.json')
+    ids = sorted(ObjectId() for _ in range(2))
+    checkpoint = _BulkCopyCheckpoint(filepath)
+    assert not checkpoint.has_collection(TEST_COLLECTION)
+
+    checkpoint.start_collection(
+        TEST_COLLECTION, [(None, ids[0]), (ids[0], ids[1]), (ids[1], None)]
+    )
+    checkpoint.add_new_ids(TEST_COLLECTION, {ids[0]: ids[1]})
+    checkpoint.finish_collection(TEST_COLLECTION)
+
+    loaded = _BulkCopyCheckpoint(filepath)
+    assert loaded.has_collection(TEST_COLLECTION)
+    assert loaded.is_collection_done(TEST_COLLECTION)
+    assert loaded.get_range_count(TEST_COLLECTION) == 3
+    assert loaded.get_range(TEST_COLLECTION, 0) == (None, ids[0], None)
+    assert loaded.get_range(TEST_COLLECTION, 1) == (ids[0], ids[1], None)
+    assert loaded.get_range(TEST_COLLECTION, 2) == (ids[1], None, None)
+    assert loaded.get_new_id_map(TEST_COLLECTION) == {ids[0]: ids[1]}
+
+
+def test_checkpoint_without_file():
+    checkpoint = _BulkCopyCheckpoint(None)
+    checkpoint.start_collection(TEST_COLLECTION, [(None, None)])
+    assert checkpoint.get_range(TEST_COLLECTION, 0) == (None, None, None)
+    assert not checkpoint.is_collection_done(TEST_COLLECTION)
+
+
+def test_checkpoint_update_range_resume(tmp_path):
+    filepath = str(tmp_path / 'checkpoint.json')
+    ids = sorted(ObjectId() for _ in range(3))
+    checkpoint = _BulkCopyCheckpoint(filepath)
+    checkpoint.start_collection(
+        TEST_COLLECTION, [(None, ids[1]), (ids[1], None)]
+    )
+
+    checkpoint.update_range(TEST_COLLECTION, 0, ids[0])
+    checkpoint.update_range(TEST_COLLECTION, 1, ids[1])
+    checkpoint.update_range(TEST_COLLECTION, 1, ids[2])
+
+    resumed = _BulkCopyCheckpoint(filepath)
+    assert not resumed.is_collection_done(TEST_COLLECTION)
+    assert resumed.get_range(TEST_COLLECTION, 0) == (None, ids[1], ids[0])
+    assert resumed.get_range(TEST_COLLECTION, 1) == (ids[1], None, ids[2])
+
+
+def test_checkpoint_get_new_ids(tmp_path):
+    filepath = str(tmp_path / 'checkpoint.json')
+    old_ids = [ObjectId() for _ in range(3)]
+    new_ids = [ObjectId() for _ in range(2)]
+    checkpoint = _BulkCopyCheckpoint(filepath)
+    checkpoint.start_collection(TEST_COLLECTION, [(None, None)])
+    checkpoint.add_new_ids(TEST_COLLECTION, {old_ids[0]: new_ids[0]})
+    checkpoint.add_new_ids(TEST_COLLECTION, {old_ids[1]: new_ids[1]})
+
+    resumed = _BulkCopyCheckpoint(filepath)
+    assert resumed.get_new_ids(TEST_COLLECTION, old_ids) == {
+        old_ids[0]: new_ids[0], old_ids[1]: new_ids[1]
+    }
+    assert resumed.get_new_ids(TEST_COLLECTION, old_ids[2:]) == {}
+
+
+def test_get_bulk_copy_id_ranges():
+    ids = sorted(ObjectId() for _ in range(10))
+    collection = FakeCollection([{'_id': oid} for oid in reversed(ids)])
+
+    assert database._get_bulk_copy_id_ranges(collection, 1) == [(None, None)]
+    assert database._get_bulk_copy_id_ranges(collection, 2) == [
+        (None, ids[5]), (ids[5], None)
+    ]
+    assert database._get_bulk_copy_id_ranges(collection, 3) == [
+        (None, ids[3]), (ids[3], ids[6]), (ids[6], None)
+    ]
+
+
+def test_get_bulk_copy_id_ranges_few_docs():
+    ids = sorted(ObjectId() for _ in range(2))
+    collection = FakeCollection([{'_id': oid} for oid in ids])
+    assert database._get_bulk_copy_id_ranges(collection, 4) == [
+        (None, ids[0]), (ids[0], ids[1]), (ids[1], None)
+    ]
+
+    empty_collection = FakeCollection()
+    assert database._get_bulk_copy_id_ranges(empty_collection, 4) == [
+        (None, None)
+    ]
+
+
+def test_bulk_copy_docs_collision_resume(tmp_path, monkeypatch):
+    filepath = str(tmp_path / 'checkpoint.json')
+    ids = sorted(ObjectId() for _ in range(3))
+    src_docs = [{'_id': oid, 'value': i} for i, oid in enumerate(ids)]
+    dest_coll = FakeCollection([
+        {'_id': ids[0], 'value': 0}, {'_id': ids[1], 'value': 'other'}
+    ])
+    checkpoint = _BulkCopyCheckpoint(filepath)
+    checkpoint.start_collection(TEST_COLLECTION, [(None, None)])
+
+    # Simulate the copy stopping after the inserts but before the range
+    # progress is saved.
+    def raise_error(*args):
+        raise RuntimeError()
+    monkeypatch.setattr(checkpoint, 'update_range', raise_error)
+    with pytest.raises(RuntimeError):
+        database._bulk_copy_docs(
+            dest_coll, [dict(doc) for doc in src_docs], 0, checkpoint, {}
+        )
+    assert len(dest_coll.docs) == 4
+    new_id_map = checkpoint.get_new_id_map(TEST_COLLECTION)
+    assert list(new_id_map) == [ids[1]]
+    assert {'_id': new_id_map[ids[1]], 'value': 1} in dest_coll.docs
+
+    resumed = _BulkCopyCheckpoint(filepath)
+    assert resumed.get_range(TEST_COLLECTION, 0) == (None, None, None)
+    skipped = database._bulk_copy_docs(
+        dest_coll, [dict(doc) for doc in src_docs], 0, resumed, {}
+    )
+    assert skipped == 3
+    assert len(dest_coll.docs) == 4
+    assert resumed.get_new_id_map(TEST_COLLECTION) == new_id_map
+    assert resumed.get_range(TEST_COLLECTION, 0) == (None, None, ids[2])
+
+
+def test_max_posting_list_doc_size():
+    posting = {
+        'score': 1234,
+        'last_updated': datetime.utcnow(),
+        'article_oid': ObjectId(),
+        'base_forms': ['食べ物'] * 10,
+    }
+    posting_list_doc = {
+        'query_type': 1,
+        'query_str': '食べ物',
+        'posting_count': ArticleIndexDb.MAX_POSTING_LIST_LEN,
+        'postings': [posting] * ArticleIndexDb.MAX_POSTING_LIST_LEN,
+    }
+    assert len(bson.encode(posting_list_doc)) < MAX_DOC_SIZE
+
+
+@pytest.fixture
+def mock_mongo_client(monkeypatch):
+    """Patch MongoClient so that each call creates a new Mock client."""
+    mock_client_class = Mock(side_effect=lambda **kwargs: Mock())
+    monkeypatch.setattr(database, 'MongoClient', mock_client_class)
+    for env_var in database._DB_CLIENT_OPTION_ENV_VARS.values():
+        monkeypatch.delenv(env_var, raising=False)
+    return mock_client_class
+
+
+def get_test_client(
+    registry: _PooledClientRegistry,
+    access_mode: DataAccessMode = DataAccessMode.READ
+) -> MongoClient:
+    """Get a client from the registry for the test host and user.
+
+    The client is a Mock while the mock_mongo_client fixture is used.
+    """
+    return registry.get_client(
+        TEST_HOST, TEST_USER, TEST_PASSWORD, access_mode, 'admin'
+    )
+
+
+def test_pooled_client_registry_leases(mock_mongo_client):
+    registry = _PooledClientRegistry()
+    read_client = get_test_client(registry)
+    assert get_test_client(registry) is read_client
+    assert get_test_client(registry) is read_client
+    write_client = get_test_client(registry, DataAccessMode.READ_WRITE)
+    assert write_client is not read_client
+    assert mock_mongo_client.call_count == 2
+
+    stats = registry.get_stats()
+    assert stats['test_host/test_user/READ']['leases'] == 3
+    assert stats['test_host/test_user/READ_WRITE']['leases'] == 1
+
+
+def test_pooled_client_registry_stats(mock_mongo_client):
+    registry = _PooledClientRegistry()
+    assert registry.get_stats() == {}
+
+    get_test_client(registry)
+    listener = mock_mongo_client.call_args[1]['event_listeners'][0]
+    listener.connection_created(None)
+    listener.connection_created(None)
+    listener.connection_checked_out(None)
+    listener.connection_check_out_failed(None)
+    listener.connection_closed(None)
+    listener.connection_checked_in(None)
+
+    assert registry.get_stats() == {
+        'test_host/test_user/READ': {
+            'leases': 1,
+            'connections_created': 2,
+            'connections_closed': 1,
+            'checkouts': 1,
+            'checkout_failures': 1,
+        }
+    }
+
+
+def test_pooled_client_registry_fork_reset(mock_mongo_client, monkeypatch):
+    registry = _PooledClientRegistry()
+    parent_client = get_test_client(registry)
+    get_test_client(registry)
+    assert registry.should_create_indexes(
+        TEST_HOST, TEST_USER, DataAccessMode.READ
+    )
+    assert not registry.should_create_indexes(
+        TEST_HOST, TEST_USER, DataAccessMode.READ
+    )
+
+    child_pid = database.os.getpid() + 1
+    monkeypatch.setattr(database.os, 'getpid', lambda: child_pid)
+    child_client = get_test_client(registry)
+    assert child_client is not parent_client
+    assert get_test_client(registry) is child_client
+    assert mock_mongo_client.call_count == 2
+    assert registry.get_stats()['test_host/test_user/READ']['leases'] == 2
+    assert registry.should_create_indexes(
+        TEST_HOST, TEST_USER, DataAccessMode.READ
+    )
+
+
+def test_pooled_client_registry_options(mock_mongo_client, monkeypatch):
+    monkeypatch.setenv('MYAKU_CRAWLDB_MAX_POOL_SIZE', '50')
+    get_test_client(_PooledClientRegistry())
+
+    kwargs = mock_mongo_client.call_args[1]
+    assert kwargs['maxPoolSize'] == 50
+    assert 'minPoolSize' not in kwargs
+
+
+def test_get_db_client_options(monkeypatch):
+    for env_var in database._DB_CLIENT_OPTION_ENV_VARS.values():
+        monkeypatch.delenv(env_var, raising=False)
+    assert database._get_db_client_options() == {}
+
+    monkeypatch.setenv('MYAKU_CRAWLDB_MAX_POOL_SIZE', '100')
+    monkeypatch.setenv('MYAKU_CRAWLDB_MIN_POOL_SIZE', '0')
+    monkeypatch.setenv('MYAKU_CRAWLDB_CONNECT_TIMEOUT_MS', '')
+    assert database._get_db_client_options() == {
+        'maxPoolSize': 100,
+        'minPoolSize': 0,
+    }
+
+
+@pytest.mark.parametrize('value', ['abc', '-1', '1.5', ' 10'])
+def test_get_db_client_options_invalid(monkeypatch, value):
+    for env_var in database._DB_CLIENT_OPTION_ENV_VARS.values():
+        monkeypatch.delenv(env_var, raising=False)
+    monkeypatch.setenv('MYAKU_CRAWLDB_WAIT_QUEUE_TIMEOUT_MS', value)
+    with pytest.raises(EnvironmentNotSetError):
+        database._get_db_client_options()
+
+
+def make_test_db() -> ArticleIndexDb:
+    """Make a writable ArticleIndexDb that never connects to a db server.
+
+    The collections must be given to each method that takes a collection.
+    """
+    db = ArticleIndexDb(DataAccessMode.READ_WRITE)
+    db._mongo_client = Mock()
+    return db
+
+
+def test_bulk_replace_write_with_log():
+    stored_oid = ObjectId()
+    coll = FakeCollection([{'_id': stored_oid, 'source_url': 'b', 'v': 0}])
+    docs = [
+        {'source_url': 'a', 'v': 1},
+        {'source_url': 'b', 'v': 2},
+        {'source_url': 'c', 'v': 3},
+        {'source_url': 'a', 'v': 4},
+    ]
+    oids = make_test_db().bulk_replace_write_with_log(
+        docs, coll, 'source_url'
+    )
+
+    # The ObjectIds are in the order of the given docs, and docs with the
+    # same id field value get the same ObjectId.
+    assert len(oids) == len(docs)
+    assert oids[1] == stored_oid
+    assert oids[0] == oids[3]
+    assert len(set(oids)) == 3
+    assert coll.bulk_write_count == 1
+
+    # The last doc with an id field value is the one written.
+    assert sorted(coll.docs, key=lambda d: d['source_url']) == [
+        {'_id': oids[0], 'source_url': 'a', 'v': 4},
+        {'_id': stored_oid, 'source_url': 'b', 'v': 2},
+        {'_id': oids[2], 'source_url': 'c', 'v': 3},
+    ]
+
+
+def test_bulk_replace_write_with_log_no_docs():
+    coll = FakeCollection()
+    assert make_test_db().bulk_replace_write_with_log(
+        [], coll, 'source_url'
+    ) == []
+    assert coll.bulk_write_count == 0
+
+
+def make_posting_list_doc(query_str: str, posting_count: int) -> Dict:
+    """Make a posting list doc for an exact query with postings."""
+    return {
+        'query_type': QueryType.EXACT.value,
+        'query_str': query_str,
+        'posting_count': posting_count,
+        'postings': [
+            {'article_oid': ObjectId(), 'score': i}
+            for i in reversed(range(posting_count))
+        ],
+    }
+
+
+def test_read_posting_list_page_count_mismatch():
+    db = make_test_db()
+    posting_list_doc = make_posting_list_doc('食う', 3)
+    db._posting_list_collection = FakeCollection([posting_list_doc])
+
+    assert db.read_posting_list_page(QueryType.EXACT, '食う', 1, 5, 3) == (
+        posting_list_doc['postings'][1:]
+    )
+
+    # A posting list with a posting count different from the article count
+    # may be missing postings, so it's not used.
+    assert db.read_posting_list_page(QueryType.EXACT, '食う', 1, 5, 4) is None
+    assert db.read_posting_list_page(QueryType.EXACT, '飲む', 0, 5, 3) is None
+
+
+def test_invalidate_posting_lists():
+    db = make_test_db()
+    over_max_count = ArticleIndexDb.MAX_POSTING_LIST_LEN + 1
+    posting_list_docs = [
+        make_posting_list_doc('食う', 2),
+        make_posting_list_doc('飲む', 2),
+        {
+            'query_type': QueryType.EXACT.value, 'query_str': '寝る',
+            'posting_count': over_max_count,
+        },
+        make_posting_list_doc('見る', 1),
+    ]
+    db._posting_list_collection = FakeCollection(posting_list_docs)
+
+    invalidated_count = db._invalidate_posting_lists(
+        QueryType.EXACT, {'食う': 2, '飲む': 3, '寝る': 5}
+    )
+
+    # Only the posting list with a posting count different from its recounted
+    # article count is invalidated.
+    assert invalidated_count == 1
+    docs = {
+        doc['query_str']: doc for doc in db._posting_list_collection.docs
+    }
+    assert docs['食う'] == posting_list_docs[0]
+    assert docs['飲む']['posting_count'] == over_max_count
+    assert 'postings' not in docs['飲む']
+    assert docs['寝る'] == posting_list_docs[2]
+    assert docs['見る'] == posting_list_docs[3]
+    assert db.read_posting_list_page(QueryType.EXACT, '飲む', 0, 5, 3) is None
+
+
+def make_fli_docs(
+    base_form_article_oids: Dict[str, List[ObjectId]]
+) -> List[Dict[str, Any]]:
+    """Make found lexical item docs for base forms found in articles."""
+    docs = []
+    for base_form, article_oids in base_form_article_oids.items():
+        for article_oid in article_oids:
+            doc: Dict[str, Any] = {
+                '_id': ObjectId(), 'article_oid': article_oid
+            }
+            for query_type in QueryType:
+                query_field = ArticleIndexDb.QUERY_TYPE_QUERY_FIELD_MAP[
+                    query_type
+                ]
+                doc[query_field] = base_form
+            docs.append(doc)
+    return docs
+
+
+def test_reconcile_article_counts(monkeypatch):
+    monkeypatch.setattr(database, '_RECONCILE_BATCH_SIZE', 1)
+    db = make_test_db()
+    db.access_mode = DataAccessMode.READ_UPDATE
+    article_oids = [ObjectId() for _ in range(3)]
+
+    # 食う is found twice in the first article, so it's only counted once.
+    db._found_lexical_item_collection = FakeCollection(make_fli_docs({
+        '食う': [article_oids[0], article_oids[0], article_oids[1]],
+        '飲む': article_oids,
+        '寝る': [article_oids[2]],
+    }))
+    db._article_count_collection = FakeCollection([
+        {'query_type': query_type.value, 'query_str': '食う',
+         'article_count': 3}
+        for query_type in QueryType
+    ] + [
+        {'query_type': query_type.value, 'query_str': '飲む',
+         'article_count': 3}
+        for query_type in QueryType
+    ])
+    db._posting_list_collection = FakeCollection()
+
+    # The drifted 食う counts are corrected and the missing 寝る counts are
+    # added, but the correct 飲む counts are left as is.
+    assert db.reconcile_article_counts() == 2 * len(QueryType)
+    for query_type in QueryType:
+        assert db.read_article_count(query_type, '食う') == 2
+        assert db.read_article_count(query_type, '飲む') == 3
+        assert db.read_article_count(query_type, '寝る') == 1
+    assert len(db._article_count_collection.docs) == 3 * len(QueryType)
+
+    # Nothing is corrected once the counts are reconciled.
+    assert db.reconcile_article_counts() == 0
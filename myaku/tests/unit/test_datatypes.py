@@ -0,0 +1,140 @@
+"""Tests for the data types in myaku.datatypes."""
+
+import pickle
+
+from myaku.datatypes import (
+    ArticleTextPosition,
+    FoundJpnLexicalItem,
+    FoundLexicalItemBatchBuilder,
+    InterpSource,
+    JpnArticle,
+    JpnLexicalItemInterp,
+    MecabLexicalItemInterp,
+    reduce_found_lexical_items,
+)
+
+NOUN_INTERP = JpnLexicalItemInterp(
+    (InterpSource.MECAB,), MecabLexicalItemInterp(('名詞', '一般'))
+)
+PARTICLE_INTERP = JpnLexicalItemInterp(
+    (InterpSource.MECAB,), MecabLexicalItemInterp(('助詞', '接続助詞'))
+)
+JMDICT_INTERP = JpnLexicalItemInterp(
+    (InterpSource.JMDICT_MECAB_DECOMP,), jmdict_interp_entry_id='1234567'
+)
+
+# (base form, start, len, interps) for each single position lexical item.
+SAMPLE_FOUND_ITEMS = [
+    ('山賊', 287, 2, (NOUN_INTERP,)),
+    ('けれども', 30, 4, (NOUN_INTERP, PARTICLE_INTERP)),
+    ('山賊', 34, 2, (NOUN_INTERP,)),
+    ('けれども', 349, 4, (NOUN_INTERP,)),
+    ('けれども', 339, 4, (PARTICLE_INTERP,)),
+    ('山賊', 34, 2, (NOUN_INTERP, JMDICT_INTERP)),
+    ('模倣', 70, 2, (JMDICT_INTERP,)),
+]
+
+
+def create_sample_flis(article):
+    """Create a single position found lexical item for each sample item."""
+    return [
+        FoundJpnLexicalItem(
+            base_form=base_form,
+            article=article,
+            found_positions=[ArticleTextPosition(start, length)],
+            possible_interps=list(interps)
+        )
+        for base_form, start, length, interps in SAMPLE_FOUND_ITEMS
+    ]
+
+
+def fli_key(fli):
+    """Get a comparable key for the data of a found lexical item."""
+    return (
+        fli.base_form,
+        sorted(fli.found_positions),
+        set(fli.possible_interps),
+        {
+            interp: sorted(positions)
+            for interp, positions in fli.interp_position_map.items()
+        },
+    )
+
+
+def test_batch_builder_reduces_like_reduce_found_lexical_items():
+    """Test the builder reduces flis the same as reduce_found_lexical_items."""
+    article = JpnArticle(full_text='')
+    builder = FoundLexicalItemBatchBuilder(article)
+    for base_form, start, length, interps in SAMPLE_FOUND_ITEMS:
+        builder.add(base_form, start, length, interps)
+    batch = builder.build()
+
+    reduced_flis = reduce_found_lexical_items(create_sample_flis(article))
+    batch_flis = batch.to_found_lexical_items()
+    assert len(batch) == len(reduced_flis) == 3
+    assert (
+        sorted(map(fli_key, batch_flis), key=lambda k: k[0])
+        == sorted(map(fli_key, reduced_flis), key=lambda k: k[0])
+    )
+
+    for fli in batch_flis:
+        assert fli.article is article
+        assert fli.found_positions == sorted(fli.found_positions)
+        assert fli.quality_score_mod == 0
+
+    fli = batch.get_found_lexical_item(batch.base_forms.index('けれども'))
+    assert fli.interp_position_map == {
+        NOUN_INTERP: [ArticleTextPosition(30, 4), ArticleTextPosition(349, 4)],
+        PARTICLE_INTERP: [
+            ArticleTextPosition(30, 4), ArticleTextPosition(339, 4)
+        ],
+    }
+
+    index = batch.base_forms.index('山賊')
+    assert batch.get_found_position_count(index) == 2
+    assert batch.get_interp_position_map(index) == {
+        JMDICT_INTERP: [ArticleTextPosition(34, 2)]
+    }
+
+
+def test_batch_builder_add_found_lexical_item():
+    """Test adding flis to the builder matches adding single positions."""
+    article = JpnArticle(full_text='')
+    position_builder = FoundLexicalItemBatchBuilder(article)
+    for base_form, start, length, interps in SAMPLE_FOUND_ITEMS:
+        position_builder.add(base_form, start, length, interps)
+    position_batch = position_builder.build()
+
+    # Adding the already reduced flis must give the same batch as well.
+    for flis in [
+        create_sample_flis(article),
+        reduce_found_lexical_items(create_sample_flis(article))
+    ]:
+        fli_builder = FoundLexicalItemBatchBuilder(article)
+        for fli in flis:
+            fli_builder.add_found_lexical_item(fli)
+        fli_batch = fli_builder.build()
+
+        assert (
+            sorted(map(fli_key, fli_batch.to_found_lexical_items()),
+                   key=lambda k: k[0])
+            == sorted(map(fli_key, position_batch.to_found_lexical_items()),
+                      key=lambda k: k[0])
+        )
+
+
+def test_batch_pickle_round_trip():
+    """Test a batch keeps all of its data when pickled and unpickled."""
+    builder = FoundLexicalItemBatchBuilder(JpnArticle(full_text=''))
+    for base_form, start, length, interps in SAMPLE_FOUND_ITEMS:
+        builder.add(base_form, start, length, interps)
+    batch = builder.build()
+    batch.quality_score_mods[0] = 750
+
+    unpickled_batch = pickle.loads(pickle.dumps(batch))
+    assert len(unpickled_batch) == len(batch)
+    assert unpickled_batch.quality_score_mods[0] == 750
+    assert (
+        list(map(fli_key, unpickled_batch.to_found_lexical_items()))
+        == list(map(fli_key, batch.to_found_lexical_items()))
+    )
@@ -0,0 +1,180 @@
+"""Tests for building the article index in myaku.datastore.index_build."""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple
+
+import pytest
+from bson.objectid import ObjectId
+from pymongo.errors import AutoReconnect
+
+from myaku.datastore import document_convert
+from myaku.datastore.index_build import ArticleIndexBuilder
+from myaku.datatypes import (
+    FoundLexicalItemBatch,
+    FoundLexicalItemBatchBuilder,
+    InterpSource,
+    JpnArticle,
+    JpnLexicalItemInterp,
+)
+
+
+class FakeInsertManyResult(NamedTuple):
+    """Stand-in for a pymongo InsertManyResult."""
+    inserted_ids: List[ObjectId]
+
+
+class FakeIndexDb(object):
+    """Stand-in for ArticleIndexDb that keeps the written docs in lists.
+
+    The collections are just the names of the collections, and the docs
+    written to each collection are kept in docs under its name.
+    """
+
+    def __init__(self) -> None:
+        self.article_collection = 'articles'
+        self.blog_collection = 'blogs'
+        self.found_lexical_item_collection = 'found_lexical_items'
+        self.docs: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.posting_docs: List[Dict[str, Any]] = []
+
+        # The lookup values of each read in the order the reads were done.
+        self.reads: List[List[Any]] = []
+
+        # Names of the write operations that fail the next time they are done.
+        self.fail_next: set = set()
+
+    def _fail_if_set(self, operation: str) -> None:
+        if operation in self.fail_next:
+            self.fail_next.remove(operation)
+            raise AutoReconnect(operation + ' failed')
+
+    def read_with_log(
+        self, lookup_field_name: str, lookup_values: List[Any],
+        collection: str, projection: Dict[str, int] = None
+    ) -> List[Dict[str, Any]]:
+        self.reads.append(sorted(lookup_values))
+        return [
+            doc for doc in self.docs[collection]
+            if doc.get(lookup_field_name) in lookup_values
+        ]
+
+    def write_with_log(
+        self, docs: List[Dict[str, Any]], collection: str
+    ) -> FakeInsertManyResult:
+        self._fail_if_set(collection)
+        for doc in docs:
+            doc['_id'] = ObjectId()
+        self.docs[collection].extend(docs)
+        return FakeInsertManyResult([doc['_id'] for doc in docs])
+
+    def bulk_replace_write_with_log(
+        self, docs: List[Dict[str, Any]], collection: str, id_field: str
+    ) -> List[ObjectId]:
+        return self.write_with_log(docs, collection).inserted_ids
+
+    def add_to_posting_lists_and_counts(
+        self, found_lexical_item_docs: List[Dict[str, Any]]
+    ) -> None:
+        self._fail_if_set('postings')
+        self.posting_docs.extend(found_lexical_item_docs)
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_db_builder(monkeypatch):
+    """Make an index builder with a write buffer that writes to a fake db."""
+    monkeypatch.setattr(
+        document_convert, '_get_myaku_version_doc', lambda: {}
+    )
+    builder = ArticleIndexBuilder(write_buffer_size=2)
+    builder._db = FakeIndexDb()
+    return builder
+
+
+def make_batch(text: str) -> FoundLexicalItemBatch:
+    """Make a batch with a found lexical item for each char of the text."""
+    article = JpnArticle(
+        full_text=text, source_url='https://test.jp/' + text,
+        quality_score=len(text), last_updated_datetime=datetime(2020, 1, 9)
+    )
+    builder = FoundLexicalItemBatchBuilder(article)
+    for i, char in enumerate(text):
+        builder.add(char, i, 1, [JpnLexicalItemInterp((InterpSource.MECAB,))])
+    return builder.build()
+
+
+@pytest.mark.parametrize('fail_operation', ['found_lexical_items', 'postings'])
+def test_flush_write_buffer_resume(fake_db_builder, fail_operation):
+    db = fake_db_builder._db
+    db.fail_next.add(fail_operation)
+    fake_db_builder.buffer_found_lexical_item_batch(make_batch('あい'))
+    with pytest.raises(AutoReconnect):
+        fake_db_builder.buffer_found_lexical_item_batch(make_batch('うえ'))
+    assert fake_db_builder.buffered_batch_count == 2
+    assert len(db.docs['articles']) == 2
+    assert fake_db_builder.flush_stats.flush_count == 0
+
+    # The next flush finishes the failed flush without writing its articles
+    # again, and then flushes the batch buffered after the failed flush.
+    fake_db_builder.buffer_found_lexical_item_batch(make_batch('おか'))
+    assert fake_db_builder.buffered_batch_count == 0
+    assert [doc['full_text'] for doc in db.docs['articles']] == [
+        'あい', 'うえ', 'おか'
+    ]
+    article_oids = [doc['_id'] for doc in db.docs['articles']]
+    fli_docs = db.docs['found_lexical_items']
+    assert [(doc['base_form'], doc['article_oid']) for doc in fli_docs] == [
+        ('あ', article_oids[0]), ('い', article_oids[0]),
+        ('う', article_oids[1]), ('え', article_oids[1]),
+        ('お', article_oids[2]), ('か', article_oids[2]),
+    ]
+    assert db.posting_docs == fli_docs
+    assert fake_db_builder.flush_stats.flush_count == 2
+    assert fake_db_builder.flush_stats.article_count == 3
+
+    # The written articles are still recognized as stored.
+    assert not fake_db_builder.can_store_article(JpnArticle(full_text='うえ'))
+
+
+def test_filter_storable_articles(fake_db_builder):
+    db = fake_db_builder._db
+    stored_article = JpnArticle(full_text='あ')
+    db.docs['articles'].append({'text_hash': stored_article.text_hash})
+    too_long_text = 'う' * (ArticleIndexBuilder.MAX_ALLOWED_ARTICLE_LEN + 1)
+    articles = [
+        JpnArticle(full_text='あ'),
+        JpnArticle(full_text='い'),
+        JpnArticle(full_text=too_long_text),
+        JpnArticle(full_text='い'),
+        JpnArticle(full_text='え'),
+    ]
+
+    # Only the first of the articles with the same text is storable, and
+    # the text of all of the articles is checked with a single read.
+    storable = fake_db_builder.filter_storable_articles(articles)
+    assert storable == [articles[1], articles[4]]
+    assert len(db.reads) == 1
+
+    # The text checked before is not read from the db again.
+    assert fake_db_builder.filter_storable_articles(articles[:2]) == [
+        articles[1]
+    ]
+    assert len(db.reads) == 1
+
+
+def test_read_stored_text_hashes_lru(fake_db_builder, monkeypatch):
+    db = fake_db_builder._db
+    monkeypatch.setattr(fake_db_builder, 'MAX_TEXT_HASH_CACHE_SIZE', 2)
+    db.docs['articles'].append({'text_hash': 'a'})
+
+    assert fake_db_builder._read_stored_text_hashes(['a', 'b']) == {'a'}
+    assert fake_db_builder._read_stored_text_hashes(['a']) == {'a'}
+    assert fake_db_builder._read_stored_text_hashes(['c']) == set()
+
+    # b is evicted instead of a since a was used more recently.
+    assert fake_db_builder._read_stored_text_hashes(['a']) == {'a'}
+    assert fake_db_builder._read_stored_text_hashes(['b']) == set()
+    assert db.reads == [['a', 'b'], ['c'], ['b']]
@@ -0,0 +1,217 @@
+"""Tests for reading search results from the index in myaku.datastore."""
+
+import copy
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Tuple
+from unittest.mock import Mock
+
+from bson.objectid import ObjectId
+
+from myaku.datastore import Query, QueryType, index_search, serialize
+from myaku.datastore.database import ArticleIndexDb
+from myaku.datastore.index_search import ArticleIndexSearcher
+from myaku.datatypes import ArticleRankKey
+
+SCORE_FIELD = ArticleIndexDb.QUERY_TYPE_SCORE_FIELD_MAP[QueryType.EXACT]
+QUERY_FIELD = ArticleIndexDb.QUERY_TYPE_QUERY_FIELD_MAP[QueryType.EXACT]
+
+
+def matches_filter(doc: Dict[str, Any], query: Mapping[str, Any]) -> bool:
+    """Return True if a doc matches a Mongo query filter.
+
+    Only supports equality, $lt, $lte, and $or filters.
+    """
+    for field, value in query.items():
+        if field == '$or':
+            if not any(matches_filter(doc, q) for q in value):
+                return False
+        elif isinstance(value, dict):
+            if '$lt' in value and not doc[field] < value['$lt']:
+                return False
+            if '$lte' in value and not doc[field] <= value['$lte']:
+                return False
+        elif doc.get(field) != value:
+            return False
+    return True
+
+
+class FakeFliCursor(object):
+    """Minimal stand-in for a pymongo cursor over found lexical item docs."""
+
+    def __init__(self, docs: List[Dict[str, Any]]) -> None:
+        self._docs = docs
+
+    def sort(self, keys: List[Tuple[str, int]]) -> None:
+        for key, direction in reversed(keys):
+            self._docs.sort(key=lambda d: d[key], reverse=direction < 0)
+
+    def __iter__(self):
+        return iter(self._docs)
+
+
+class FakeFliCollection(object):
+    """Minimal in-memory stand-in for the found lexical item collection."""
+
+    def __init__(self, docs: List[Dict[str, Any]]) -> None:
+        self.docs = docs
+
+    def find(
+        self, query: Dict[str, Any], projection: Dict[str, int]
+    ) -> FakeFliCursor:
+        fields = [k for k, v in projection.items() if v]
+        return FakeFliCursor([
+            {k: copy.deepcopy(doc[k]) for k in fields}
+            for doc in self.docs if matches_filter(doc, query)
+        ])
+
+
+def make_fli_doc(article_oid: ObjectId, base_form: str, score: int) -> dict:
+    """Make a found lexical item doc as read for a page of postings."""
+    return {
+        'article_oid': article_oid,
+        'base_form': base_form,
+        'found_positions': [{'index': score, 'len': len(base_form)}],
+        SCORE_FIELD: score,
+    }
+
+
+def test_get_article_docs_from_postings_missing_fli(monkeypatch):
+    article_oids = [ObjectId() for _ in range(3)]
+    postings = [
+        {
+            'article_oid': article_oids[0], 'score': 300,
+            'base_forms': ['食べる', '食う'],
+        },
+        {'article_oid': article_oids[1], 'score': 200, 'base_forms': ['食う']},
+        {'article_oid': article_oids[2], 'score': 100, 'base_forms': ['食う']},
+    ]
+    fli_docs = [
+        make_fli_doc(article_oids[0], '食う', 300),
+        make_fli_doc(article_oids[2], '食う', 100),
+    ]
+
+    searcher = ArticleIndexSearcher.__new__(ArticleIndexSearcher)
+    searcher._db = ArticleIndexDb
+    monkeypatch.setattr(
+        searcher, '_get_posting_fli_cursor', Mock(return_value=fli_docs)
+    )
+    docs = searcher._get_article_docs_from_postings(
+        Query(query_str='食う', query_type=QueryType.EXACT, page_num=1),
+        postings
+    )
+
+    assert [doc['article_oid'] for doc in docs] == [
+        article_oids[0], article_oids[2]
+    ]
+    assert docs[0]['matched_base_forms'] == ['食う']
+    assert docs[0]['found_positions'] == fli_docs[0]['found_positions']
+    assert docs[0]['quality_score'] == 300
+
+
+def make_ranked_fli_doc(
+    article_oid: ObjectId, last_updated_datetime: datetime, score: int
+) -> dict:
+    """Make a found lexical item doc for a query with its rank key fields."""
+    return {
+        **make_fli_doc(article_oid, '食う', score),
+        QUERY_FIELD: '食う',
+        'article_last_updated_datetime': last_updated_datetime,
+    }
+
+
+def make_fli_searcher(fli_docs: List[dict]) -> ArticleIndexSearcher:
+    """Make a searcher that reads from fake found lexical items."""
+    searcher = ArticleIndexSearcher.__new__(ArticleIndexSearcher)
+    searcher._db = Mock(
+        QUERY_TYPE_QUERY_FIELD_MAP=ArticleIndexDb.QUERY_TYPE_QUERY_FIELD_MAP,
+        QUERY_TYPE_SCORE_FIELD_MAP=ArticleIndexDb.QUERY_TYPE_SCORE_FIELD_MAP,
+        found_lexical_item_collection=FakeFliCollection(fli_docs)
+    )
+    return searcher
+
+
+def test_serialize_rank_key():
+    rank_key = ArticleRankKey(
+        -12, datetime(2020, 1, 2, 3, 4, 5, 678901), str(ObjectId())
+    )
+    buffer = serialize.serialize_rank_key(rank_key)
+    assert serialize.deserialize_rank_key(buffer) == rank_key
+
+
+def test_get_seek_filter():
+    after_oid = ObjectId()
+    after_datetime = datetime(2020, 1, 9, 12, 30, 0, 500)
+    after_rank_key = ArticleRankKey(200, after_datetime, str(after_oid))
+    fli_docs = [
+        make_ranked_fli_doc(oid, dt, score)
+        for score in [199, 200, 201]
+        for dt in [after_datetime - timedelta(microseconds=1), after_datetime]
+        for oid in [ObjectId(), after_oid]
+    ]
+
+    searcher = make_fli_searcher(fli_docs)
+    seek_filter = searcher._get_seek_filter(SCORE_FIELD, after_rank_key)
+
+    # Only docs with a lower rank key than the after rank key match.
+    after_key_tuple = (200, after_datetime, after_oid)
+    assert [d for d in fli_docs if matches_filter(d, seek_filter)] == [
+        d for d in fli_docs
+        if searcher._get_fli_rank_key(d, SCORE_FIELD) < after_key_tuple
+    ]
+
+
+def test_seek_page_matches_offset_page(monkeypatch):
+    monkeypatch.setattr(index_search, 'SEARCH_RESULTS_PAGE_SIZE', 2)
+    oids = sorted(ObjectId() for _ in range(7))
+    dt = datetime(2020, 1, 9, 12, 30, 0, 500)
+    older_dt = dt - timedelta(microseconds=1)
+
+    # Article 0 has found lexical items with different scores next to each
+    # other in ranked order at the end of the first page, and the found
+    # lexical items of article 4 are split by article 5.
+    fli_docs = [
+        make_ranked_fli_doc(oids[6], dt, 400),
+        make_ranked_fli_doc(oids[0], dt, 300),
+        make_ranked_fli_doc(oids[0], dt, 250),
+        make_ranked_fli_doc(oids[1], dt, 200),
+        make_ranked_fli_doc(oids[2], older_dt, 200),
+        make_ranked_fli_doc(oids[3], dt, 150),
+        make_ranked_fli_doc(oids[4], dt, 120),
+        make_ranked_fli_doc(oids[5], dt, 110),
+        make_ranked_fli_doc(oids[4], dt, 100),
+    ]
+    oid_datetime_map = {d['article_oid']: d['article_last_updated_datetime']
+                        for d in fli_docs}
+    searcher = make_fli_searcher(fli_docs)
+
+    offset_pages = []
+    for page_num in range(1, 6):
+        offset_pages.append(
+            searcher._get_article_docs_from_found_lexical_items(
+                Query('食う', page_num), (page_num - 1) * 2
+            )
+        )
+    assert [[d['article_oid'] for d in page] for page in offset_pages] == [
+        [oids[6], oids[0]], [oids[1], oids[2]], [oids[3], oids[4]],
+        [oids[5], oids[4]], []
+    ]
+    assert offset_pages[0][1]['matched_base_forms'] == ['食う', '食う']
+
+    # Each page read by seeking past the serialized rank key of the last
+    # search result of the previous page is the same as the page read by
+    # offset.
+    for page_num in range(2, 6):
+        last_doc = offset_pages[page_num - 2][-1]
+        rank_key = ArticleRankKey(
+            last_doc['quality_score'],
+            oid_datetime_map[last_doc['article_oid']],
+            str(last_doc['article_oid'])
+        )
+        after_rank_key = serialize.deserialize_rank_key(
+            serialize.serialize_rank_key(rank_key)
+        )
+        seek_page = searcher._get_article_docs_from_found_lexical_items(
+            Query('食う', page_num, after_rank_key=after_rank_key),
+            (page_num - 1) * 2
+        )
+        assert seek_page == offset_pages[page_num - 1]
@@ -0,0 +1,730 @@
+"""Tests for the Japanese text analysis objects in myaku.japanese_analysis."""
+
+import hashlib
+import inspect
+import os
+import struct
+from typing import List, NamedTuple, Optional, Tuple
+from xml.etree import ElementTree
+
+import MeCab
+import pytest
+
+import myaku
+from myaku import japanese_analysis
+from myaku.datatypes import (
+    ArticleTextPosition,
+    FoundJpnLexicalItem,
+    InterpSource,
+    JpnArticle,
+    JpnLexicalItemInterp,
+)
+from myaku.errors import EnvironmentNotSetError, ResourceLoadError
+from myaku.japanese_analysis import (
+    JapaneseTextAnalyzer,
+    JMdict,
+    JMdictEntry,
+    JMdictIndex,
+    JMdictXmlEntryInfo,
+    MecabTagger,
+    ParseCacheCounts,
+    SortedPrefixTrie,
+)
+from myaku.sample_text import SAMPLE_TEXT
+
+TRIE_STR_KEYS = ['桜', '桜の森', '桜の花', '花', '花びら', '花見']
+TRIE_TUPLE_KEYS = [('桜', 'の', '森'), ('桜', 'の', '花'), ('花', 'びら')]
+
+# Edge case texts for comparing the MeCab chasen and node output parsing.
+MECAB_EDGE_TEXTS = [
+    '',
+    '！？。、…「」（）',
+    '"引用",と\'記号\'',
+    'ぴえんｗｗｗ　ｸﾞﾛｰﾊﾞﾙ　Ｘｙｚｚｙ　ほげぴよ',
+    '  前後に 空白が　ある  ',
+]
+
+# Small JMdict XML file with the same structure as the full JMdict XML file.
+JMDICT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE JMdict [
+<!ENTITY n "noun (common) (futsuumeishi)">
+<!ENTITY exp "expressions (phrases, clauses, etc.)">
+<!ENTITY uk "word usually written using kana alone">
+<!ENTITY v1 "Ichidan verb">
+]>
+<JMdict>
+<entry>
+<ent_seq>1000010</ent_seq>
+<k_ele><keb>桜</keb><ke_pri>news1</ke_pri></k_ele>
+<r_ele><reb>さくら</reb><re_pri>news1</re_pri></r_ele>
+<sense><pos>&n;</pos><gloss>cherry blossom</gloss></sense>
+</entry>
+<entry>
+<ent_seq>1000020</ent_seq>
+<k_ele><keb>桜の花</keb></k_ele>
+<r_ele><reb>さくらのはな</reb></r_ele>
+<sense><pos>&n;</pos><pos>&exp;</pos><gloss>cherry blossom</gloss></sense>
+</entry>
+<entry>
+<ent_seq>1000030</ent_seq>
+<k_ele><keb>食べる</keb></k_ele>
+<r_ele><reb>たべる</reb></r_ele>
+<sense><pos>&v1;</pos><misc>&uk;</misc><gloss>to eat</gloss></sense>
+</entry>
+<entry>
+<ent_seq>1000040</ent_seq>
+<r_ele><reb>さくら</reb></r_ele>
+<sense><pos>&n;</pos><gloss>shill</gloss></sense>
+</entry>
+</JMdict>
+"""
+
+# Canned MeCab ipadic output for a text with white space skipped by MeCab, an
+# unknown word, and a known problem tag adjustment.
+CANNED_MECAB_TEXT = '今日は\u3000良い天気な日。 ＡＢＣｘｙｚだ'
+CANNED_MECAB_CHASEN_OUTPUT = (
+    '今日\tキョウ\t今日\t名詞-副詞可能\t\t\n'
+    'は\tハ\tは\t助詞-係助詞\t\t\n'
+    '\u3000\t\u3000\t\u3000\t記号-空白\t\t\n'
+    '良い\tヨイ\t良い\t形容詞-自立\t形容詞・アウオ段\t基本形\n'
+    '天気\tテンキ\t天気\t名詞-一般\t\t\n'
+    'な\tナ\tだ\t助動詞\t特殊・ダ\t体言接続\n'
+    '日\tヒ\t日\t名詞-非自立-副詞可能\t\t\n'
+    '。\t。\t。\t記号-句点\t\t\n'
+    'ＡＢＣｘｙｚ\tＡＢＣｘｙｚ\tＡＢＣｘｙｚ\t名詞-一般\t\t\n'
+    'だ\tダ\tだ\t助動詞\t特殊・ダ\t基本形\n'
+    'EOS\n'
+)
+# (stat, surface, length, rlength, feature) of each node given by MeCab.
+CANNED_MECAB_NODES = [
+    (MeCab.MECAB_BOS_NODE, '', 0, 0, 'BOS/EOS,*,*,*,*,*,*,*,*'),
+    (
+        MeCab.MECAB_NOR_NODE, '今日', 6, 6,
+        '名詞,副詞可能,*,*,*,*,今日,キョウ,キョー'
+    ),
+    (MeCab.MECAB_NOR_NODE, 'は', 3, 3, '助詞,係助詞,*,*,*,*,は,ハ,ワ'),
+    (
+        MeCab.MECAB_NOR_NODE, '\u3000', 3, 3,
+        '記号,空白,*,*,*,*,\u3000,\u3000,\u3000'
+    ),
+    (
+        MeCab.MECAB_NOR_NODE, '良い', 6, 6,
+        '形容詞,自立,*,*,形容詞・アウオ段,基本形,良い,ヨイ,ヨイ'
+    ),
+    (MeCab.MECAB_NOR_NODE, '天気', 6, 6, '名詞,一般,*,*,*,*,天気,テンキ,テンキ'),
+    (MeCab.MECAB_NOR_NODE, 'な', 3, 3, '助動詞,*,*,*,特殊・ダ,体言接続,だ,ナ,ナ'),
+    (MeCab.MECAB_NOR_NODE, '日', 3, 3, '名詞,非自立,副詞可能,*,*,*,日,ヒ,ヒ'),
+    (MeCab.MECAB_NOR_NODE, '。', 3, 3, '記号,句点,*,*,*,*,。,。,。'),
+    (MeCab.MECAB_UNK_NODE, 'ＡＢＣｘｙｚ', 18, 19, '名詞,一般,*,*,*,*,*'),
+    (MeCab.MECAB_NOR_NODE, 'だ', 3, 3, '助動詞,*,*,*,特殊・ダ,基本形,だ,ダ,ダ'),
+    (MeCab.MECAB_EOS_NODE, '', 0, 0, 'BOS/EOS,*,*,*,*,*,*,*,*'),
+]
+
+
+class FakeMecabNode(NamedTuple):
+    """Stand-in for a MeCab node with the attributes used by MecabTagger."""
+    stat: int
+    surface: str
+    length: int
+    rlength: int
+    feature: str
+    next: Optional['FakeMecabNode']
+
+
+class FakeMecab(object):
+    """Stand-in for a MeCab tagger that gives canned output for one text."""
+
+    def parse(self, text: str) -> str:
+        assert text == CANNED_MECAB_TEXT
+        return CANNED_MECAB_CHASEN_OUTPUT
+
+    def parseToNode(self, text: str) -> Optional[FakeMecabNode]:
+        assert text == CANNED_MECAB_TEXT
+        node: Optional[FakeMecabNode] = None
+        for stat, surface, length, rlength, feature in reversed(
+            CANNED_MECAB_NODES
+        ):
+            node = FakeMecabNode(stat, surface, length, rlength, feature, node)
+        return node
+
+
+def make_fake_mecab_tagger(monkeypatch, use_node_output: bool) -> MecabTagger:
+    """Make a new MecabTagger that uses FakeMecab instead of MeCab."""
+    monkeypatch.setattr(MeCab, 'Tagger', lambda args: FakeMecab())
+    return inspect.unwrap(MecabTagger)(
+        use_default_ipadic=True, use_node_output=use_node_output
+    )
+
+
+def walk_trie(trie, key_parts):
+    """Walk the trie from its root using the given key parts.
+
+    Returns:
+        The node reached after walking all of the key parts, or None if the
+        walk reached a prefix of no key in the trie.
+    """
+    node = trie.root
+    for part in key_parts:
+        node = trie.get_child(node, part)
+        if node is None:
+            return None
+    return node
+
+
+def test_sorted_prefix_trie_str_keys():
+    """Test SortedPrefixTrie prefix and key checks with str keys."""
+    trie = SortedPrefixTrie(TRIE_STR_KEYS, '', '\U0010ffff')
+    assert len(trie) == len(TRIE_STR_KEYS)
+
+    node = walk_trie(trie, ['桜'])
+    assert node is not None and trie.is_key(node)
+    assert node.end - node.start == 3
+
+    node = walk_trie(trie, ['桜', 'の'])
+    assert node is not None and not trie.is_key(node)
+
+    node = walk_trie(trie, ['桜', 'の森'])
+    assert node is not None and trie.is_key(node)
+    assert node.prefix == '桜の森'
+
+    assert walk_trie(trie, ['桜', 'の', '木']) is None
+    assert walk_trie(trie, ['森']) is None
+    assert walk_trie(trie, ['桜の森', 'の']) is None
+
+
+def test_sorted_prefix_trie_tuple_keys():
+    """Test SortedPrefixTrie prefix and key checks with tuple keys."""
+    trie = SortedPrefixTrie(TRIE_TUPLE_KEYS, (), ('\U0010ffff',))
+
+    node = walk_trie(trie, [('桜',), ('の',)])
+    assert node is not None and not trie.is_key(node)
+    assert node.end - node.start == 2
+
+    node = walk_trie(trie, [('花',), ('びら',)])
+    assert node is not None and trie.is_key(node)
+
+    # Tuple keys are matched element by element, so a partial element does
+    # not match.
+    assert walk_trie(trie, [('花',), ('び',)]) is None
+    assert walk_trie(trie, [('桜の',)]) is None
+
+
+def test_jmdict_index_write_and_lookup(tmp_path):
+    """Test JMdictIndex lookups give the entries written to the index."""
+    entries = [
+        JMdictEntry(
+            '1000010', '桜', None, ('news1',), ('n',), None, None, None
+        ),
+        JMdictEntry(
+            '1000010', 'さくら', None, ('news1',), ('n',), None, None, None
+        ),
+        JMdictEntry(
+            '1000020', '桜の花', ('ateji',), None, ('n', 'exp'), ('bot',),
+            ('ksb',), ('uk',)
+        ),
+        JMdictEntry(
+            '1000030', 'さくら', None, None, ('n',), None, None, ('sl',)
+        ),
+    ]
+    mecab_decomps = [('桜',), ('さくら',), ('桜', 'の', '花'), ('さくら',)]
+    index_path = str(tmp_path / 'JMdict.index')
+    xml_entry_infos = [
+        JMdictXmlEntryInfo('1000010', 11, 2),
+        JMdictXmlEntryInfo('1000020', 22, 1),
+        JMdictXmlEntryInfo('1000030', 33, 1),
+    ]
+    JMdictIndex.write(
+        index_path, entries, mecab_decomps, xml_entry_infos, '2020.01.09'
+    )
+
+    index = JMdictIndex(index_path)
+    assert len(index) == len(entries)
+    assert index.max_text_form_len == 3
+    assert index.max_mecab_decomp_len == 3
+    # Only the key strings are decoded when the index is opened.
+    assert index.memory_stats()['string_decoded_count'] == 5
+    assert list(index.text_form_keys) == ['さくら', '桜', '桜の花']
+    assert (
+        list(index.mecab_decomp_keys)
+        == [('さくら',), ('桜',), ('桜', 'の', '花')]
+    )
+
+    assert index.get_text_form_entries('桜') == [entries[0]]
+    assert index.get_text_form_entries('さくら') == [entries[1], entries[3]]
+    assert index.get_text_form_entries('桜の') == []
+    assert index.get_mecab_decomp_entries(('桜', 'の', '花')) == [entries[2]]
+    assert index.get_mecab_decomp_entries(('桜', 'の')) == []
+
+    assert index.decomp_version == '2020.01.09'
+    assert index.get_xml_entry_hashes() == {
+        '1000010': (11, 0), '1000020': (22, 1), '1000030': (33, 2)
+    }
+    assert index.get_xml_entry_data(0) == (entries[:2], mecab_decomps[:2])
+    assert index.get_xml_entry_data(2) == ([entries[3]], [mecab_decomps[3]])
+
+    # Each string is decoded to a single str object shared by the keys.
+    assert index.mecab_decomp_keys[1][0] is index.text_form_keys[1]
+
+    # Equal tuples are decoded to a single shared tuple object.
+    sakura_kanji_entry = index.get_text_form_entries('桜')[0]
+    sakura_kana_entry = index.get_text_form_entries('さくら')[0]
+    assert sakura_kanji_entry.text_form_freq is (
+        sakura_kana_entry.text_form_freq
+    )
+
+    memory_stats = index.memory_stats()
+    assert memory_stats['index_file_bytes'] > 0
+    assert memory_stats['entry_cache_count'] == 4
+    assert memory_stats['tuple_cache_count'] == 8
+
+
+def bump_index_version(index_path: str) -> None:
+    """Change the format version in the header of an index file."""
+    with open(index_path, 'r+b') as index_file:
+        index_file.seek(8)
+        version = struct.unpack('=I', index_file.read(4))[0]
+        index_file.seek(8)
+        index_file.write(struct.pack('=I', version - 1))
+
+
+def truncate_index(index_path: str) -> None:
+    """Remove the end of the last section of an index file."""
+    os.truncate(index_path, os.path.getsize(index_path) - 1)
+
+
+def empty_index(index_path: str) -> None:
+    """Remove all of the data from an index file."""
+    os.truncate(index_path, 0)
+
+
+@pytest.mark.parametrize(
+    'break_index', [bump_index_version, truncate_index, empty_index]
+)
+def test_jmdict_index_invalid_file(tmp_path, monkeypatch, break_index):
+    """Test invalid JMdict index files are not loaded."""
+    monkeypatch.setenv(myaku.APP_DATA_DIR_ENV_VAR, str(tmp_path))
+    jmdict_cls = inspect.unwrap(JMdict)
+    jmdict = jmdict_cls.__new__(jmdict_cls)
+    index_path = jmdict._get_index_filepath()
+    JMdictIndex.write(
+        index_path, [JMdictEntry('1000010', '桜')], [('桜',)],
+        [JMdictXmlEntryInfo('1000010', 11, 1)], '2020.01.09'
+    )
+    assert len(JMdictIndex(index_path)) == 1
+
+    break_index(index_path)
+    with pytest.raises(ResourceLoadError):
+        JMdictIndex(index_path)
+
+    # JMdict rebuilds its index instead of loading an invalid one.
+    assert jmdict._load_index_if_newer(0) is False
+
+
+def fake_decompose_text_form_chunk(
+    text_forms: List[str]
+) -> List[Tuple[str, ...]]:
+    """Decompose each text form into its characters without MeCab."""
+    return [tuple(text_form) for text_form in text_forms]
+
+
+@pytest.fixture
+def jmdict_xml_path(tmp_path, monkeypatch) -> str:
+    """Write the small JMdict XML file and set up building an index from it.
+
+    The text forms are decomposed by fake_decompose_text_form_chunk instead of
+    MeCab, and the index is written to the given tmp path.
+    """
+    monkeypatch.setenv(myaku.APP_DATA_DIR_ENV_VAR, str(tmp_path))
+    monkeypatch.setattr(
+        japanese_analysis, '_get_mecab_decomp_version',
+        lambda: 'MeCab 0.996 ipadic-NEologd 2020.01.09'
+    )
+    monkeypatch.setattr(
+        japanese_analysis, '_decompose_text_form_chunk',
+        fake_decompose_text_form_chunk
+    )
+
+    xml_path = tmp_path / 'JMdict_e.xml'
+    xml_path.write_text(JMDICT_XML, encoding='utf-8')
+    return str(xml_path)
+
+
+def build_jmdict_index(xml_path: str) -> bytes:
+    """Build a new JMdict index from the XML file and return its content.
+
+    The XML file is made newer than any existing index so that the index is
+    rebuilt instead of loaded.
+    """
+    jmdict = inspect.unwrap(JMdict)()
+    index_path = jmdict._get_index_filepath()
+    if os.path.exists(index_path):
+        index_mtime = os.path.getmtime(index_path)
+        os.utime(xml_path, (index_mtime + 1, index_mtime + 1))
+
+    jmdict.load_jmdict(xml_path)
+    with open(index_path, 'rb') as index_file:
+        return index_file.read()
+
+
+def test_jmdict_streamed_build_matches_full_parse(jmdict_xml_path):
+    """Test streaming the XML entries gives the entries of a full parse."""
+    build_jmdict_index(jmdict_xml_path)
+    jmdict = inspect.unwrap(JMdict)()
+    index = JMdictIndex(jmdict._get_index_filepath())
+
+    entry_elements = ElementTree.parse(jmdict_xml_path).getroot().findall(
+        'entry'
+    )
+    assert len(index.get_xml_entry_hashes()) == len(entry_elements)
+    for i, entry_element in enumerate(entry_elements):
+        entries = jmdict._parse_entry_xml(entry_element)
+        assert index.get_xml_entry_data(i) == (
+            entries,
+            fake_decompose_text_form_chunk(
+                [entry.text_form for entry in entries]
+            )
+        )
+
+
+def test_jmdict_incremental_build_reuse(jmdict_xml_path, monkeypatch):
+    """Test incremental builds only reuse data for the same versions."""
+    decomposed_text_forms = []
+
+    def record_decompose_text_form_chunk(text_forms):
+        decomposed_text_forms.extend(text_forms)
+        return fake_decompose_text_form_chunk(text_forms)
+    monkeypatch.setattr(
+        japanese_analysis, '_decompose_text_form_chunk',
+        record_decompose_text_form_chunk
+    )
+    monkeypatch.setenv(
+        japanese_analysis._JMDICT_INCREMENTAL_BUILD_ENV_VAR, '1'
+    )
+
+    full_index = build_jmdict_index(jmdict_xml_path)
+    assert len(decomposed_text_forms) == 6
+
+    decomposed_text_forms.clear()
+    assert build_jmdict_index(jmdict_xml_path) == full_index
+    assert decomposed_text_forms == []
+
+    # The entries are still reused with a new MeCab version, but the
+    # decompositions are redone.
+    monkeypatch.setattr(
+        japanese_analysis, '_get_mecab_decomp_version',
+        lambda: 'MeCab 0.996.2 ipadic-NEologd 2020.01.09'
+    )
+    build_jmdict_index(jmdict_xml_path)
+    assert len(decomposed_text_forms) == 6
+
+
+def test_jmdict_entry_hash_includes_format_version(monkeypatch):
+    """Test the XML entry hash changes with the index format version."""
+    jmdict = inspect.unwrap(JMdict)()
+    entry_element = ElementTree.fromstring(
+        '<entry><ent_seq>1000040</ent_seq>'
+        '<r_ele><reb>さくら</reb></r_ele></entry>'
+    )
+    entry_hash = jmdict._hash_entry_xml(entry_element)
+    assert jmdict._hash_entry_xml(entry_element) == entry_hash
+
+    monkeypatch.setattr(
+        JMdictIndex, '_FORMAT_VERSION', JMdictIndex._FORMAT_VERSION + 1
+    )
+    assert jmdict._hash_entry_xml(entry_element) != entry_hash
+
+
+def test_jmdict_parallel_build_matches_serial(jmdict_xml_path, monkeypatch):
+    """Test decomposing in worker processes gives the same index."""
+    monkeypatch.setattr(inspect.unwrap(JMdict), '_DECOMP_CHUNK_SIZE', 2)
+    monkeypatch.setenv(japanese_analysis._JMDICT_DECOMP_WORKERS_ENV_VAR, '1')
+    serial_index = build_jmdict_index(jmdict_xml_path)
+
+    monkeypatch.setenv(japanese_analysis._JMDICT_DECOMP_WORKERS_ENV_VAR, '3')
+    assert build_jmdict_index(jmdict_xml_path) == serial_index
+
+
+def test_jmdict_cached_build_matches_serial(jmdict_xml_path, monkeypatch):
+    """Test building with the decomposition cache gives the same index."""
+    serial_index = build_jmdict_index(jmdict_xml_path)
+
+    monkeypatch.setenv(japanese_analysis._JMDICT_DECOMP_CACHE_ENV_VAR, '1')
+    assert build_jmdict_index(jmdict_xml_path) == serial_index
+
+    # Every text form is in the cache now, so none are decomposed again.
+    monkeypatch.setattr(
+        japanese_analysis, '_decompose_text_form_chunk', None
+    )
+    assert build_jmdict_index(jmdict_xml_path) == serial_index
+
+
+def test_jmdict_decomp_cache_invalid_file(jmdict_xml_path):
+    """Test an invalid decomposition cache file is not used."""
+    jmdict = inspect.unwrap(JMdict)()
+    with open(jmdict._get_decomp_cache_filepath(), 'wb') as cache_file:
+        cache_file.write(b'not a shelf')
+
+    assert jmdict._read_decomp_cache('2020.01.09') == {}
+
+
+def test_jmdict_entry_slots():
+    """Test JMdictEntry uses slots and defaults unset fields to None."""
+    entry = JMdictEntry('1000010', '桜')
+    assert not hasattr(entry, '__dict__')
+    assert entry.parts_of_speech is None
+    assert entry == JMdictEntry('1000010', '桜', None, None, None)
+
+
+def find_fake_blocks_lexical_items(text_blocks, article):
+    """Find a lexical item for each character of the blocks without MeCab."""
+    blocks_lexical_items = []
+    block_offset = 0
+    for text_block in text_blocks:
+        blocks_lexical_items.append([
+            FoundJpnLexicalItem(
+                base_form=char, article=article,
+                found_positions=[ArticleTextPosition(block_offset + i, 1)],
+                possible_interps=[JpnLexicalItemInterp((InterpSource.MECAB,))]
+            )
+            for i, char in enumerate(text_block)
+        ])
+        block_offset += len(text_block) + 1
+    return blocks_lexical_items
+
+
+def make_fake_text_analyzer(monkeypatch, parse_cache_size: Optional[str]):
+    """Make a new JapaneseTextAnalyzer that doesn't use JMdict or MeCab.
+
+    Returns:
+        The analyzer and a list that each text block it analyzes is added to.
+    """
+    if parse_cache_size is None:
+        monkeypatch.delenv(
+            japanese_analysis._PARSE_CACHE_SIZE_ENV_VAR, raising=False
+        )
+    else:
+        monkeypatch.setenv(
+            japanese_analysis._PARSE_CACHE_SIZE_ENV_VAR, parse_cache_size
+        )
+    monkeypatch.setenv(
+        japanese_analysis._JMDICT_XML_FILEPATH_ENV_VAR, 'JMdict_e.xml'
+    )
+    monkeypatch.setattr(japanese_analysis, 'JMdict', lambda filepath: None)
+    monkeypatch.setattr(japanese_analysis, 'MecabTagger', lambda: None)
+
+    analyzer_cls = inspect.unwrap(JapaneseTextAnalyzer)
+    monkeypatch.setattr(
+        analyzer_cls, '_get_parse_cache_key_base_hash',
+        lambda self: hashlib.blake2b(b'versions', digest_size=16)
+    )
+    analyzer = analyzer_cls()
+
+    analyzed_blocks = []
+
+    def find_blocks_lexical_items(text_blocks, article):
+        analyzed_blocks.extend(text_blocks)
+        return find_fake_blocks_lexical_items(text_blocks, article)
+    monkeypatch.setattr(
+        analyzer, '_find_blocks_lexical_items', find_blocks_lexical_items
+    )
+    return analyzer, analyzed_blocks
+
+
+def fli_key(fli):
+    """Get a key with the found data of a found lexical item."""
+    return (
+        fli.base_form, id(fli.article), sorted(fli.found_positions),
+        fli.possible_interps
+    )
+
+
+def test_parse_cache_hits_and_misses(monkeypatch):
+    """Test cache hits give the same items as analysis for each article."""
+    uncached_analyzer, _ = make_fake_text_analyzer(monkeypatch, None)
+    analyzer, analyzed_blocks = make_fake_text_analyzer(monkeypatch, '10')
+    assert uncached_analyzer.parse_cache_counts == ParseCacheCounts(0, 0)
+
+    articles = [
+        JpnArticle(full_text='あい\nうえ\nあい'),
+        JpnArticle(full_text='うえ\n\nおか'),
+    ]
+    expected_counts = [ParseCacheCounts(1, 2), ParseCacheCounts(2, 3)]
+    expected_analyzed_blocks = [['あい', 'うえ'], ['あい', 'うえ', 'おか']]
+    for article, counts, blocks in zip(
+        articles, expected_counts, expected_analyzed_blocks
+    ):
+        flis = analyzer.find_article_lexical_items(article)
+        uncached_flis = uncached_analyzer.find_article_lexical_items(article)
+
+        # The items from cache hits are bound to the article being analyzed
+        # at the positions of the blocks in that article.
+        assert all(fli.article is article for fli in flis)
+        assert (
+            sorted(map(fli_key, flis)) == sorted(map(fli_key, uncached_flis))
+        )
+        assert analyzer.parse_cache_counts == counts
+        assert analyzed_blocks == blocks
+
+    assert [
+        (fli.base_form, fli.found_positions) for fli in flis
+        if fli.base_form in {'う', 'お'}
+    ] == [('う', [(0, 1)]), ('お', [(4, 1)])]
+
+
+def test_parse_cache_eviction(monkeypatch):
+    """Test the parse cache evicts the least recently used text block."""
+    analyzer, analyzed_blocks = make_fake_text_analyzer(monkeypatch, '2')
+    for text in ['あい', 'うえ', 'あい', 'おか', 'あい', 'うえ']:
+        analyzer.find_article_lexical_items(JpnArticle(full_text=text))
+
+    assert analyzed_blocks == ['あい', 'うえ', 'おか', 'うえ']
+    assert analyzer.parse_cache_counts == ParseCacheCounts(2, 4)
+
+
+@pytest.mark.parametrize('parse_cache_size', ['0', '-1', 'abc'])
+def test_parse_cache_size_invalid(monkeypatch, parse_cache_size):
+    """Test an invalid parse cache size env var fails analyzer init."""
+    with pytest.raises(EnvironmentNotSetError):
+        make_fake_text_analyzer(monkeypatch, parse_cache_size)
+
+
+def mecab_fli_key(fli):
+    """Get a comparable key for the data of a MeCab found lexical item."""
+    return (fli.base_form, fli.found_positions, fli.possible_interps)
+
+
+def test_mecab_tagger_node_output_matches_chasen_output():
+    """Test the node and chasen output parsing give the same flis."""
+    try:
+        chasen_tagger = MecabTagger(use_default_ipadic=True)
+        node_tagger = MecabTagger(
+            use_default_ipadic=True, use_node_output=True
+        )
+    except RuntimeError:
+        pytest.skip('MeCab ipadic dictionary is not installed')
+
+    for text in [SAMPLE_TEXT] + MECAB_EDGE_TEXTS:
+        chasen_flis = chasen_tagger.parse(text, 10)
+        node_flis = node_tagger.parse(text, 10)
+        assert (
+            list(map(mecab_fli_key, node_flis))
+            == list(map(mecab_fli_key, chasen_flis))
+        )
+
+    text_blocks = SAMPLE_TEXT.splitlines() + MECAB_EDGE_TEXTS
+    chasen_blocks_flis = chasen_tagger.parse_blocks(text_blocks)
+    node_blocks_flis = node_tagger.parse_blocks(text_blocks)
+    assert len(node_blocks_flis) == len(chasen_blocks_flis)
+    for node_flis, chasen_flis in zip(node_blocks_flis, chasen_blocks_flis):
+        assert (
+            list(map(mecab_fli_key, node_flis))
+            == list(map(mecab_fli_key, chasen_flis))
+        )
+
+
+def test_mecab_tagger_node_output_matches_chasen_output_canned(monkeypatch):
+    """Test node and chasen output parsing match using canned MeCab output."""
+    chasen_tagger = make_fake_mecab_tagger(monkeypatch, False)
+    node_tagger = make_fake_mecab_tagger(monkeypatch, True)
+
+    chasen_flis = chasen_tagger.parse(CANNED_MECAB_TEXT, 10)
+    assert len(chasen_flis) == 10
+    assert chasen_flis[5].base_form == 'な'
+    assert chasen_flis[8].found_positions[0].start == 10 + 12
+    for _ in range(2):
+        node_flis = node_tagger.parse(CANNED_MECAB_TEXT, 10)
+        assert (
+            list(map(mecab_fli_key, node_flis))
+            == list(map(mecab_fli_key, chasen_flis))
+        )
+
+
+def test_mecab_tagger_node_tags_cache_lru(monkeypatch):
+    """Test the node tags cache evicts the least recently used node."""
+    monkeypatch.setattr(
+        inspect.unwrap(MecabTagger), '_MAX_NODE_TAGS_CACHE_SIZE', 2
+    )
+    tagger = make_fake_mecab_tagger(monkeypatch, True)
+    keys = [
+        (surface, feature, stat)
+        for stat, surface, _, _, feature in CANNED_MECAB_NODES[1:4]
+    ]
+
+    tags = tagger._get_cached_node_tags(keys[0])
+    tagger._get_cached_node_tags(keys[1])
+    assert tagger._get_cached_node_tags(keys[0]) is tags
+    tagger._get_cached_node_tags(keys[2])
+    assert list(tagger._node_tags_cache) == [keys[0], keys[2]]
+
+
+def test_resource_manifest_read_and_stale(tmp_path, monkeypatch):
+    """Test the resource versions are only probed if the manifest is stale."""
+    jmdict_xml_path = tmp_path / 'JMdict_e.xml'
+    jmdict_xml_path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<!-- JMdict created: 2020-01-09 -->\n'
+    )
+    changelog_path = tmp_path / 'ChangeLog'
+    changelog_path.write_text('# Release 20200109-01\n')
+    monkeypatch.setenv('JMDICT_XML_FILEPATH', str(jmdict_xml_path))
+    monkeypatch.setenv('IPADIC_NEOLOGD_GIT_DIR', str(tmp_path))
+    monkeypatch.setenv(myaku.APP_DATA_DIR_ENV_VAR, str(tmp_path))
+
+    # The fake mecab-config is only used for its last modified time.
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    mecab_config_path = bin_dir / 'mecab-config'
+    mecab_config_path.write_text('#!/bin/sh\n')
+    mecab_config_path.chmod(0o755)
+    monkeypatch.setenv(
+        'PATH', os.pathsep.join([str(bin_dir), os.environ.get('PATH', '')])
+    )
+    dicdir_path = tmp_path / 'dic'
+    dicdir_path.mkdir()
+
+    mecab_config_calls = []
+
+    def fake_run_mecab_config(option, error_msg):
+        mecab_config_calls.append(option)
+        return {'--version': '0.996', '--dicdir': str(dicdir_path)}[option]
+
+    monkeypatch.setattr(
+        japanese_analysis, '_run_mecab_config', fake_run_mecab_config
+    )
+
+    expected_versions = {
+        'MeCab': '0.996', 'JMdict': '2020.01.09',
+        'ipadic-NEologd': '2020.01.09',
+    }
+    assert japanese_analysis.get_resource_version_info() == expected_versions
+    assert len(mecab_config_calls) == 2
+    assert os.path.exists(tmp_path / 'resource_manifest.json')
+
+    # Up to date manifest is read without probing.
+    assert japanese_analysis.get_resource_version_info() == expected_versions
+    assert len(mecab_config_calls) == 2
+
+    # Updating a version source makes the manifest stale.
+    changelog_path.write_text('# Release 20200110-01\n')
+    stat = os.stat(changelog_path)
+    os.utime(changelog_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    expected_versions['ipadic-NEologd'] = '2020.01.10'
+    assert japanese_analysis.get_resource_version_info() == expected_versions
+    assert len(mecab_config_calls) == 4
+    assert japanese_analysis.get_resource_version_info() == expected_versions
+    assert len(mecab_config_calls) == 4
+
+    # Reinstalling MeCab or adding a MeCab dictionary also makes the manifest
+    # stale.
+    stat = os.stat(mecab_config_path)
+    os.utime(mecab_config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert japanese_analysis.get_resource_version_info() == expected_versions
+    assert len(mecab_config_calls) == 6
+
+    stat = os.stat(dicdir_path)
+    (dicdir_path / 'ipadic').mkdir()
+    os.utime(dicdir_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert japanese_analysis.get_resource_version_info() == expected_versions
+    assert len(mecab_config_calls) == 8
+    assert japanese_analysis.get_resource_version_info() == expected_versions
+    assert len(mecab_config_calls) == 8
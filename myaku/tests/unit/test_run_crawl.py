@@ -0,0 +1,89 @@
+"""Tests for the crawled article analysis in myaku.runners.run_crawl."""
+
+import multiprocessing
+import os
+
+import pytest
+
+from myaku.datatypes import JpnArticle
+from myaku.errors import EnvironmentNotSetError
+from myaku.japanese_analysis import ParseCacheCounts
+from myaku.runners import run_crawl
+from myaku.runners.run_crawl import (
+    AnalyzedArticle,
+    CrawlArticleAnalyzer,
+    CrawledArticle,
+    CrawlStageSecs,
+)
+
+# The fake analyzer set up in the test process is only used by the analysis
+# workers if they are forked from the test process.
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != 'fork',
+    reason='Analysis workers must be forked to use the fake analyzer'
+)
+
+
+def fake_analyze_article(article, jta, scorer) -> AnalyzedArticle:
+    """Give the analysis results for an article without analyzing it."""
+    article.quality_score = len(article.full_text)
+    return AnalyzedArticle(
+        article, None, 1.0, 2.0, ParseCacheCounts(hits=0, misses=1)
+    )
+
+
+@pytest.fixture
+def fake_analysis(monkeypatch):
+    """Replace the analyzer, scorer, and analysis with fakes."""
+    monkeypatch.setattr(run_crawl, 'JapaneseTextAnalyzer', lambda: None)
+    monkeypatch.setattr(run_crawl, 'MyakuArticleScorer', lambda: None)
+    monkeypatch.setattr(run_crawl, 'analyze_article', fake_analyze_article)
+
+
+def make_crawled_articles(count: int):
+    """Make crawled articles with a different text length for each."""
+    return [
+        CrawledArticle(JpnArticle(full_text='a' * (i + 1)), i + 1,
+                       CrawlStageSecs(crawl=0.5))
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('worker_count', [1, 3])
+def test_analyze_articles(fake_analysis, worker_count):
+    crawled_articles = make_crawled_articles(10)
+    with CrawlArticleAnalyzer(worker_count) as analyzer:
+        results = list(analyzer.analyze_articles(iter(crawled_articles)))
+
+    assert len(results) == len(crawled_articles)
+    for i, (analyzed_article, crawled_article) in enumerate(results):
+        assert crawled_article is crawled_articles[i]
+        assert analyzed_article.article.quality_score == i + 1
+        assert crawled_article.stage_secs == CrawlStageSecs(
+            crawl=0.5, analysis=1.0, scoring=2.0
+        )
+
+
+def test_analyze_articles_init_error_in_parent(monkeypatch):
+    def raise_error():
+        raise EnvironmentNotSetError()
+    monkeypatch.setattr(run_crawl, 'JapaneseTextAnalyzer', raise_error)
+    monkeypatch.setattr(run_crawl, 'MyakuArticleScorer', lambda: None)
+
+    with pytest.raises(EnvironmentNotSetError):
+        CrawlArticleAnalyzer(2)
+
+
+def test_analyze_articles_init_error_in_worker(fake_analysis, monkeypatch):
+    parent_pid = os.getpid()
+
+    def raise_error_in_worker():
+        if os.getpid() != parent_pid:
+            raise EnvironmentNotSetError('worker init failed')
+    monkeypatch.setattr(
+        run_crawl, 'JapaneseTextAnalyzer', raise_error_in_worker
+    )
+
+    with CrawlArticleAnalyzer(2) as analyzer:
+        with pytest.raises(EnvironmentNotSetError, match='worker init failed'):
+            list(analyzer.analyze_articles(make_crawled_articles(5)))
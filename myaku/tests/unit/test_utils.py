@@ -2,6 +2,7 @@
 
 import copy
 import os
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Generic, List, TypeVar
@@ -125,6 +126,7 @@ def assert_sentence_start_ends(text, ends):
         ends: The indexes of the ending character of every sentence in text in
             ascending order.
     """
+    sentence_ends = utils.find_jpn_sentence_ends(text)
     sentence_start = 0
     sentence_end = ends[0]
     end_index = 0
@@ -137,6 +139,12 @@ def assert_sentence_start_ends(text, ends):
 
         assert utils.find_jpn_sentence_start(text, index) == sentence_start
         assert utils.find_jpn_sentence_end(text, index) == sentence_end
+        assert utils.find_jpn_sentence_start(
+            text, index, sentence_ends
+        ) == sentence_start
+        assert utils.find_jpn_sentence_end(
+            text, index, sentence_ends
+        ) == sentence_end
 
 
 def test_find_jpn_setence_start_end_consec_punc():
@@ -221,6 +229,24 @@ def test_get_alnum_count():
     assert utils.get_alnum_count(mixed) == 15
 
 
+def test_get_deep_size():
+    """Test get_deep_size counts shared contained objects once."""
+    shared = 'shared string'
+    container = [shared, (shared, 1), {'key': shared}]
+    expected_size = (
+        sys.getsizeof(container) + sys.getsizeof(shared)
+        + sys.getsizeof(container[1]) + sys.getsizeof(1)
+        + sys.getsizeof(container[2]) + sys.getsizeof('key')
+    )
+    assert utils.get_deep_size(container) == expected_size
+
+    seen_ids = set()
+    assert utils.get_deep_size(shared, seen_ids) == sys.getsizeof(shared)
+    assert utils.get_deep_size(container, seen_ids) == (
+        expected_size - sys.getsizeof(shared)
+    )
+
+
 def test_normalize_char_width():
     """Test normalize_char_width with half and full width chars."""
     all_half_kata = 'ﾃｽﾄﾔｯﾀﾈｫｫ'
@@ -236,6 +262,25 @@ def test_normalize_char_width():
         'widthname14523 あはは オオオ漢字タタタ??!!'
     )
 
+    sound_marks = 'ｶﾞｯﾂﾎﾟｰｽﾞﾞﾟ ｳﾞｧ'
+    assert utils.normalize_char_width(sound_marks) == 'ガッツポーズﾞﾟ ヴァ'
+
+
+def test_normalize_char_width_matches_jaconv():
+    """Test normalize_char_width gives the same output as using jaconv."""
+    strings = [
+        '',
+        'ﾃｽﾄﾔｯﾀﾈｫｫ',
+        'Ｔｅｓｔ０１２３４５６７８９！？',
+        'ｗｉｄｔｈname１45２３　あはは オオオ漢字ﾀﾀﾀ?？！!',
+        'ｶﾞｷﾞｸﾞｹﾞｺﾞﾊﾟﾋﾟﾌﾟﾍﾟﾎﾟｳﾞﾞﾟ｡｢｣､･',
+        ''.join(chr(i) for i in range(0xFF01, 0xFFF0)),
+    ]
+    for string in strings:
+        assert utils.normalize_char_width(string) == (
+            utils._jaconv_normalize_char_width(string)
+        )
+
 
 def test_get_value_from_enviroment_variable_set(monkeypatch):
     """Test get_value_from_env_variable with a set env var."""
@@ -152,6 +152,73 @@ def test_log_and_raise(caplog):
     )
 
 
+class ReprCounter(object):
+    """Object that counts the number of times its repr is generated."""
+
+    def __init__(self) -> None:
+        """Init the repr count to 0."""
+        self.repr_count = 0
+
+    def __repr__(self) -> str:
+        """Increment and return the repr count."""
+        self.repr_count += 1
+        return f'ReprCounter({self.repr_count})'
+
+
+def test_add_debug_logging_debug_enabled(caplog):
+    """Test add_debug_logging logs the call when DEBUG is enabled."""
+    caplog.set_level(logging.DEBUG, logger='myaku')
+    arg = ReprCounter()
+    logged_func = utils.add_debug_logging(lambda x: x)
+
+    assert logged_func(arg) is arg
+    assert arg.repr_count == 2
+    assert len(caplog.records) == 2
+
+
+def test_add_debug_logging_debug_disabled(caplog):
+    """Test add_debug_logging skips the reprs when DEBUG is disabled."""
+    caplog.set_level(logging.INFO, logger='myaku')
+    arg = ReprCounter()
+    logged_func = utils.add_debug_logging(lambda x: x)
+
+    assert logged_func(arg) is arg
+    assert arg.repr_count == 0
+    assert len(caplog.records) == 0
+
+
+def test_add_debug_logging_no_debug_log(monkeypatch):
+    """Test add_debug_logging doesn't wrap funcs if MYAKU_NO_DEBUG_LOG=1."""
+    monkeypatch.setenv(utils._NO_DEBUG_LOG_ENV_VAR, '1')
+
+    def func(x):
+        return x
+
+    class TestClass(object):
+        def method(self):
+            pass
+
+    assert utils.add_debug_logging(func) is func
+    method = TestClass.method
+    assert utils.add_method_debug_logging(TestClass).method is method
+
+
+def test_toggle_myaku_package_log_no_debug_log(
+    default_log_environment, monkeypatch, capsys
+):
+    """Test enabling the package log with MYAKU_NO_DEBUG_LOG=1."""
+    monkeypatch.setenv(utils._NO_DEBUG_LOG_ENV_VAR, '1')
+    log = logging.getLogger('myaku')
+    default_log_environment.toggle_func(True)
+    log_all_levels_once(log)
+
+    assert not log.isEnabledFor(logging.DEBUG)
+    assert not os.path.exists(
+        default_log_environment.filepath_base + '.debug.log'
+    )
+    assert len(capsys.readouterr().err.splitlines()) == 4
+
+
 def test_toggle_myaku_package_log_on_default(default_log_environment, capsys):
     """Test enabling the package log with default settings."""
     assert_toggle_myaku_package_log_on(default_log_environment, capsys)
@@ -6,14 +6,27 @@ import inspect
 import logging
 import os
 import posixpath
+import re
 import sys
 import time
 import traceback
+from bisect import bisect_left
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from operator import itemgetter
 from random import random
-from typing import Any, Callable, List, Set, Tuple, Type, TypeVar
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
 from urllib.parse import urlsplit, urlunsplit
 
 import jaconv
@@ -44,9 +57,20 @@ _JPN_SENTENCE_ENDERS = [
     '!',
     '\n',
 ]
+_JPN_SENTENCE_ENDERS_REGEX = re.compile(
+    '[{}]+'.format(re.escape(''.join(_JPN_SENTENCE_ENDERS)))
+)
+
+_HALF_WIDTH_KANA_RANGE = range(0xFF61, 0xFFA0)
+_HALF_WIDTH_KANA_SOUND_MARKS = 'ﾞﾟ'
+
+# Max number of distinct strings whose normalized char width forms are kept
+# in memory by normalize_char_width.
+_CHAR_WIDTH_MEMO_SIZE = 2 ** 16
 
 _NO_RATE_LIMIT_ENV_VAR = 'MYAKU_NO_RATE_LIMIT'
 
+_NO_DEBUG_LOG_ENV_VAR = 'MYAKU_NO_DEBUG_LOG'
 _DEBUG_LOG_MAX_SIZE_ENV_VAR = 'DEBUG_LOG_MAX_SIZE'
 _INFO_LOG_MAX_SIZE_ENV_VAR = 'INFO_LOG_MAX_SIZE'
 
@@ -84,6 +108,9 @@ def toggle_myaku_package_log(
     exists in the environment. Otherwise, the files are written to the current
     working directory instead.
 
+    If MYAKU_NO_DEBUG_LOG is set to 1 in the environment, the logger is set to
+    the INFO level instead, and the DEBUG level log files are not written.
+
     Args:
         enable: If True, enables the logger; if False, disables the logger.
         filename_base: A name to prepend to the files written by the logger.
@@ -110,7 +137,10 @@ def toggle_myaku_package_log(
         os.makedirs(log_dir, exist_ok=True)
     filepath_base = os.path.join(log_dir, filename_base)
 
-    package_log.setLevel(logging.DEBUG)
+    if is_debug_log_disabled():
+        package_log.setLevel(logging.INFO)
+    else:
+        package_log.setLevel(logging.DEBUG)
     _add_logging_handlers(package_log, filepath_base)
 
 
@@ -123,14 +153,15 @@ def _add_logging_handlers(logger: logging.Logger, filepath_base: str) -> None:
     debug_log_max_size = int(os.environ.get(_DEBUG_LOG_MAX_SIZE_ENV_VAR, 0))
     info_log_max_size = int(os.environ.get(_INFO_LOG_MAX_SIZE_ENV_VAR, 0))
 
-    debug_file_handler = RotatingFileHandler(
-        filepath_base + '.debug.log',
-        maxBytes=debug_log_max_size // (_LOG_ROTATING_BACKUP_COUNT + 1),
-        backupCount=_LOG_ROTATING_BACKUP_COUNT
-    )
-    debug_file_handler.setLevel(logging.DEBUG)
-    debug_file_handler.setFormatter(log_formatter)
-    logger.addHandler(debug_file_handler)
+    if not is_debug_log_disabled():
+        debug_file_handler = RotatingFileHandler(
+            filepath_base + '.debug.log',
+            maxBytes=debug_log_max_size // (_LOG_ROTATING_BACKUP_COUNT + 1),
+            backupCount=_LOG_ROTATING_BACKUP_COUNT
+        )
+        debug_file_handler.setLevel(logging.DEBUG)
+        debug_file_handler.setFormatter(log_formatter)
+        logger.addHandler(debug_file_handler)
 
     info_file_handler = RotatingFileHandler(
         filepath_base + '.info.log',
@@ -147,6 +178,11 @@ def _add_logging_handlers(logger: logging.Logger, filepath_base: str) -> None:
     logger.addHandler(info_stream_handler)
 
 
+def is_debug_log_disabled() -> bool:
+    """Return True if MYAKU_NO_DEBUG_LOG is set to 1 in the environment."""
+    return int(os.environ.get(_NO_DEBUG_LOG_ENV_VAR, 0)) == 1
+
+
 def is_package_log_enabled() -> bool:
     """Return True if the package log is currently enabled."""
     return len(_get_root_package_logger().handlers) > 0
@@ -213,6 +249,29 @@ def get_value_from_env_variable(env_var: str) -> str:
     return value
 
 
+def get_positive_int_from_env(env_var: str) -> Optional[int]:
+    """Get a positive integer from an environment variable.
+
+    Returns:
+        The positive integer, or None if the environment variable is not set.
+
+    Raises:
+        EnvironmentNotSetError: The environment variable is set to a value
+            that is not a positive integer.
+    """
+    value_str = os.environ.get(env_var)
+    if value_str is None or len(value_str) == 0:
+        return None
+
+    if not value_str.isdigit() or int(value_str) < 1:
+        log_and_raise(
+            _log, EnvironmentNotSetError,
+            'Environment variable "{}" is set to "{}" instead of a positive '
+            'integer'.format(env_var, value_str)
+        )
+    return int(value_str)
+
+
 def get_value_from_env_file(env_var: str) -> str:
     """Get a value from a file specified by an environment variable.
 
@@ -259,8 +318,41 @@ def unique(items: List[T]) -> List[T]:
     return unique_items
 
 
-def find_jpn_sentence_start(text: str, pos: int) -> int:
-    """Find the start index of the Japanese sentence in text containing pos."""
+def find_jpn_sentence_ends(text: str) -> List[int]:
+    """Find the end index of every Japanese sentence in text.
+
+    The end index of a sentence is the index of its full sentence ender (see
+    _get_full_sentence_ender). The index of the last character of text is not
+    included unless it is a sentence ender.
+
+    Args:
+        text: The text whose sentence end indexes to find.
+
+    Returns:
+        The end indexes of the sentences in text in ascending order. Can be
+        given to find_jpn_sentence_start and find_jpn_sentence_end so that they
+        do not have to search text.
+    """
+    return [
+        match.end() - 1
+        for match in _JPN_SENTENCE_ENDERS_REGEX.finditer(text)
+    ]
+
+
+def find_jpn_sentence_start(
+    text: str, pos: int, sentence_ends: List[int] = None
+) -> int:
+    """Find the start index of the Japanese sentence in text containing pos.
+
+    If sentence_ends from find_jpn_sentence_ends(text) is given, the start
+    index is found with a binary search of it instead of searching text.
+    """
+    if sentence_ends is not None:
+        ends_index = bisect_left(sentence_ends, pos)
+        if ends_index == 0:
+            return 0
+        return sentence_ends[ends_index - 1] + 1
+
     # If there is a sentence ender at pos, move pos left until it is next to a
     # non-sentence ending character.
     while (pos > 0 and text[pos] in _JPN_SENTENCE_ENDERS
@@ -276,8 +368,20 @@ def find_jpn_sentence_start(text: str, pos: int) -> int:
     return previous_ender_index + 1
 
 
-def find_jpn_sentence_end(text: str, pos: int) -> int:
-    """Find the end index of the Japanese sentence in text containing pos."""
+def find_jpn_sentence_end(
+    text: str, pos: int, sentence_ends: List[int] = None
+) -> int:
+    """Find the end index of the Japanese sentence in text containing pos.
+
+    If sentence_ends from find_jpn_sentence_ends(text) is given, the end index
+    is found with a binary search of it instead of searching text.
+    """
+    if sentence_ends is not None:
+        ends_index = bisect_left(sentence_ends, pos)
+        if ends_index == len(sentence_ends):
+            return len(text) - 1
+        return sentence_ends[ends_index]
+
     sentence_ender_indexes = [
         text.find(char, pos) for char in _JPN_SENTENCE_ENDERS
     ]
@@ -412,17 +516,83 @@ def get_alnum_count(string: str) -> int:
     return sum(c.isalnum() for c in string)
 
 
-def normalize_char_width(string: str) -> str:
-    """Normalize character widths in string to a set standard.
+def _jaconv_normalize_char_width(string: str) -> str:
+    """Normalize character widths in string using jaconv directly.
 
-    Converts all katakana to full-width, and converts all latin alphabet and
-    numeric characters to half-width
+    Makes two full passes over string, so normalize_char_width should be used
+    instead. This is used to build the tables used by normalize_char_width.
     """
     out_str = jaconv.h2z(string, kana=True, ascii=False, digit=False)
     out_str = jaconv.z2h(out_str, kana=False, ascii=True, digit=True)
     return out_str
 
 
+@functools.lru_cache(maxsize=1)
+def _get_char_width_tables() -> Tuple[Dict[int, str], Dict[str, str]]:
+    """Get the tables used to normalize char widths in normalize_char_width.
+
+    The tables are built from the output of jaconv for every BMP character so
+    that normalize_char_width always has the same output as jaconv.
+
+    Returns:
+        A 2-tuple containing:
+            1. A str.translate table for normalizing single characters.
+            2. A map from half-width kana + sound mark pairs to the single
+                full-width kana they normalize to.
+    """
+    chars = [
+        chr(i) for i in range(0x10000)
+        if i != 0 and not 0xD800 <= i <= 0xDFFF
+    ]
+
+    # Null characters are used as separators so that no characters in the
+    # string combine during normalization.
+    normalized_chars = _jaconv_normalize_char_width('\0'.join(chars))
+    translate_table = {
+        ord(char): normalized_char
+        for char, normalized_char in zip(chars, normalized_chars.split('\0'))
+        if char != normalized_char
+    }
+
+    sound_mark_pair_map = {}
+    for i in _HALF_WIDTH_KANA_RANGE:
+        for mark in _HALF_WIDTH_KANA_SOUND_MARKS:
+            pair = chr(i) + mark
+            normalized_pair = _jaconv_normalize_char_width(pair)
+            if normalized_pair != pair.translate(translate_table):
+                sound_mark_pair_map[pair] = normalized_pair
+
+    return (translate_table, sound_mark_pair_map)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_sound_mark_pair_regex() -> Pattern:
+    """Get a regex that matches the pairs that combine into a single kana."""
+    return re.compile(
+        '|'.join(re.escape(pair) for pair in _get_char_width_tables()[1])
+    )
+
+
+@functools.lru_cache(maxsize=_CHAR_WIDTH_MEMO_SIZE)
+def normalize_char_width(string: str) -> str:
+    """Normalize character widths in string to a set standard.
+
+    Converts all katakana to full-width, and converts all latin alphabet and
+    numeric characters to half-width.
+
+    Gives the same output as normalizing with jaconv, but only makes a single
+    translate pass over string (plus a regex pass if string contains
+    half-width sound marks). The output for recently normalized strings is
+    memoized.
+    """
+    translate_table, sound_mark_pair_map = _get_char_width_tables()
+    if any(mark in string for mark in _HALF_WIDTH_KANA_SOUND_MARKS):
+        string = _get_sound_mark_pair_regex().sub(
+            lambda match: sound_mark_pair_map[match.group()], string
+        )
+    return string.translate(translate_table)
+
+
 def get_full_name(obj: Any) -> str:
     """Get the fully qualified name of the object."""
     if obj.__module__:
@@ -430,6 +600,46 @@ def get_full_name(obj: Any) -> str:
     return obj.__qualname__
 
 
+def get_deep_size(obj: Any, seen_ids: Set[int] = None) -> int:
+    """Get the size in bytes of an object and the objects it contains.
+
+    Only the items of lists, tuples, sets, and the keys and values of dicts are
+    followed as contained objects. Any other object is counted using only its
+    own size.
+
+    Args:
+        obj: Object to get the size of.
+        seen_ids: IDs of objects that have already been counted. Objects with
+            IDs in this set are not counted again, and the IDs of the objects
+            counted by this call are added to it. This allows getting the
+            sizes of multiple objects that share contained objects without
+            double counting them.
+
+    Returns:
+        The total size in bytes of obj and every object it contains that was
+        not already in seen_ids.
+    """
+    if seen_ids is None:
+        seen_ids = set()
+
+    size = 0
+    unvisited = [obj]
+    while unvisited:
+        item = unvisited.pop()
+        if id(item) in seen_ids:
+            continue
+        seen_ids.add(id(item))
+
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            unvisited.extend(item.keys())
+            unvisited.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            unvisited.extend(item)
+
+    return size
+
+
 def shorten_repr(obj: Any, max_chars: int = 100) -> str:
     """Shorten object repr string to a max length + a shortened indicator.
 
@@ -570,10 +780,21 @@ def add_debug_logging(func: Callable) -> Callable:
     """Log params and return value on func entrance and exit.
 
     Also logs any exception if raised from func.
+
+    The reprs of the params and return value are only generated if the DEBUG
+    level is enabled for the log at the time of the call. If
+    MYAKU_NO_DEBUG_LOG is set to 1 in the environment when the decorator is
+    applied, func is returned without being wrapped at all.
     """
+    if is_debug_log_disabled():
+        return func
+
+    func_name = get_full_name(func)
+
     @functools.wraps(func)
     def wrapper_add_debug_logging(*args, **kwargs):
-        func_name = get_full_name(func)
+        if not _log.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
 
         args_repr = [shorten_repr(arg) for arg in args]
         kwargs_repr = [f'{k}={shorten_repr(v)}' for k, v in kwargs.items()]
@@ -595,12 +816,18 @@ def add_method_debug_logging(cls: type) -> type:
 
     Does NOT apply decorator to inherited methods from parent classes.
 
+    If MYAKU_NO_DEBUG_LOG is set to 1 in the environment, cls is returned
+    unchanged.
+
     Args:
         cls: Class to have the logging decorator applied to its methods.
 
     Returns:
         cls with the logging decorator applied to its methods.
     """
+    if is_debug_log_disabled():
+        return cls
+
     for attr_name in cls.__dict__:
         attr = getattr(cls, attr_name)
         if (callable(attr)
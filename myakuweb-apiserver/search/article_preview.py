@@ -525,7 +525,8 @@ class SearchResultArticlePreview(object):
 
         # Expansion from outside the title to inside it is not allowed
         left_start = utils.find_jpn_sentence_start(
-            self._article.full_text, pos.start - 1
+            self._article.full_text, pos.start - 1,
+            self._article.sentence_ends
         )
         if (pos.start >= len(self._article.title)
                 and left_start < len(self._article.title)):
@@ -547,7 +548,8 @@ class SearchResultArticlePreview(object):
     ) -> Tuple[List[PreviewSampleTextSegment], int]:
         """Get the segments and start index of the sentence left of pos."""
         left_start = utils.find_jpn_sentence_start(
-            self._article.full_text, pos.start - 1
+            self._article.full_text, pos.start - 1,
+            self._article.sentence_ends
         )
         found_positions = self._sentence_found_positions_map.get(
             left_start, ()
@@ -615,7 +617,8 @@ class SearchResultArticlePreview(object):
         # Expansion from inside the title to outside it is not allowed
         if pos.start < len(self._article.title):
             right_end = utils.find_jpn_sentence_start(
-                self._article.full_text, pos.start + pos.len
+                self._article.full_text, pos.start + pos.len,
+                self._article.sentence_ends
             )
             while right_end > 0 and self._article.full_text[right_end] == '\n':
                 right_end -= 1
@@ -640,7 +643,7 @@ class SearchResultArticlePreview(object):
         """Get the segments and end index of the sentence right of pos."""
         right_start = pos.start + pos.len
         right_end = utils.find_jpn_sentence_end(
-            self._article.full_text, right_start
+            self._article.full_text, right_start, self._article.sentence_ends
         )
         found_positions = self._sentence_found_positions_map.get(
             right_start, ()
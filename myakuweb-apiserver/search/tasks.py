@@ -15,7 +15,8 @@ def cache_surrounding_pages(query: Query) -> None:
 
     Args:
         query: Query made by a user that should have its next page loaded into
-            the next page cache.
+            the next page cache. Its after_rank_key should be the last rank key
+            of the page of search results for the query.
     """
     utils.toggle_myaku_package_log(filename_base='web_worker')
     utils.toggle_myaku_package_log(
@@ -36,6 +37,7 @@ def cache_surrounding_pages(query: Query) -> None:
     # always in the first page cache.
     if current_page_num > 2:
         query.page_num = current_page_num - 1
+        query.after_rank_key = None
         with ArticleIndexSearcher() as searcher:
             backward_page = searcher.search_articles(query)
         cache_client.set(
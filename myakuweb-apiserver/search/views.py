@@ -201,6 +201,7 @@ class SearchQueryResult(object):
 
         self.query = query
         self.total_results = result_page.total_results
+        self.last_rank_key = result_page.last_rank_key
 
         total_pages = math.ceil(
             result_page.total_results / SEARCH_RESULTS_PAGE_SIZE
@@ -362,6 +363,9 @@ def search(request: HttpRequest) -> JsonResponse:
     query_result = SearchQueryResult(query)
 
     if query.page_num > 2 or query_result.has_next_page:
+        # Lets the next page be read by seeking past the last result of this
+        # page instead of reading past the results of all previous pages.
+        query.after_rank_key = query_result.last_rank_key
         tasks.cache_surrounding_pages.delay(query)
 
     return JsonResponse(query_result.json())